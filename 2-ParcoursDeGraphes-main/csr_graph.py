@@ -0,0 +1,316 @@
+# -*- coding: utf-8 -*-
+"""A frozen graph stored in compressed sparse row (CSR) format
+
+A `CSRGraph` is built once from any graph offering `nodes`,
+`neighbors` and `capacity` (a `graph.Graph`, a networkx graph, ...).
+Nodes are numbered by their rank in `nodes()`; the arcs leaving the
+i-th node are stored contiguously in `numpy` buffers, between
+`offsets[i]` and `offsets[i+1]`. A second CSR structure holds the
+reverse arcs so that `predecessors` is as cheap as `successors`.
+
+The graph can not be modified, but exposes the same read-only methods
+as `graph.Graph`, so that traversal code runs on it unchanged::
+
+    >>> import graph, graph_networkx
+    >>> from csr_graph import CSRGraph
+    >>>
+    >>> for G, GN in zip( graph.examples.all(), graph_networkx.examples.all() ):
+    ...    for H in (CSRGraph(G), CSRGraph(GN)):
+    ...        assert H.is_directed() == G.is_directed()
+    ...        assert tuple(H.nodes()) == tuple(G.nodes())
+    ...        assert H.number_of_edges() == G.number_of_edges()
+    ...        assert H.matrix() == G.matrix()
+    ...        for v in G.nodes():
+    ...            assert set(H.successors(v)) == set(G.successors(v))
+    ...            assert set(H.predecessors(v)) == set(G.predecessors(v))
+    ...        assert sorted(H.edges(), key=str) == sorted(G.edges(), key=str)
+"""
+
+from typing import Any, Dict, List, Sequence
+import numpy
+import networkx  # type: ignore
+from graph_networkx import Node, Capacity, Edge
+
+GraphType = Any
+
+
+class CSRGraph:
+
+    _nodes: List[Node]
+    _node_indices: Dict[Node, int]
+    _directed: bool
+    # Arcs sortants: ceux du i-ème sommet sont rangés entre
+    # `_offsets[i]` et `_offsets[i+1]`, triés par indice de cible
+    _offsets: numpy.ndarray
+    _targets: numpy.ndarray
+    _capacities: numpy.ndarray
+    # Arcs entrants, même organisation
+    _reverse_offsets: numpy.ndarray
+    _sources: numpy.ndarray
+
+    def __init__(self, G: GraphType):
+        """
+        Construit la représentation CSR du graphe `G`
+
+        INPUT:
+
+            - G, un graphe (`graph.Graph`, graphe networkx, ...)
+
+        EXAMPLES::
+
+            >>> from graph import examples
+            >>> G = CSRGraph(examples.directed())
+            >>> G.nodes()
+            [1, 2, 3, 4]
+            >>> G.edges()
+            ((1, 2, 12), (1, 4, 12), (2, 3, 23))
+
+        Complexity: O(m log m) pour m arêtes (tri des arcs)
+        """
+        self._nodes = list(G.nodes())
+        self._node_indices = {v: i for i, v in enumerate(self._nodes)}
+        self._directed = G.is_directed()
+
+        n = len(self._nodes)
+        sources = []
+        targets = []
+        capacities = []
+        for i, v1 in enumerate(self._nodes):
+            for v2 in G.neighbors(v1):
+                sources.append(i)
+                targets.append(self._node_indices[v2])
+                capacities.append(G.capacity(v1, v2))
+
+        source_array = numpy.array(sources, dtype=numpy.int64)
+        target_array = numpy.array(targets, dtype=numpy.int64)
+
+        # Tri par (source, cible) pour les arcs sortants
+        order = numpy.lexsort((target_array, source_array))
+        self._targets = target_array[order]
+        self._capacities = numpy.array(capacities)[order]
+        self._offsets = numpy.zeros(n + 1, dtype=numpy.int64)
+        numpy.cumsum(numpy.bincount(source_array, minlength=n), out=self._offsets[1:])
+
+        # Tri par (cible, source) pour les arcs entrants
+        order = numpy.lexsort((source_array, target_array))
+        self._sources = source_array[order]
+        self._reverse_offsets = numpy.zeros(n + 1, dtype=numpy.int64)
+        numpy.cumsum(
+            numpy.bincount(target_array, minlength=n), out=self._reverse_offsets[1:]
+        )
+
+    def _arc(self, i: int, j: int) -> int:
+        """
+        Renvoie la position de l'arc du i-ème au j-ème sommet dans les
+        tableaux `_targets` et `_capacities`, ou -1 s'il n'existe pas
+
+        Complexity: Logarithmique sur le degré sortant (recherche dichotomique)
+        """
+        start = self._offsets[i]
+        end = self._offsets[i + 1]
+        k = start + numpy.searchsorted(self._targets[start:end], j)
+        if k < end and self._targets[k] == j:
+            return int(k)
+        return -1
+
+    def _capacity_at(self, k: int) -> Capacity:
+        """
+        Renvoie la capacité du k-ème arc sous forme d'objet Python
+        """
+        c = self._capacities[k]
+        return c.item() if isinstance(c, numpy.generic) else c
+
+    def is_directed(self) -> bool:
+        """
+        Renvoie si le graph est orienté
+        """
+        return self._directed
+
+    def nodes(self) -> Sequence[Node]:
+        """
+        Renvoie la liste des sommets du graphe
+
+        Complexity: Constante
+        """
+        return self._nodes
+
+    def number_of_nodes(self) -> int:
+        """
+        Renvoie le nombre de sommets du graphe
+
+        Complexity: Constante
+        """
+        return len(self._nodes)
+
+    def has_node(self, v1: Node) -> bool:
+        """
+        Renvoie vrai si v1 est un sommet du graphe
+
+        Complexity: Constante car accès à un élément de dictionnaire
+        """
+        return v1 in self._node_indices
+
+    def edges(self) -> Sequence[Edge]:
+        """
+        Renvoie les arêtes de ce graphe avec leurs capacités
+
+        Chaque arête est renvoyée comme un triplet `(v1, v2, c)`.
+
+        EXAMPLES::
+
+            >>> from graph import examples
+            >>> G = CSRGraph(examples.undirected())
+            >>> G.edges()
+            ((1, 2, 12), (2, 1, 12), (2, 3, 23), (3, 2, 23))
+
+        Complexity: Linéaire sur le nombre d'arêtes
+        """
+        sources = numpy.repeat(
+            numpy.arange(len(self._nodes)), numpy.diff(self._offsets)
+        ).tolist()
+        return tuple(
+            (self._nodes[i], self._nodes[j], c)
+            for i, j, c in zip(
+                sources, self._targets.tolist(), self._capacities.tolist()
+            )
+        )
+
+    def number_of_edges(self) -> int:
+        """
+        Renvoie le nombre d'arêtes du graphe
+
+        Complexity: Constante
+        """
+        return len(self._targets)
+
+    def has_edge(self, v1: Node, v2: Node) -> bool:
+        """
+        Renvoie si l'arête (v1,v2) existe
+
+        Complexity: Logarithmique sur le degré sortant de v1
+        """
+        return self._arc(self._node_indices[v1], self._node_indices[v2]) >= 0
+
+    def capacity(self, v1: Node, v2: Node) -> Capacity:
+        """
+        Renvoie la capacité de l'arête (v1,v2)
+
+        Si l'arête n'existe pas, la capacité est 0.
+
+        EXAMPLES::
+
+            >>> from graph import examples
+            >>> G = CSRGraph(examples.directed())
+            >>> G.capacity(1,2)
+            12
+            >>> G.capacity(2,1)
+            0
+
+        Complexity: Logarithmique sur le degré sortant de v1
+        """
+        k = self._arc(self._node_indices[v1], self._node_indices[v2])
+        return 0 if k < 0 else self._capacity_at(k)
+
+    def matrix(self) -> List[List[Capacity]]:
+        """
+        Retourne la matrice associée au graphe
+
+        EXAMPLES::
+
+            >>> from graph import examples
+            >>> CSRGraph(examples.directed()).matrix()
+            [[0, 12, 0, 12],
+             [0, 0, 23, 0],
+             [0, 0, 0, 0],
+             [0, 0, 0, 0]]
+
+        Complexity: Quadratique sur le nombre de sommets
+        """
+        n = len(self._nodes)
+        M: List[List[Capacity]] = [[0] * n for _ in range(n)]
+        for v1, v2, c in self.edges():
+            M[self._node_indices[v1]][self._node_indices[v2]] = c
+        return M
+
+    def predecessors(self, v: Node) -> Sequence[Node]:
+        """
+        Renvoie la liste des voisins entrants de `v`
+
+        EXAMPLES::
+
+            >>> from graph import examples
+            >>> G = CSRGraph(examples.cours_1_reseau())
+            >>> G.predecessors("H")
+            ('C', 'D', 'E', 'G')
+
+        Complexity: Linéaire sur le nombre de voisins entrants de `v`
+        """
+        i = self._node_indices[v]
+        start = self._reverse_offsets[i]
+        end = self._reverse_offsets[i + 1]
+        return tuple(self._nodes[j] for j in self._sources[start:end].tolist())
+
+    def successors(self, v: Node) -> Sequence[Node]:
+        """
+        Renvoie la liste des voisins sortants de `v`
+
+        EXAMPLES::
+
+            >>> from graph import examples
+            >>> G = CSRGraph(examples.cours_1_reseau())
+            >>> G.successors("A")
+            ('B', 'F', 'G')
+
+        Complexity: Linéaire sur le nombre de voisins sortants de `v`
+        """
+        i = self._node_indices[v]
+        start = self._offsets[i]
+        end = self._offsets[i + 1]
+        return tuple(self._nodes[j] for j in self._targets[start:end].tolist())
+
+    neighbors = successors
+
+    def neighbor_indices(self, i: int) -> numpy.ndarray:
+        """
+        Renvoie les indices des voisins sortants du i-ème sommet
+
+        Variante de `successors` travaillant directement sur les indices,
+        sans copie du tableau sous-jacent.
+
+            >>> from graph import examples
+            >>> G = CSRGraph(examples.directed())
+            >>> G.neighbor_indices(0)
+            array([1, 3])
+        """
+        return self._targets[self._offsets[i]:self._offsets[i + 1]]
+
+    def is_path(self, p: Sequence[Node]) -> bool:
+        """
+        Renvoie si `p` est un chemin valide dans le graphe
+
+            >>> from graph import examples
+            >>> G = CSRGraph(examples.cours_1_reseau())
+            >>> G.is_path(["D", "H", "G", "B", "A"])
+            True
+            >>> G.is_path(["D", "H", "F"])
+            False
+        """
+        if len(p) == 1:
+            return self.has_node(p[0])
+        return all(v == w or self.has_edge(v, w) for v, w in zip(p, p[1:]))
+
+    def networkx(self) -> networkx.Graph:
+        """
+        Return a networkx graph with the same nodes and edges
+        """
+        import graph_networkx
+
+        return graph_networkx.Graph(
+            self.nodes(), self.edges(), directed=self.is_directed()
+        )
+
+    def show(self) -> Any:
+        """
+        Display the current graph
+        """
+        return self.networkx().show()
@@ -45,6 +45,14 @@ class Graph:
     # À vous de choisir la structure de donnée pour les arêtes (edges)
     # Remplacer la ligne suivante par le code adéquat
     _edges: Dict[Tuple[Node, Node], Node]
+    # Listes d'adjacence sortantes et entrantes de chaque sommet,
+    # maintenues en parallèle de `_edges` pour que `successors` et
+    # `predecessors` ne parcourent pas tous les sommets
+    _successors: Dict[Node, List[Node]]
+    _predecessors: Dict[Node, List[Node]]
+    # Position de chaque sommet dans `_nodes`: les listes d'adjacence sont
+    # triées selon cette position, comme l'étaient les voisins avant
+    _rank: Dict[Node, int]
 
     def __init__(
         self,
@@ -92,6 +100,33 @@ class Graph:
         Initialisation pour un graphe vide (sans arêtes)
         """
         self._edges = {}
+        self._successors = {v: [] for v in self._nodes}
+        self._predecessors = {v: [] for v in self._nodes}
+        self._rank = {v: i for i, v in enumerate(self._nodes)}
+
+    def _insert(self, neighbors: List[Node], v: Node) -> None:
+        """
+        Insère `v` dans la liste `neighbors`, triée selon l'ordre des sommets
+
+        Complexity: Constante si les arêtes sont ajoutées dans l'ordre des
+        sommets, linéaire sur la longueur de `neighbors` sinon
+        """
+        rank = self._rank.get(v, len(self._rank))
+        i = len(neighbors)
+        while i > 0 and self._rank.get(neighbors[i - 1], len(self._rank)) > rank:
+            i -= 1
+        neighbors.insert(i, v)
+
+    def _add_edge(self, v1: Node, v2: Node, c: Capacity) -> None:
+        """
+        Ajoute l'arête `(v1,v2)` de capacité `c`, ou met à jour sa capacité
+
+        Complexity: voir `_insert`
+        """
+        if (v1, v2) not in self._edges:
+            self._insert(self._successors.setdefault(v1, []), v2)
+            self._insert(self._predecessors.setdefault(v2, []), v1)
+        self._edges[(v1, v2)] = c
 
     def _init_from_matrix(self, matrix: Sequence[Sequence[Capacity]]) -> None:
         """
@@ -117,16 +152,16 @@ class Graph:
         if len(self._nodes) == 0:
             self._nodes = [i for i in range(len(matrix))]
 
-        self._edges = dict()
+        self._init_empty()
         for i in range(len(matrix)):
             for j in range(len(matrix)):
                 if matrix[i][j] != 0:
                     (v1, v2) = (self._nodes[i], self._nodes[j])
                     c = matrix[i][j]
-                    self._edges[(v1, v2)] = c
+                    self._add_edge(v1, v2, c)
                     # Si pas graphe non-dirigé alors arêtes à double sens
                     if not self._directed:
-                        self._edges[(v2, v1)] = c
+                        self._add_edge(v2, v1, c)
 
     def _init_from_edges(self, edges: Sequence[Edge]) -> None:
         """
@@ -140,12 +175,12 @@ class Graph:
                 nodes.add(v2)
             self._nodes = list(nodes)
 
-        self._edges = dict()
+        self._init_empty()
         for (v1, v2, c) in edges:
-            self._edges[(v1, v2)] = c
+            self._add_edge(v1, v2, c)
             # Si pas graphe non-dirigé alors arêtes à double sens
             if not self._directed:
-                self._edges[(v2, v1)] = c
+                self._add_edge(v2, v1, c)
 
     def is_directed(self) -> bool:
         """
@@ -170,7 +205,7 @@ class Graph:
             >>> G.edges()
             ((1, 2, 2),)
         """
-        self._edges[(v1, v2)] = c
+        self._add_edge(v1, v2, c)
 
     def add_node(self, v: Node) -> None:
         """
@@ -183,6 +218,7 @@ class Graph:
         Complexity: Constante car ajout dans tableau redimensionnable
         """
         if v not in self._nodes:
+            self._rank[v] = len(self._nodes)
             self._nodes.append(v)
 
     def nodes(self) -> Sequence[Node]:
@@ -266,9 +302,9 @@ class Graph:
             - v1, un sommet du graphe
             - v2, un sommet du graphe
 
-        Complexity: Linéaire sur le nombre de sommets successeurs de v1
+        Complexity: Constante car accès à un élément de dictionnaire
         """
-        return v2 in self.successors(v1)
+        return (v1, v2) in self._edges
 
     def capacity(self, v1: Node, v2: Node) -> Capacity:
         """
@@ -323,8 +359,11 @@ class Graph:
     def to_dict(self) -> Dict:
         """
         Retourne le dictionnaire associé au graphe
+
+        Le dictionnaire renvoyé est une copie: le modifier ne modifie pas
+        le graphe.
         """
-        return self._edges
+        return dict(self._edges)
 
     def predecessors(self, v: Node) -> Sequence[Node]:
         """
@@ -345,9 +384,9 @@ class Graph:
             >>> G.predecessors(2)
             (1,)
 
-        Complexity: Linéaire sur le nombre de sommets
+        Complexity: Linéaire sur le nombre de voisins entrants de `v`
         """
-        return tuple([v1 for v1 in self._nodes if self._edges.get((v1, v)) is not None])
+        return tuple(self._predecessors.get(v, ()))
 
     def successors(self, v: Node) -> Sequence[Node]:
         """
@@ -370,9 +409,9 @@ class Graph:
             >>> G.successors(4)
             ()
 
-        Complexity: Linéaire sur le nombre de sommets
+        Complexity: Linéaire sur le nombre de voisins sortants de `v`
         """
-        return tuple([v2 for v2 in self._nodes if self._edges.get((v, v2)) is not None])
+        return tuple(self._successors.get(v, ()))
 
     neighbors = successors
 
@@ -400,7 +439,7 @@ class Graph:
             >>> G.is_path(["D", "H", "G", "B", "A"])
             True
 
-        Complexity: len(p) * len(self._nodes)
+        Complexity: Linéaire sur la longueur de `p`
         """
         # Si un seul sommet il doit appartenir au graphe
         res = len(p) == 0 or (len(p) == 1 and p[0] in self._nodes) or len(p) > 1
@@ -411,7 +450,7 @@ class Graph:
             # Sommet courant
             w = p[i]
             # Le chemin d'un sommet vers lui-même existe toujours
-            res = v == w or w in self.successors(v)
+            res = v == w or self.has_edge(v, w)
             i += 1
         return res
 
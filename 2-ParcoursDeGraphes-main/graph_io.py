@@ -0,0 +1,180 @@
+# -*- coding: utf-8 -*-
+"""Lecture des graphes au format de `metro_complet.txt`
+
+Le fichier commence par une ligne `n m` (nombre de sommets et d'arcs),
+suivie de trois sections introduites par une ligne d'en-tête:
+
+- `noms sommets`: une ligne `id nom` par sommet
+- `coord sommets`: une ligne `id x y` par sommet
+- `arcs values`: une ligne `id1 id2 valeur` par arc
+
+Le fichier est lu en une seule passe, ligne à ligne. Le résultat est
+conservé dans un cache binaire `numpy` (`.npz`) à côté du fichier,
+associé à sa date de modification et à son empreinte SHA-256: les
+chargements suivants ne relisent pas le texte.
+
+    >>> from graph_io import load_graph
+    >>> G = load_graph("metro_complet.txt", cache=False)
+    >>> G.number_of_nodes(), G.number_of_edges()
+    (376, 933)
+    >>> G.names[0], G.coordinates[0]
+    ('Abbesses', (308.0, 536.0))
+    >>> sorted(G.names[v] for v in G.successors(0))
+    ['Lamarck Caulaincourt', 'Pigalle']
+"""
+
+from typing import Dict, List, Optional, Sequence, Tuple
+import hashlib
+import os
+import numpy
+from graph import Graph
+from graph_networkx import Node, Edge
+
+Coordinates = Tuple[float, float]
+
+SECTIONS = ("noms sommets", "coord sommets", "arcs values")
+
+
+class NamedGraph(Graph):
+    """
+    Un graphe orienté dont les sommets ont un nom et des coordonnées
+    """
+
+    names: Dict[Node, str]
+    coordinates: Dict[Node, Coordinates]
+
+    def __init__(
+        self,
+        nodes: Sequence[Node],
+        edges: Sequence[Edge],
+        names: Dict[Node, str],
+        coordinates: Dict[Node, Coordinates],
+    ):
+        Graph.__init__(self, nodes=nodes, edges=edges, directed=True)
+        self.names = names
+        self.coordinates = coordinates
+
+
+def parse_graph(file: str) -> NamedGraph:
+    """
+    Lit le fichier texte `file` en une seule passe
+
+    Complexity: Linéaire sur la taille du fichier
+    """
+    names: Dict[Node, str] = {}
+    coordinates: Dict[Node, Coordinates] = {}
+    edges: List[Edge] = []
+    section = None
+    with open(file, encoding="utf-8") as f:
+        next(f)  # ligne `n m`
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            if line in SECTIONS:
+                section = line
+            elif section == "noms sommets":
+                v, name = line.split(" ", 1)
+                names[int(v)] = name
+            elif section == "coord sommets":
+                v, x, y = line.split()
+                coordinates[int(v)] = (float(x), float(y))
+            elif section == "arcs values":
+                v1, v2, c = line.split()
+                edges.append((int(v1), int(v2), float(c)))
+    return NamedGraph(list(names), edges, names, coordinates)
+
+
+def _file_hash(file: str) -> str:
+    """
+    Renvoie l'empreinte SHA-256 du contenu de `file`
+    """
+    with open(file, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def _read_cache(cache_file: str, mtime: float, file: str) -> Optional[NamedGraph]:
+    """
+    Relit le graphe depuis `cache_file`, ou renvoie `None` si le cache
+    ne correspond pas au contenu actuel de `file`
+    """
+    try:
+        data = numpy.load(cache_file)
+    except (OSError, ValueError):
+        return None
+    with data:
+        # La date de modification suffit quand elle n'a pas changé;
+        # sinon on compare le contenu (fichier copié, `touch`, ...)
+        if data["mtime"] != mtime and str(data["sha256"]) != _file_hash(file):
+            return None
+        nodes = data["nodes"].tolist()
+        names = dict(zip(nodes, data["names"].tolist()))
+        coordinates = {
+            v: (x, y) for v, (x, y) in zip(nodes, data["coordinates"].tolist())
+        }
+        edges = list(
+            zip(data["sources"].tolist(), data["targets"].tolist(),
+                data["values"].tolist())
+        )
+    return NamedGraph(nodes, edges, names, coordinates)
+
+
+def _write_cache(cache_file: str, mtime: float, file: str, G: NamedGraph) -> None:
+    """
+    Écrit le graphe `G` lu depuis `file` dans `cache_file`
+    """
+    nodes = list(G.nodes())
+    edges = G.edges()
+    numpy.savez(
+        cache_file,
+        mtime=mtime,
+        sha256=_file_hash(file),
+        nodes=numpy.array(nodes, dtype=numpy.int64),
+        names=numpy.array([G.names[v] for v in nodes]),
+        coordinates=numpy.array([G.coordinates.get(v, (0, 0)) for v in nodes],
+                                dtype=float).reshape(len(nodes), 2),
+        sources=numpy.array([v1 for v1, _, _ in edges], dtype=numpy.int64),
+        targets=numpy.array([v2 for _, v2, _ in edges], dtype=numpy.int64),
+        values=numpy.array([c for _, _, c in edges], dtype=float),
+    )
+
+
+def load_graph(file: str = "metro_complet.txt", cache: bool = True) -> NamedGraph:
+    """
+    Renvoie le graphe décrit par le fichier `file`
+
+    INPUT:
+
+        - file, un fichier au format de `metro_complet.txt`
+        - cache (default = True), si True le graphe est relu depuis
+          `file + ".npz"` quand ce cache est à jour, et le cache est
+          (ré)écrit sinon
+
+    Les sommets sont les identifiants numériques du fichier; leurs noms
+    et coordonnées sont dans les attributs `names` et `coordinates`.
+
+    EXAMPLES::
+
+        >>> import os, shutil, tempfile
+        >>> tmp = tempfile.mkdtemp()
+        >>> file = os.path.join(tmp, "metro.txt")
+        >>> _ = shutil.copy("metro_complet.txt", file)
+        >>> G = load_graph(file)
+        >>> os.path.exists(file + ".npz")
+        True
+        >>> H = load_graph(file)
+        >>> H.edges() == G.edges() and H.names == G.names
+        True
+        >>> shutil.rmtree(tmp)
+    """
+    if not cache:
+        return parse_graph(file)
+    cache_file = file + ".npz"
+    mtime = os.stat(file).st_mtime
+    if os.path.exists(cache_file):
+        G = _read_cache(cache_file, mtime, file)
+        if G is not None:
+            return G
+    G = parse_graph(file)
+    _write_cache(cache_file, mtime, file, G)
+    return G
@@ -1,19 +1,48 @@
 # -*- coding: utf-8 -*-
-from typing import List, Tuple, Union
-from graph import Graph, Node
+from typing import (
+    Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Set,
+    Tuple, TypeVar, Union
+)
+from graph import Graph
 from collections import deque
+import concurrent.futures
+import csv
+import hashlib
+import heapq
+import itertools
+import json
+import math
+import multiprocessing
+from multiprocessing.connection import Connection, wait
+import os
+import tempfile
+import time
+import tracemalloc
 import tqdm
 import copy
 import numpy
 
 Position = numpy.array
 
+# Un niveau: son numéro, le nom de son fichier, la liste des descriptions
+# de ses voitures ou un plateau (voir `Plateau.__init__`)
+Niveau = Union[int, str, List[str], "Plateau"]
+
+T = TypeVar("T")
+
+# Voisins envoyés d'un processus à un autre par le parcours parallèle: le
+# numéro de la part émettrice, et pour chaque état son (parent, déplacement)
+Paquet = Tuple[int, Dict[int, Tuple[int, str]]]
+
 # Une position est représentée par un tableau numpy (i,j)
 # - i: la ligne
 # - j: la colonne
 
 directions = {"R": (0, 1), "L": (0, -1), "U": (-1, 0), "D": (1, 0)}
 
+# Direction opposée, pour annuler un déplacement
+opposees = {"R": "L", "L": "R", "U": "D", "D": "U"}
+
 couleurs = {
     "X": "red",
     "A": "lightgreen",
@@ -56,17 +85,39 @@ class Voiture:
         array([1, 0])
         >>> Voiture(lettre='O', position=(3,2), longueur=3, direction='D')
         O3D32
+
+        Sur les grands plateaux, les champs peuvent être séparés par des
+        espaces, pour les positions ou longueurs à plusieurs chiffres::
+
+            >>> Voiture('T 4 D 10 2').cases()
+            [array([10,  2]), array([11,  2]), array([12,  2]), array([13,  2])]
+            >>> Voiture('T 4 D 1 2')
+            T4D12
+
+        La forme compacte compte exactement cinq caractères: les champs à
+        plusieurs chiffres exigent la forme avec espaces::
+
+            >>> Voiture('T4R102')
+            Traceback (most recent call last):
+            ...
+            ValueError: Description de voiture invalide: 'T4R102'
         """
         if s is not None:
-            lettre = s[0]
-            longueur = int(s[1])
-            direction = s[2]
-            position = (int(s[3]), int(s[4]))
+            champs = s.split()
+            if len(champs) == 5:
+                (lettre, longueur, direction) = (champs[0], int(champs[1]), champs[2])
+                position = (int(champs[3]), int(champs[4]))
+            elif len(champs) == 1 and len(champs[0]) == 5:
+                (c,) = champs
+                (lettre, longueur, direction) = (c[0], int(c[1]), c[2])
+                position = (int(c[3]), int(c[4]))
+            else:
+                raise ValueError("Description de voiture invalide: {!r}".format(s))
         if isinstance(direction, str):
             direction = directions[direction]
 
         assert isinstance(lettre, str) and len(lettre) == 1
-        assert isinstance(longueur, int) and 0 <= longueur and longueur <= 3
+        assert isinstance(longueur, int) and 0 <= longueur
 
         assert isinstance(position, tuple)
         assert len(position) == 2
@@ -170,22 +221,38 @@ class Voiture:
         """
         return self.avance(-1)
 
+    def nom_direction(self) -> str:
+        """
+        Renvoie la lettre de la direction de la voiture: "R", "L", "U" ou "D"
+
+            >>> from rush_hour import Voiture
+            >>> Voiture('T 4 D 10 2').nom_direction()
+            'D'
+        """
+        for nom, direction in directions.items():
+            if numpy.array_equal(direction, self.direction):
+                return nom
+        raise ValueError("Direction inconnue: {}".format(self.direction))
+
     def __repr__(self):
         """
         >>> from rush_hour import Voiture
         >>> Voiture('I3D32')
         I3D32
+        >>> Voiture('T 4 R 10 2')
+        T 4 R 10 2
         """
-        for direction_lettre, direction in directions.items():
-            if numpy.array_equal(direction, self.direction):
-                break
-        return "{}{}{}{}{}".format(
+        champs = (
             self.lettre,
             self.longueur,
-            direction_lettre,
+            self.nom_direction(),
             self.position[0],
             self.position[1],
         )
+        # Forme compacte tant que chaque nombre tient sur un chiffre
+        if all(0 <= x < 10 for x in champs[1:2] + champs[3:]):
+            return "{}{}{}{}{}".format(*champs)
+        return "{} {} {} {} {}".format(*champs)
 
 
 class Plateau:
@@ -193,7 +260,12 @@ class Plateau:
     Un objet immutable représentant l'état d'un plateau de Rush Hour
     """
 
-    def __init__(self, voitures: Union[List, List[str], int, None]):
+    def __init__(
+        self,
+        voitures: Union[List, List[str], int, str, "Plateau", None],
+        dimension: int = 6,
+        ligne_sortie: int = 2,
+    ):
         """
         Construit un plateau à partir d'une liste de descriptions de
         voitures, d'un nom de fichier contenant le niveau ou du numéro
@@ -241,16 +313,80 @@ class Plateau:
             | B O P|
             | BCC P|
             +------+
+
+        La taille du plateau et la ligne de la sortie sont données par les
+        paramètres `dimension` et `ligne_sortie`, ou par des lignes
+        `dimension n` et `sortie i` en tête de la description::
+
+            >>> plateau = Plateau(['dimension 8', 'sortie 3',
+            ...                    'X2R31', 'T 4 D 0 5', 'A3R70'])
+            >>> plateau.dimension, plateau.ligne_sortie
+            (8, 3)
+            >>> plateau
+            +--------+
+            |     T  |
+            |     T  |
+            |     T  |
+            | XX  T
+            |        |
+            |        |
+            |        |
+            |AAA     |
+            +--------+
+
+        Un plateau peut aussi être construit à partir d'un autre plateau,
+        dont il est une copie::
+
+            >>> Plateau(plateau) == plateau
+            True
+
+        Les voitures doivent être dans le plateau, sans se chevaucher::
+
+            >>> Plateau(['X2R21', 'T4D35'])
+            Traceback (most recent call last):
+            ...
+            ValueError: La voiture T sort du plateau
+            >>> Plateau(['X2R21', 'A3D02'])
+            Traceback (most recent call last):
+            ...
+            ValueError: La voiture A chevauche une autre voiture
         """
-        self.dimension = 6
-        self.ligne_sortie = 2
+        self.dimension = dimension
+        self.ligne_sortie = ligne_sortie
+        if isinstance(voitures, Plateau):
+            self.dimension = voitures.dimension
+            self.ligne_sortie = voitures.ligne_sortie
+            voitures = [repr(voiture) for voiture in voitures.voitures.values()]
         if isinstance(voitures, int):
             voitures = "RushHourDefis/Defi{:02d}.txt".format(voitures)
         if isinstance(voitures, str):
             with open(voitures) as file:
                 voitures = file.readlines()
-        voitures = [Voiture(s) for s in voitures]
-        self.voitures = {voiture.lettre: voiture for voiture in voitures}
+        descriptions = []
+        for ligne in voitures:
+            champs = ligne.split()
+            if not champs:
+                continue
+            if champs[0] == "dimension":
+                self.dimension = int(champs[1])
+            elif champs[0] == "sortie":
+                self.ligne_sortie = int(champs[1])
+            else:
+                descriptions.append(Voiture(ligne))
+        self.voitures = {voiture.lettre: voiture for voiture in descriptions}
+
+        occupation = 0
+        for voiture in descriptions:
+            lettre = voiture.lettre
+            for (i, j) in self._cases(voiture):
+                if not (0 <= i < self.dimension and 0 <= j < self.dimension):
+                    raise ValueError("La voiture {} sort du plateau".format(lettre))
+                if occupation >> (i * self.dimension + j) & 1:
+                    raise ValueError(
+                        "La voiture {} chevauche une autre voiture".format(lettre)
+                    )
+                occupation |= 1 << (i * self.dimension + j)
+        self._occupation = occupation
 
     def tableau(self) -> Tuple[str]:
         """
@@ -291,6 +427,38 @@ class Plateau:
             self._tableau = tuple("".join(ligne) for ligne in tableau)
         return self._tableau
 
+    @staticmethod
+    def _cases(voiture: Voiture) -> List[Tuple[int, int]]:
+        """
+        Variante de `Voiture.cases` renvoyant des couples d'entiers Python
+        """
+        (i, j) = voiture.position.tolist()
+        (di, dj) = voiture.direction.tolist()
+        return [(i + k * di, j + k * dj) for k in range(voiture.longueur)]
+
+    def occupation(self) -> int:
+        """
+        Renvoie les cases occupées sous forme d'entier: la case (i,j)
+        correspond au bit `i * dimension + j`
+
+            >>> from rush_hour import Plateau
+            >>> bin(Plateau(['A2R00', 'X2R21']).occupation())
+            '0b110000000000011'
+
+        Mémoization::
+
+            >>> plateau = Plateau(1)
+            >>> plateau.occupation() is plateau.occupation()
+            True
+        """
+        if not hasattr(self, "_occupation"):
+            occupation = 0
+            for voiture in self.voitures.values():
+                for (i, j) in self._cases(voiture):
+                    occupation |= 1 << (i * self.dimension + j)
+            self._occupation = occupation
+        return self._occupation
+
     def __repr__(self) -> str:
         """
         Renvoie un affichage de ce plateau
@@ -448,19 +616,67 @@ class Plateau:
             >>> plateau0.avance('A', -1)
             >>> plateau2.avance('Q')
         """
-        tableau = self.tableau()
+        if self._cases_libres(lettre, distance) < abs(distance):
+            return None
+        return self._deplacee(lettre, distance)
+
+    def _cases_libres(self, lettre: str, distance: int) -> int:
+        """
+        Renvoie le nombre de cases libres consécutives, dans la limite de
+        `abs(distance)`, devant la voiture `lettre` (derrière si
+        `distance` est négative)
+
+        Complexity: Linéaire sur `abs(distance)`
+        """
+        voiture = self.voitures[lettre]
+        occupation = self.occupation()
+        n = self.dimension
+        (i, j) = voiture.position.tolist()
+        (di, dj) = voiture.direction.tolist()
+        if distance < 0:
+            (i, j, di, dj) = (i - di, j - dj, -di, -dj)
+        else:
+            (i, j) = (i + di * voiture.longueur, j + dj * voiture.longueur)
+        libres = 0
+        while libres < abs(distance):
+            if not (0 <= i < n and 0 <= j < n) or occupation >> (i * n + j) & 1:
+                break
+            libres += 1
+            (i, j) = (i + di, j + dj)
+        return libres
+
+    def _deplacee(self, lettre: str, distance: int) -> "Plateau":
+        """
+        Renvoie le plateau où la voiture `lettre` a avancé de `distance`
+        cases, sans vérifier que ces cases sont libres
+
+        L'occupation et le tableau déjà calculés sont mis à jour en ne
+        modifiant que les cases quittées et atteintes par la voiture.
+        """
         voiture = copy.copy(self.voitures[lettre])
-        for step in range(abs(distance)):
-            (i, j) = voiture.case_devant() if distance > 0 else voiture.case_derriere()
-            if i < 0 or i >= self.dimension or j < 0 or j >= self.dimension:
-                return None
-            if tableau[i][j] != " ":
-                return None
-            voiture.avance(1 if distance > 0 else -1)
+        voiture.avance(distance)
         plateau = copy.copy(self)
-        del plateau._tableau  # TODO: Define a copy operator instead
         plateau.voitures = copy.copy(self.voitures)
         plateau.voitures[lettre] = voiture
+
+        anciennes = self._cases(self.voitures[lettre])
+        nouvelles = self._cases(voiture)
+        n = self.dimension
+        if hasattr(self, "_occupation"):
+            masque = 0
+            for (i, j) in anciennes + nouvelles:
+                masque ^= 1 << (i * n + j)
+            plateau._occupation = self._occupation ^ masque
+        if hasattr(self, "_tableau"):
+            lignes = {i: list(self._tableau[i]) for (i, _) in anciennes + nouvelles}
+            for (i, j) in anciennes:
+                lignes[i][j] = " "
+            for (i, j) in nouvelles:
+                lignes[i][j] = lettre
+            tableau = list(self._tableau)
+            for i, ligne in lignes.items():
+                tableau[i] = "".join(ligne)
+            plateau._tableau = tuple(tableau)
         return plateau
 
     def recule(self, lettre: str) -> Union["Plateau", None]:
@@ -549,9 +765,9 @@ class Plateau:
         >>> plateau.deplace('R', 'L', 2)
         >>> plateau.deplace('A', 'L', 1)
         """
-        if len(lettre) == 3:
+        if len(lettre) >= 3:
             direction = lettre[1]
-            distance = int(lettre[2])
+            distance = int(lettre[2:])
             lettre = lettre[0]
         direction = Position(directions[direction])
         if (abs(direction) != abs(self.voitures[lettre].direction)).any():
@@ -603,17 +819,569 @@ class Plateau:
                     +------+}
         """
         voisins = {}
-        for lettre in self.voitures.keys():
-            for direction in directions.keys():
-                for distance in range(1, self.dimension):
-                    voisin = self.deplace(lettre, direction, distance)
-                    if not voisin:
-                        break
-                    deplacement = "{}{}{}".format(lettre, direction, distance)
-                    voisins[deplacement] = voisin
+        for lettre, voiture in self.voitures.items():
+            # Seules les deux directions de l'axe de la voiture sont possibles
+            direction = voiture.nom_direction()
+            for sens, nom in ((1, direction), (-1, opposees[direction])):
+                libres = self._cases_libres(lettre, sens * (self.dimension - 1))
+                for distance in range(1, libres + 1):
+                    deplacement = "{}{}{}".format(lettre, nom, distance)
+                    voisins[deplacement] = self._deplacee(lettre, sens * distance)
+        return voisins
+
+
+class Encodage:
+    """
+    Un codage compact des plateaux ayant les mêmes voitures
+
+    Une table statique décrit chaque voiture (lettre, longueur, axe et
+    ligne ou colonne fixe). Seule la position de chaque voiture le long
+    de son axe (l'indice de sa case la plus en haut ou la plus à gauche)
+    varie; un état est un entier où ces positions sont rangées côte à
+    côte, la k-ième sur juste assez de bits (`largeurs[k]`) pour ses
+    `dimension - longueur + 1` positions possibles.
+
+    Les déplacements sont calculés sur une grille d'occupation codée par
+    un entier (le bit `i * dimension + j` pour la case `(i, j)`).
+
+        >>> from rush_hour import Encodage, Plateau
+        >>> plateau = Plateau(1)
+        >>> codage = Encodage(plateau)
+        >>> etat = codage.encode(plateau)
+        >>> codage.decode(etat) == plateau
+        True
+        >>> sorted(codage.voisins(etat)) == sorted(
+        ...     (coup, codage.encode(p)) for coup, p in plateau.voisins().items())
+        True
+    """
+
+    def __init__(self, plateau: "Plateau"):
+        self.dimension = plateau.dimension
+        self.ligne_sortie = plateau.ligne_sortie
+        self.lettres: List[str] = []
+        self.longueurs: List[int] = []
+        self.horizontales: List[bool] = []
+        # Ligne (voiture horizontale) ou colonne (voiture verticale) de la voiture
+        self.fixes: List[int] = []
+        # Direction de la description d'origine, pour reconstruire le plateau
+        self.directions: List[str] = []
+        for voiture in plateau.voitures.values():
+            direction = voiture.nom_direction()
+            self.lettres.append(voiture.lettre)
+            self.longueurs.append(voiture.longueur)
+            self.horizontales.append(direction in "RL")
+            self.fixes.append(
+                int(voiture.position[0 if direction in "RL" else 1])
+            )
+            self.directions.append(direction)
+        self.indices = {lettre: k for k, lettre in enumerate(self.lettres)}
+        # La position de la k-ième voiture occupe `largeurs[k]` bits, à
+        # partir du bit `decalages[k]`; un état tient sur `bits` bits
+        self.largeurs = [(self.dimension - longueur).bit_length()
+                         for longueur in self.longueurs]
+        self.decalages = [sum(self.largeurs[:k]) for k in range(len(self.largeurs))]
+        self.masques = [(1 << largeur) - 1 for largeur in self.largeurs]
+        self.bits = sum(self.largeurs)
+
+        # `cellules[k][i]`: bit de la i-ème case de la ligne de la voiture `k`
+        self.cellules = [
+            [
+                1 << (f * self.dimension + i if h else i * self.dimension + f)
+                for i in range(self.dimension)
+            ]
+            for h, f in zip(self.horizontales, self.fixes)
+        ]
+        # `cases[k][p]`: cases occupées par la voiture `k` en position `p`
+        self.cases = [
+            [
+                sum(cellules[p:p + longueur])
+                for p in range(self.dimension - longueur + 1)
+            ]
+            for cellules, longueur in zip(self.cellules, self.longueurs)
+        ]
+        # `coups[k][d]`: nom du déplacement de la voiture `k` de `d` cases
+        self.coups = [
+            {
+                d: "{}{}{}".format(
+                    lettre, ("R" if h else "D") if d > 0 else ("L" if h else "U"),
+                    abs(d)
+                )
+                for d in range(1 - self.dimension, self.dimension)
+                if d != 0
+            }
+            for lettre, h in zip(self.lettres, self.horizontales)
+        ]
+
+    def positions(self, etat: int) -> List[int]:
+        """
+        Renvoie la position de chaque voiture dans l'état `etat`
+        """
+        return [
+            (etat >> decalage) & masque
+            for decalage, masque in zip(self.decalages, self.masques)
+        ]
+
+    def occupation(self, positions: List[int]) -> int:
+        """
+        Renvoie la grille d'occupation des voitures aux `positions` données
+        """
+        occupation = 0
+        for cases, p in zip(self.cases, positions):
+            occupation |= cases[p]
+        return occupation
+
+    def encode(self, plateau: "Plateau") -> int:
+        """
+        Renvoie l'état codant `plateau`
+
+            >>> from rush_hour import Encodage, Plateau
+            >>> plateau = Plateau(['A2R00', 'X2R20', 'O3U42'])
+            >>> Encodage(plateau).encode(plateau)
+            128
+        """
+        etat = 0
+        for k, lettre in enumerate(self.lettres):
+            voiture = plateau.voitures[lettre]
+            axe = 1 if self.horizontales[k] else 0
+            p = min(int(case[axe]) for case in voiture.cases())
+            etat |= p << self.decalages[k]
+        return etat
+
+    def decode(self, etat: int) -> "Plateau":
+        """
+        Renvoie le plateau codé par `etat`
+
+            >>> from rush_hour import Encodage, Plateau
+            >>> plateau = Plateau(['A2R00', 'X2R20', 'O3U42'])
+            >>> codage = Encodage(plateau)
+            >>> codage.decode(128)
+            +------+
+            |AA    |
+            |      |
+            |XXO
+            |  O   |
+            |  O   |
+            |      |
+            +------+
+            >>> codage.decode(128).voitures['O']
+            O3U42
+        """
+        voitures = []
+        for k, p in enumerate(self.positions(etat)):
+            direction = self.directions[k]
+            # Les voitures dirigées vers la gauche ou le haut sont repérées
+            # par leur case la plus à droite ou la plus en bas
+            if direction in "LU":
+                p += self.longueurs[k] - 1
+            f = self.fixes[k]
+            (i, j) = (f, p) if self.horizontales[k] else (p, f)
+            voiture = Voiture(lettre=self.lettres[k], longueur=self.longueurs[k],
+                              direction=direction, position=(i, j))
+            voitures.append(repr(voiture))
+        return Plateau(voitures, self.dimension, self.ligne_sortie)
+
+    def est_gagnant(self, etat: int) -> bool:
+        """
+        Teste si la voiture `X` est devant la sortie dans l'état `etat`
+        """
+        k = self.indices["X"]
+        p = (etat >> self.decalages[k]) & self.masques[k]
+        return p + self.longueurs[k] == self.dimension
+
+    def sont_gagnants(self, etats: numpy.ndarray) -> numpy.ndarray:
+        """
+        Variante vectorisée de `est_gagnant` sur un tableau d'états
+        `numpy.uint64`
+
+            >>> from rush_hour import Encodage, Plateau
+            >>> codage = Encodage(Plateau(1))
+            >>> etats = numpy.array(codage.etats_gagnants()[:3] + [0],
+            ...                     dtype=numpy.uint64)
+            >>> codage.sont_gagnants(etats)
+            array([ True,  True,  True, False])
+        """
+        k = self.indices["X"]
+        p = (etats >> numpy.uint64(self.decalages[k])) & numpy.uint64(self.masques[k])
+        return p == self.dimension - self.longueurs[k]
+
+    def deplace(self, etat: int, coup: str) -> int:
+        """
+        Renvoie l'état obtenu en jouant `coup` (par exemple 'AR2') depuis
+        `etat`, sans vérifier que le déplacement est possible
+
+            >>> from rush_hour import Encodage, Plateau
+            >>> plateau = Plateau(1)
+            >>> codage = Encodage(plateau)
+            >>> etat = codage.deplace(codage.encode(plateau), 'CL3')
+            >>> codage.decode(etat) == plateau.deplace('CL3')
+            True
+        """
+        k = self.indices[coup[0]]
+        d = int(coup[2:])
+        if coup[1] in "LU":
+            d = -d
+        return etat + (d << self.decalages[k])
+
+    def etats_gagnants(self) -> List[int]:
+        """
+        Renvoie tous les états où la voiture `X` est devant la sortie
+
+        Les autres voitures sont placées de toutes les façons possibles
+        sans chevauchement, qu'elles soient ou non atteignables depuis un
+        plateau donné.
+
+            >>> from rush_hour import Encodage, Plateau
+            >>> codage = Encodage(Plateau(['A2R00', 'X2R20', 'O3U42']))
+            >>> gagnants = codage.etats_gagnants()
+            >>> len(gagnants)
+            18
+            >>> all(codage.decode(etat).est_gagnant() for etat in gagnants)
+            True
+            >>> codage.decode(gagnants[0])
+            +------+
+            |AAO   |
+            |  O   |
+            |  O XX
+            |      |
+            |      |
+            |      |
+            +------+
+        """
+        x = self.indices["X"]
+        res = []
+
+        # Placement des voitures à partir de la k-ième, par retour sur trace
+        def place(k: int, occupation: int, etat: int) -> None:
+            if k == len(self.lettres):
+                res.append(etat)
+                return
+            if k == x:
+                positions = [self.dimension - self.longueurs[k]]
+            else:
+                positions = list(range(len(self.cases[k])))
+            for p in positions:
+                if not occupation & self.cases[k][p]:
+                    place(k + 1, occupation | self.cases[k][p],
+                          etat | (p << self.decalages[k]))
+
+        place(0, 0, 0)
+        return res
+
+    def bloquantes(self, etat: int) -> int:
+        """
+        Minorant du nombre de coups restants: un coup pour `X` s'il n'est
+        pas devant la sortie, plus un par voiture entre `X` et la sortie
+
+            >>> from rush_hour import Encodage, Plateau
+            >>> plateau = Plateau(40); plateau
+            +------+
+            |OAA B |
+            |OCD BP|
+            |OCDXXP
+            |QQQE P|
+            |  FEKK|
+            |HHFII |
+            +------+
+            >>> codage = Encodage(plateau)
+            >>> codage.bloquantes(codage.encode(plateau))
+            2
+        """
+        return len(self._bloquantes(etat)[0]) + (0 if self.est_gagnant(etat) else 1)
+
+    def bloquantes_indirectes(self, etat: int) -> int:
+        """
+        Minorant plus fort que `bloquantes`: chaque voiture verticale qui
+        bloque `X` doit libérer la ligne de sortie en montant ou en
+        descendant, ce qui oblige à déplacer au préalable les voitures qui
+        lui barrent ce chemin. On ajoute le maximum, sur les voitures
+        bloquantes, du plus petit nombre de voitures à déplacer ainsi.
+
+        Ces voitures sont dans la même colonne que la voiture bloquante,
+        hors de la ligne de sortie: elles ne sont ni `X` ni des voitures
+        bloquantes et n'ont pas été comptées.
+
+            >>> from rush_hour import Encodage, Plateau
+            >>> plateau = Plateau(40)
+            >>> codage = Encodage(plateau)
+            >>> codage.bloquantes_indirectes(codage.encode(plateau))
+            3
+        """
+        bloquantes, positions, grille = self._bloquantes(etat)
+        h = len(bloquantes) + (0 if self.est_gagnant(etat) else 1)
+        e = self.ligne_sortie
+        supplement = 0
+        for k in bloquantes:
+            if self.horizontales[k]:
+                continue
+            p = positions[k]
+            longueur = self.longueurs[k]
+            colonne = self.fixes[k]
+            options = []
+            # Vers le haut: la voiture doit finir au-dessus de la ligne `e`
+            if e - longueur >= 0:
+                options.append(range(e - longueur, p))
+            # Vers le bas: la voiture doit finir en dessous de la ligne `e`
+            if e + longueur < self.dimension:
+                options.append(range(p + longueur, e + longueur + 1))
+            if options:
+                supplement = max(supplement, min(
+                    len({grille[i * self.dimension + colonne] for i in lignes}
+                        - {None})
+                    for lignes in options
+                ))
+        return h + supplement
+
+    def _bloquantes(
+        self, etat: int
+    ) -> Tuple[List[int], List[int], List[Optional[int]]]:
+        """
+        Renvoie les indices des voitures entre `X` et la sortie, les
+        positions des voitures, et la grille associant à chaque case
+        l'indice de la voiture qui l'occupe (ou `None`)
+        """
+        positions = self.positions(etat)
+        grille: List[Optional[int]] = [None] * (self.dimension * self.dimension)
+        for k, p in enumerate(positions):
+            f = self.fixes[k]
+            for i in range(p, p + self.longueurs[k]):
+                case = f * self.dimension + i if self.horizontales[k] else \
+                    i * self.dimension + f
+                grille[case] = k
+        x = self.indices["X"]
+        debut = self.ligne_sortie * self.dimension
+        bloquantes = []
+        for j in range(positions[x] + self.longueurs[x], self.dimension):
+            occupant = grille[debut + j]
+            if occupant is not None and occupant not in bloquantes:
+                bloquantes.append(occupant)
+        return bloquantes, positions, grille
+
+    def voisins(self, etat: int) -> List[Tuple[str, int]]:
+        """
+        Renvoie les couples `(coup, etat)` des états atteignables en un
+        seul déplacement depuis `etat`
+
+        Seuls les déplacements le long de l'axe de chaque voiture sont
+        considérés, et on arrête d'avancer dès qu'une case est occupée.
+
+            >>> from rush_hour import Encodage, Plateau
+            >>> plateau = Plateau(['A2R00', 'X2R20', 'O3U42'])
+            >>> codage = Encodage(plateau)
+            >>> [coup for coup, _ in codage.voisins(codage.encode(plateau))]
+            ['AR1', 'AR2', 'AR3', 'AR4', 'OD1', 'OU1', 'OU2']
+        """
+        positions = self.positions(etat)
+        occupation = self.occupation(positions)
+        voisins = []
+        for k, p in enumerate(positions):
+            cellules = self.cellules[k]
+            longueur = self.longueurs[k]
+            coups = self.coups[k]
+            decalage = self.decalages[k]
+            # Vers la droite ou le bas
+            for q in range(p + longueur, self.dimension):
+                if occupation & cellules[q]:
+                    break
+                d = q - p - longueur + 1
+                voisins.append((coups[d], etat + (d << decalage)))
+            # Vers la gauche ou le haut
+            for q in range(p - 1, -1, -1):
+                if occupation & cellules[q]:
+                    break
+                d = q - p
+                voisins.append((coups[d], etat + (d << decalage)))
         return voisins
 
 
+class Index:
+    """
+    Table précalculée, pour chaque état d'une composante connexe du graphe
+    des plateaux, du nombre minimal de coups restants et d'un meilleur coup
+
+    La table est obtenue par un unique parcours en largeur depuis tous les
+    états gagnants de la composante: répondre à une demande d'indice ou
+    jouer une solution optimale ne demande alors plus aucune recherche.
+
+        >>> from rush_hour import Index, Plateau
+        >>> index = Index.construit(Plateau(1))
+        >>> len(index)
+        1247
+        >>> index.distance(Plateau(1))
+        8
+        >>> plateau = Plateau(1).deplace(index.coup(Plateau(1)))
+        >>> index.distance(plateau)
+        7
+    """
+
+    def __init__(
+        self, codage: Encodage, reference: "Plateau", table: Dict[int, Tuple[int, str]]
+    ):
+        self.codage = codage
+        # Un plateau de la composante, pour sauvegarder le codage
+        self.reference = reference
+        # État -> (nombre minimal de coups restants, meilleur coup)
+        self.table = table
+
+    @staticmethod
+    def signature(plateau: "Plateau") -> Tuple:
+        """
+        Renvoie ce qui caractérise les plateaux d'un même niveau: les
+        voitures, leur longueur, leur axe et leur ligne ou colonne
+
+            >>> from rush_hour import Index, Plateau
+            >>> Index.signature(Plateau(1)) == Index.signature(
+            ...     Plateau(1).deplace('CL3'))
+            True
+            >>> Index.signature(Plateau(1)) == Index.signature(Plateau(3))
+            False
+        """
+        codage = Encodage(plateau)
+        return (
+            codage.dimension,
+            codage.ligne_sortie,
+            tuple(sorted(zip(codage.lettres, codage.longueurs,
+                             codage.horizontales, codage.fixes))),
+        )
+
+    @staticmethod
+    def empreinte(signature: Tuple) -> str:
+        """
+        Renvoie une courte chaîne qui identifie `signature`, utilisée dans
+        le nom des fichiers d'index
+
+            >>> from rush_hour import Index, Plateau
+            >>> Index.empreinte(Index.signature(Plateau(1)))
+            '...'
+            >>> len(_)
+            12
+        """
+        texte = json.dumps(signature, separators=(",", ":"))
+        return hashlib.sha1(texte.encode()).hexdigest()[:12]
+
+    @staticmethod
+    def construit(plateau: "Plateau") -> "Index":
+        """
+        Construit l'index de la composante connexe de `plateau`
+        """
+        codage = Encodage(plateau)
+        e = codage.encode(plateau)
+
+        # Parcours de la composante connexe de `e`
+        composante = {e}
+        todo = deque([e])
+        while todo:
+            v = todo.popleft()
+            for _, w in codage.voisins(v):
+                if w not in composante:
+                    composante.add(w)
+                    todo.append(w)
+
+        # Parcours en largeur depuis tous les états gagnants de la composante.
+        # Les déplacements étant réversibles, il reste dans la composante.
+        table = {f: (0, "") for f in composante if codage.est_gagnant(f)}
+        todo = deque(table)
+        while todo:
+            v = todo.popleft()
+            d = table[v][0] + 1
+            for move, w in codage.voisins(v):
+                if w not in table:
+                    # Le meilleur coup depuis `w` ramène en `v`
+                    table[w] = (d, move[0] + opposees[move[1]] + move[2:])
+                    todo.append(w)
+        return Index(codage, plateau, table)
+
+    def __len__(self) -> int:
+        return len(self.table)
+
+    def distance(self, plateau: "Plateau") -> Optional[int]:
+        """
+        Renvoie le nombre minimal de coups pour résoudre `plateau`, ou
+        `None` si ce plateau n'a pas de solution
+        """
+        res = self.table.get(self.codage.encode(plateau))
+        return None if res is None else res[0]
+
+    def coup(self, plateau: "Plateau") -> Optional[str]:
+        """
+        Renvoie un premier coup d'une solution optimale depuis `plateau`, ou
+        `None` si ce plateau est gagnant ou n'a pas de solution
+        """
+        res = self.table.get(self.codage.encode(plateau))
+        return None if res is None or res[0] == 0 else res[1]
+
+    def solution(self, plateau: "Plateau") -> Optional[List[str]]:
+        """
+        Renvoie une solution optimale depuis `plateau`, ou `None`
+
+        Complexity: Linéaire sur la longueur de la solution
+        """
+        etat = self.codage.encode(plateau)
+        if etat not in self.table:
+            return None
+        res = []
+        (d, move) = self.table[etat]
+        while d > 0:
+            res.append(move)
+            etat = self.codage.deplace(etat, move)
+            (d, move) = self.table[etat]
+        return res
+
+    def sauvegarde(self, fichier: str) -> None:
+        """
+        Écrit l'index dans le fichier `fichier` (format `.npz` de numpy)
+        """
+        etats = sorted(self.table)
+        numpy.savez_compressed(
+            fichier,
+            reference=numpy.array(
+                ["dimension {}".format(self.reference.dimension),
+                 "sortie {}".format(self.reference.ligne_sortie)]
+                + [repr(v) for v in self.reference.voitures.values()]
+            ),
+            etats=numpy.array(etats, dtype=numpy.uint64),
+            distances=numpy.array([self.table[v][0] for v in etats], dtype=numpy.int16),
+            coups=numpy.array([self.table[v][1] for v in etats]),
+        )
+
+    @staticmethod
+    def charge(fichier: str) -> "Index":
+        """
+        Relit un index écrit par `sauvegarde`
+
+            >>> import os, tempfile
+            >>> from rush_hour import Index, Plateau
+            >>> index = Index.construit(Plateau(3))
+            >>> fichier = os.path.join(tempfile.mkdtemp(), "Defi03.npz")
+            >>> index.sauvegarde(fichier)
+            >>> Index.charge(fichier).table == index.table
+            True
+        """
+        with numpy.load(fichier) as data:
+            reference = Plateau(data["reference"].tolist())
+            table = dict(zip(
+                data["etats"].tolist(),
+                zip(data["distances"].tolist(), data["coups"].tolist()),
+            ))
+        return Index(Encodage(reference), reference, table)
+
+
+class Resolution(NamedTuple):
+    """
+    Le résultat d'une recherche de solution
+    """
+
+    # Liste des déplacements, ou `None` si le niveau n'a pas de solution
+    coups: Optional[List[str]]
+    # Vrai si la solution est garantie de longueur minimale
+    optimal: bool
+    # Nombre d'états dont on a calculé les voisins
+    etats_explores: int
+    # Pic des allocations de Python pendant la recherche, en octets
+    # (`tracemalloc`), ou `None` s'il n'a pas été mesuré; ce n'est pas la
+    # mémoire résidente: les fichiers projetés en mémoire n'y figurent pas
+    pic_allocations: Optional[int] = None
+
+
 class RushHour:
     solutions = {
         1: ["CL3", "OD3", "AR1", "PU1", "BU1", "RL2", "QD2", "XR3"],
@@ -635,9 +1403,24 @@ class RushHour:
             "XR3",
         ],
     }
+    # Heuristiques de `Encodage` qui minorent le nombre de coups restants:
+    # guidés par l'une d'elles, A* et IDA* trouvent une solution optimale
+    heuristiques_minorantes = ("bloquantes", "bloquantes_indirectes")
+    # Stratégies de parcours en largeur, dont la solution est toujours optimale
+    strategies_exactes = ("bfs", "bidirectional", "parallel", "couches",
+                          "externe", "index")
+    # Clés des résultats de `solve_all`, colonnes des rapports de `rapport`
+    champs_rapport = ["niveau", "coups", "longueur", "etats_explores", "secondes"]
+    # Nombre maximal d'index gardés en mémoire par `RushHour.index`
+    taille_cache_index = 4
+    # Index déjà construits ou chargés avec leur `Index.signature`, du moins
+    # récemment utilisé au plus récemment utilisé
+    _index: List[Tuple[Tuple, Index]] = []
+    # Signatures pour lesquelles le dossier des index a déjà été parcouru
+    _charges: Set[Tuple] = set()
 
     @staticmethod
-    def niveaux():
+    def niveaux() -> List[int]:
         """
         Renvoie la liste des niveaux disponibles
 
@@ -686,73 +1469,1196 @@ class RushHour:
         return plateau.est_gagnant()
 
     @staticmethod
-    def __parcours_largeur(e: Node) -> Tuple[Node, Graph]:
+    def __parcours_largeur(
+        codage: Encodage, e: int
+    ) -> Tuple[Optional[int], Dict[int, Tuple[int, str]], int]:
         """
-        :param e: Plateau de départ
-        :return: Tuple du plateau d'arrivée et graphe des recherches
+        :param codage: Codage des plateaux du niveau
+        :param e: État de départ
+        :return: Triplet de l'état d'arrivée (`None` s'il n'y en a pas), du
+                 dictionnaire associant à chaque état rencontré le couple
+                 (état précédent, déplacement) et du nombre d'états développés
         """
 
-        marked = {e}  # L'ensemble des sommets déjà rencontrés
-        todo = [e]  # L'ensemble des sommets déjà rencontrés, mais pas encore traités
+        # L'ensemble des sommets déjà rencontrés, avec le moyen de les atteindre
+        parents = {e: (e, "")}
+        # Les sommets déjà rencontrés, mais pas encore traités
+        todo = deque([e])
+        explores = 0
 
-        g = Graph(directed=True)  # Graphe des plateaux avec arêtes des déplacements
-        stop = False  # Arrêt de la boucle
-        f = None  # Plateau d'arrivée
+        if codage.est_gagnant(e):
+            return (e, parents, explores)
 
-        while todo and not stop:
+        while todo:
             # Invariants:
-            # - Si `v` est dans `marked`, alors il y a un chemin de `u` à `v`
-            # - Si `v` est dans `marked` et pas dans `todo`
-            #   alors tous les voisins de `v` sont dans dans `marked`
-            v = todo.pop(0)
-            g.add_node(v)
-
-            voisins = v.voisins()
-            for move in voisins:
-                w = voisins[move]
-
-                if w.est_gagnant():
-                    stop = True
-                    f = w
-
-                if w not in marked:
-                    g.add_node(w)
-                    g.set_edge_capacity(v, w, move)
-                    marked.add(w)
+            # - Si `v` est dans `parents`, alors il y a un chemin de `u` à `v`
+            # - Si `v` est dans `parents` et pas dans `todo`
+            #   alors tous les voisins de `v` sont dans dans `parents`
+            v = todo.popleft()
+            explores += 1
+            for move, w in codage.voisins(v):
+                if w not in parents:
+                    parents[w] = (v, move)
+                    # Le premier plateau gagnant rencontré est à distance
+                    # minimale car les états sont traités par distance croissante
+                    if codage.est_gagnant(w):
+                        return (w, parents, explores)
                     todo.append(w)
 
-        return (f, g)
+        return (None, parents, explores)
+
+    @staticmethod
+    def __parcours_parallele(
+        codage: Encodage, e: int, workers: int
+    ) -> Tuple[Optional[List[str]], int]:
+        """
+        Parcours en largeur couche par couche, réparti sur `workers` processus
+
+        Chaque processus est responsable d'une part des états, choisie par
+        `_part`: il conserve leurs parents et développe ceux de la couche
+        courante. Les voisins obtenus sont regroupés par part et envoyés
+        directement au processus responsable, par sa file de réception; il
+        élimine ceux qu'il a déjà rencontrés pour former sa part de la
+        couche suivante. Le processus principal ne fait que synchroniser
+        les couches: il ne reçoit que leur taille et un éventuel état
+        gagnant.
+
+        :param codage: Codage des plateaux du niveau
+        :param e: État de départ
+        :param workers: Nombre de processus
+        :return: Couple de la liste des déplacements (`None` s'il n'y a pas
+                 de solution) et du nombre d'états développés
+        """
+        if codage.est_gagnant(e):
+            return ([], 0)
+        boites: List["multiprocessing.Queue[Paquet]"] = [
+            multiprocessing.Queue() for _ in range(workers)
+        ]
+        connexions = []
+        processus = []
+        try:
+            for k in range(workers):
+                (parent, enfant) = multiprocessing.Pipe()
+                p = multiprocessing.Process(
+                    target=_parcours_part,
+                    args=(codage, e, k, workers, enfant, boites),
+                    daemon=True,
+                )
+                p.start()
+                # Seul le processus fils garde son extrémité: s'il s'arrête,
+                # `recv` lève EOFError au lieu d'attendre indéfiniment
+                enfant.close()
+                connexions.append(parent)
+                processus.append(p)
+
+            # Attend la réponse de chacune des `parts`; un processus arrêté
+            # bloquerait les autres, qui attendent ses voisins
+            def recevoir(parts: List[int]) -> List[Any]:
+                reponses: Dict[int, Any] = {}
+                while len(reponses) < len(parts):
+                    prets = wait([connexions[k] for k in parts if k not in reponses]
+                                 + [p.sentinel for p in processus])
+                    if any(p.sentinel in prets for p in processus):
+                        raise RuntimeError(
+                            "Un processus du parcours parallèle s'est arrêté"
+                        )
+                    for k in parts:
+                        if connexions[k] in prets:
+                            reponses[k] = connexions[k].recv()
+                return [reponses[k] for k in parts]
+
+            explores = 0
+            taille = 1
+            while True:
+                # Invariant: la couche courante, de `taille` états, ne contient
+                # aucun état gagnant
+                explores += taille
+                for connexion in connexions:
+                    connexion.send(("developpe", None))
+                reponses = recevoir(list(range(workers)))
+                gagnants = [f for _, f in reponses if f is not None]
+                if gagnants:
+                    f = gagnants[0]
+                    break
+                taille = sum(t for t, _ in reponses)
+                if taille == 0:
+                    return (None, explores)
+
+            # Remontée du chemin, en demandant chaque parent à sa part
+            coups = []
+            w = f
+            while True:
+                k = _part(w, workers)
+                connexions[k].send(("parent", w))
+                (v, move) = recevoir([k])[0]
+                if v == w:
+                    break
+                coups.append(move)
+                w = v
+            coups.reverse()
+            return (coups, explores)
+        except BaseException:
+            # Les autres processus peuvent attendre indéfiniment les voisins
+            # d'un processus arrêté
+            for p in processus:
+                p.terminate()
+            raise
+        finally:
+            for connexion in connexions:
+                try:
+                    connexion.send(("fin", None))
+                except OSError:
+                    pass  # Processus déjà arrêté
+                connexion.close()
+            for p in processus:
+                p.join()
+            for boite in boites:
+                boite.close()
+
+    @staticmethod
+    def __parcours_couches(
+        codage: Encodage, e: int
+    ) -> Tuple[Optional[List[str]], int]:
+        """
+        Parcours en largeur dont chaque couche est un tableau trié d'états
+        `numpy.uint64`, à 8 octets par état
+
+        Les déplacements étant réversibles, les voisins d'un état de la
+        couche `d` sont dans les couches `d-1`, `d` ou `d+1`: il suffit
+        d'éliminer ceux des deux dernières couches pour former la suivante.
+        Le chemin est retrouvé à la fin en remontant les couches, en
+        cherchant à chaque fois un voisin dans la couche précédente.
+
+        :param codage: Codage des plateaux du niveau, sur au plus 64 bits
+        :param e: État de départ
+        :return: Couple de la liste des déplacements (`None` s'il n'y a pas
+                 de solution) et du nombre d'états développés
+        """
+        if codage.bits > 64:
+            raise ValueError("Les états ne tiennent pas sur 64 bits")
+        couches = [numpy.array([e], dtype=numpy.uint64)]
+        precedente = numpy.empty(0, dtype=numpy.uint64)
+        explores = 0
+        while True:
+            # Invariant: `couches[d]` contient exactement les états à
+            # distance `d` de `e`, et aucun n'est gagnant pour `d` < la
+            # dernière couche
+            courante = couches[-1]
+            if len(courante) == 0:
+                return (None, explores)
+            gagnants = courante[codage.sont_gagnants(courante)]
+            if len(gagnants):
+                break
+            explores += len(courante)
+            suivante = numpy.unique(numpy.fromiter(
+                (w for v in courante.tolist() for _, w in codage.voisins(v)),
+                dtype=numpy.uint64,
+            ))
+            deja_vus = _contient(precedente, suivante) | _contient(courante, suivante)
+            precedente = courante
+            couches.append(suivante[~deja_vus])
+
+        # Remontée du chemin d'un état gagnant jusqu'à `e`
+        coups = []
+        w = int(gagnants[0])
+        for couche in reversed(couches[:-1]):
+            for move, v in codage.voisins(w):
+                if _contient(couche, numpy.array([v], dtype=numpy.uint64))[0]:
+                    # Le déplacement de `v` à `w` est l'inverse de `move`
+                    coups.append(move[0] + opposees[move[1]] + move[2:])
+                    w = v
+                    break
+        coups.reverse()
+        return (coups, explores)
+
+    @staticmethod
+    def __parcours_externe(
+        codage: Encodage, e: int, memoire: int
+    ) -> Tuple[Optional[List[str]], int]:
+        """
+        Parcours en largeur en mémoire externe: chaque couche est un fichier
+        d'états `uint64` triés, dont on ne charge que des blocs
+
+        Pour former la couche suivante, la couche courante est développée
+        par blocs; les voisins de chaque bloc sont triés et écrits dans un
+        fichier. Ces fichiers sont ensuite fusionnés (`_fusion`), en
+        plusieurs passes s'ils sont trop nombreux (`_reduit`) pour que le
+        nombre de fichiers ouverts reste borné, et les états déjà présents
+        dans les couches précédente et courante sont éliminés par recherche
+        dichotomique dans leurs fichiers projetés en mémoire.
+
+        :param codage: Codage des plateaux du niveau, sur au plus 64 bits
+        :param e: État de départ
+        :param memoire: Budget mémoire approximatif, en octets, pour les
+                        blocs d'états
+        :return: Couple de la liste des déplacements (`None` s'il n'y a pas
+                 de solution) et du nombre d'états développés
+        """
+        if codage.bits > 64:
+            raise ValueError("Les états ne tiennent pas sur 64 bits")
+        # Nombre d'états chargés à la fois: un bloc d'états voisins, ou les
+        # voisins d'un bloc de la couche courante (une vingtaine par état)
+        bloc = max(1, memoire // 8)
+        developpes = max(1, bloc // 32)
+
+        with tempfile.TemporaryDirectory() as dossier:
+            couches = [os.path.join(dossier, "couche0")]
+            numpy.array([e], dtype=numpy.uint64).tofile(couches[0])
+            precedente = numpy.empty(0, dtype=numpy.uint64)
+            explores = 0
+            while True:
+                # Invariant: le fichier `couches[d]` contient exactement les
+                # états à distance `d` de `e`, triés
+                courante = _lit_couche(couches[-1])
+                if len(courante) == 0:
+                    return (None, explores)
+                gagnant = None
+                for debut in range(0, len(courante), bloc):
+                    morceau = courante[debut:debut + bloc]
+                    gagnants = morceau[codage.sont_gagnants(morceau)]
+                    if len(gagnants):
+                        gagnant = int(gagnants[0])
+                        break
+                if gagnant is not None:
+                    break
+                explores += len(courante)
+
+                runs: List[str] = []
+                for debut in range(0, len(courante), developpes):
+                    voisins = numpy.unique(numpy.fromiter(
+                        (w for v in courante[debut:debut + developpes].tolist()
+                         for _, w in codage.voisins(v)),
+                        dtype=numpy.uint64,
+                    ))
+                    runs.append(os.path.join(dossier, "run{}".format(len(runs))))
+                    voisins.tofile(runs[-1])
+                runs = _reduit(runs, bloc)
+
+                couches.append(os.path.join(dossier, "couche{}".format(len(couches))))
+                with open(couches[-1], "wb") as sortie:
+                    for morceau in _fusion(runs, max(1, bloc // len(runs))):
+                        deja_vus = (_contient(precedente, morceau)
+                                    | _contient(courante, morceau))
+                        morceau[~deja_vus].tofile(sortie)
+                for run in runs:
+                    os.remove(run)
+                precedente = courante
+
+            # Remontée du chemin d'un état gagnant jusqu'à `e`
+            coups = []
+            w = gagnant
+            for fichier in reversed(couches[:-1]):
+                couche = _lit_couche(fichier)
+                for move, v in codage.voisins(w):
+                    if _contient(couche, numpy.array([v], dtype=numpy.uint64))[0]:
+                        coups.append(move[0] + opposees[move[1]] + move[2:])
+                        w = v
+                        break
+            coups.reverse()
+            return (coups, explores)
+
+    @staticmethod
+    def __parcours_bidirectionnel(
+        codage: Encodage, e: int
+    ) -> Tuple[Optional[List[str]], int]:
+        """
+        :param codage: Codage des plateaux du niveau
+        :param e: État de départ
+        :return: Couple de la liste des déplacements d'une solution optimale
+                 (`None` s'il n'y en a pas) et du nombre d'états développés
+
+        Parcours en largeur simultané depuis `e` et depuis tous les états
+        gagnants; on développe à chaque étape la couche la plus petite des
+        deux recherches, jusqu'à ce qu'elles se rencontrent.
+        """
+        # État -> (état précédent, déplacement depuis l'état précédent)
+        avant = {e: (e, "")}
+        # État -> (état suivant vers la sortie, déplacement vers cet état)
+        arriere = {f: (f, "") for f in codage.etats_gagnants()}
+        if e in arriere:
+            return ([], 0)
+        couche_avant = [e]
+        couche_arriere = list(arriere)
+        explores = 0
+
+        while couche_avant and couche_arriere:
+            rencontres = []
+            nouvelle_couche = []
+            if len(couche_avant) <= len(couche_arriere):
+                explores += len(couche_avant)
+                for v in couche_avant:
+                    for move, w in codage.voisins(v):
+                        if w not in avant:
+                            avant[w] = (v, move)
+                            nouvelle_couche.append(w)
+                            if w in arriere:
+                                rencontres.append(w)
+                couche_avant = nouvelle_couche
+            else:
+                explores += len(couche_arriere)
+                for v in couche_arriere:
+                    for move, w in codage.voisins(v):
+                        if w not in arriere:
+                            # Le déplacement de `w` vers `v` est l'inverse de `move`
+                            arriere[w] = (v, move[0] + opposees[move[1]] + move[2:])
+                            nouvelle_couche.append(w)
+                            if w in avant:
+                                rencontres.append(w)
+                couche_arriere = nouvelle_couche
+
+            # Les couches étant complètes, la meilleure rencontre de cette
+            # étape donne un chemin de longueur minimale
+            if rencontres:
+                chemins = []
+                for m in rencontres:
+                    chemin = RushHour.__chemin(avant, m)
+                    v = m
+                    w, move = arriere[v]
+                    while w != v:
+                        chemin.append(move)
+                        v = w
+                        w, move = arriere[v]
+                    chemins.append(chemin)
+                return (min(chemins, key=len), explores)
+
+        return (None, explores)
+
+    @staticmethod
+    def __a_etoile(
+        codage: Encodage, e: int, h: Callable[[int], int]
+    ) -> Tuple[Optional[List[str]], int]:
+        """
+        :param codage: Codage des plateaux du niveau
+        :param e: État de départ
+        :param h: Heuristique minorant le nombre de coups restants
+        :return: Couple de la liste des déplacements d'une solution optimale
+                 (`None` s'il n'y en a pas) et du nombre d'états développés
+
+        Les états sont développés par ordre croissant de `g + h(etat)`, où
+        `g` est le nombre de coups depuis `e`. Un état déjà développé est
+        repris si on l'atteint ensuite par un chemin plus court, ce qui
+        garantit l'optimalité pour toute heuristique minorante.
+        """
+        parents = {e: (e, "")}
+        distances = {e: 0}
+        compteur = itertools.count()
+        todo = [(h(e), 0, next(compteur), e)]
+        explores = 0
+        while todo:
+            _, g, _, v = heapq.heappop(todo)
+            if g > distances[v]:
+                continue  # Entrée périmée
+            if codage.est_gagnant(v):
+                return (RushHour.__chemin(parents, v), explores)
+            explores += 1
+            for move, w in codage.voisins(v):
+                if w not in distances or g + 1 < distances[w]:
+                    distances[w] = g + 1
+                    parents[w] = (v, move)
+                    heapq.heappush(todo, (g + 1 + h(w), g + 1, next(compteur), w))
+        return (None, explores)
+
+    @staticmethod
+    def __ida_etoile(
+        codage: Encodage, e: int, h: Callable[[int], int], memoire: int = 100000
+    ) -> Tuple[Optional[List[str]], int]:
+        """
+        :param codage: Codage des plateaux du niveau
+        :param e: État de départ
+        :param h: Heuristique minorant le nombre de coups restants
+        :param memoire: Nombre maximal d'états mémorisés par itération
+        :return: Couple de la liste des déplacements d'une solution optimale
+                 (`None` s'il n'y en a pas) et du nombre d'états développés
+
+        Parcours en profondeur limité aux états de `g + h(etat)` au plus
+        égal à un seuil, relancé avec un seuil croissant.
+
+        Sans mémoire, un même état serait redéveloppé pour chacun des très
+        nombreux chemins qui y mènent. On retient donc, pendant chaque
+        itération, la plus petite valeur de `g` avec laquelle un état a été
+        développé: l'y retrouver avec un `g` au moins aussi grand est
+        inutile. Cette table est bornée à `memoire` états.
+        """
+        chemin = [e]
+        dans_chemin = {e}
+        coups: List[str] = []
+        explores = 0
+        vus: Dict[int, int] = {}
+
+        # Renvoie vrai si une solution prolonge le chemin courant, et sinon
+        # le plus petit `g + h` ayant dépassé le seuil
+        def explorer(g: int, seuil: int) -> Union[bool, float]:
+            nonlocal explores
+            v = chemin[-1]
+            f = g + h(v)
+            if f > seuil:
+                return f
+            if codage.est_gagnant(v):
+                return True
+            if vus.get(v, g + 1) <= g:
+                return math.inf
+            if v in vus or len(vus) < memoire:
+                vus[v] = g
+            explores += 1
+            minimum = math.inf
+            for move, w in codage.voisins(v):
+                if w in dans_chemin:
+                    continue
+                chemin.append(w)
+                dans_chemin.add(w)
+                coups.append(move)
+                res = explorer(g + 1, seuil)
+                if res is True:
+                    return True
+                chemin.pop()
+                dans_chemin.remove(w)
+                coups.pop()
+                minimum = min(minimum, res)
+            return minimum
+
+        seuil: Union[bool, float] = h(e)
+        while True:
+            vus.clear()
+            res = explorer(0, int(seuil))
+            if res is True:
+                return (coups, explores)
+            if res == math.inf:
+                return (None, explores)
+            seuil = res
+
+    @staticmethod
+    def __chemin(parents: Dict[int, Tuple[int, str]], f: int) -> List[str]:
+        """
+        :param parents: Dictionnaire renvoyé par le parcours
+        :param f: État d'arrivée
+        :return: Liste des déplacements menant de l'état de départ à `f`
+        """
+        res = []
+        v = f
+        w, move = parents[v]
+        while w != v:
+            res.append(move)
+            v = w
+            w, move = parents[v]
+        res.reverse()
+        return res
+
+    @staticmethod
+    def indexer(
+        niveaux: Optional[Sequence[int]] = None, dossier: str = "RushHourIndex"
+    ) -> None:
+        """
+        Construit l'index de chaque niveau et l'écrit dans
+        `dossier/DefiNN-<empreinte>.npz`, où `<empreinte>` est
+        l'`Index.empreinte` de la signature du niveau
+
+        INPUT:
+
+            - niveaux (optionnel), les numéros des niveaux à indexer; par
+              défaut tous les niveaux disponibles
+            - dossier (default = "RushHourIndex"), le dossier des index
+
+        Les index écrits sont relus par `RushHour.hint`.
+        """
+        if niveaux is None:
+            niveaux = RushHour.niveaux()
+        os.makedirs(dossier, exist_ok=True)
+        for niveau in niveaux:
+            index = Index.construit(Plateau(niveau))
+            empreinte = Index.empreinte(Index.signature(index.reference))
+            index.sauvegarde(os.path.join(
+                dossier, "Defi{:02d}-{}.npz".format(niveau, empreinte)))
+            RushHour.__memorise(index)
+
+    @staticmethod
+    def __memorise(index: Index) -> None:
+        """
+        Ajoute `index` au cache des index, sauf s'il y est déjà, en oubliant
+        les moins récemment utilisés au-delà de `taille_cache_index`
+        """
+        signature = Index.signature(index.reference)
+        if any(autre_signature == signature and
+               autre.codage.encode(index.reference) in autre.table
+               for autre_signature, autre in RushHour._index):
+            return
+        RushHour._index.append((signature, index))
+        while len(RushHour._index) > RushHour.taille_cache_index:
+            (oubliee, _) = RushHour._index.pop(0)
+            # Les index oubliés pourront être relus depuis le dossier
+            RushHour._charges.discard(oubliee)
+
+    @staticmethod
+    def vide_cache_index() -> None:
+        """
+        Oublie tous les index gardés en mémoire par `RushHour.index`
+
+            >>> index = RushHour.index(Plateau(3))
+            >>> RushHour.vide_cache_index()
+            >>> RushHour.index(Plateau(3)) is index
+            False
+        """
+        RushHour._index.clear()
+        RushHour._charges.clear()
+
+    @staticmethod
+    def index(plateau: "Plateau", dossier: str = "RushHourIndex") -> Index:
+        """
+        Renvoie l'index de la composante connexe de `plateau`
+
+        L'index est cherché dans le cache, puis parmi les fichiers de
+        `dossier` écrits par `RushHour.indexer`; à défaut il est construit
+        (sans être écrit sur disque). Seuls les fichiers dont le nom porte
+        l'empreinte de la signature de `plateau` sont chargés.
+
+        Au plus `taille_cache_index` index sont gardés en mémoire: les moins
+        récemment utilisés sont oubliés (voir aussi `vide_cache_index`).
+
+            >>> import os, tempfile
+            >>> from rush_hour import Plateau, RushHour
+            >>> index = RushHour.index(Plateau(3).deplace('PU3'))
+            >>> index is RushHour.index(Plateau(3))
+            True
+            >>> for niveau in [1, 7, 21, 38]:
+            ...     _ = RushHour.index(Plateau(niveau))
+            >>> index is RushHour.index(Plateau(3))
+            False
+            >>> dossier = tempfile.mkdtemp()
+            >>> RushHour.indexer([1, 3], dossier)
+            >>> sorted(os.listdir(dossier))
+            ['Defi01-....npz', 'Defi03-....npz']
+        """
+        signature = Index.signature(plateau)
+        for _ in range(2):
+            for k, (autre_signature, index) in enumerate(RushHour._index):
+                if autre_signature == signature and \
+                        index.codage.encode(plateau) in index.table:
+                    RushHour._index.append(RushHour._index.pop(k))
+                    return index
+            if not os.path.isdir(dossier) or signature in RushHour._charges:
+                break
+            # Chargement, une seule fois, des index du dossier pour cette
+            # signature
+            RushHour._charges.add(signature)
+            suffixe = "-{}.npz".format(Index.empreinte(signature))
+            for fichier in sorted(os.listdir(dossier)):
+                if fichier.endswith(suffixe):
+                    RushHour.__memorise(Index.charge(os.path.join(dossier, fichier)))
+        index = Index.construit(plateau)
+        RushHour.__memorise(index)
+        return index
 
     @staticmethod
-    def solution(niveau, return_graph=False, verbeux=False):
+    def hint(plateau: "Plateau", dossier: str = "RushHourIndex") -> Optional[str]:
+        """
+        Renvoie un premier coup d'une solution optimale depuis `plateau`
+
+        Renvoie `None` si `plateau` est gagnant ou n'a pas de solution.
+        Une fois l'index du niveau disponible (voir `RushHour.index`),
+        chaque indice est obtenu en temps constant.
+
+            >>> from rush_hour import Plateau, RushHour
+            >>> plateau = Plateau(1)
+            >>> coups = []
+            >>> while not plateau.est_gagnant():
+            ...     coups.append(RushHour.hint(plateau))
+            ...     plateau = plateau.deplace(coups[-1])
+            >>> len(coups), RushHour.est_solution(1, coups)
+            (8, True)
+        """
+        return RushHour.index(plateau, dossier).coup(plateau)
+
+    @staticmethod
+    def resoudre(
+        niveau: Niveau,
+        strategy: str = "bfs",
+        heuristique: Union[str, Callable[[Encodage, int], int]] = "bloquantes",
+        workers: Optional[int] = None,
+        memoire: int = 64 * 2**20,
+        mesure_memoire: bool = False,
+    ) -> Resolution:
+        """
+        Résout ce niveau et renvoie la solution avec des statistiques
+
+        La stratégie de recherche est donnée par `strategy`:
+
+        - "bfs": parcours en largeur depuis le plateau de départ
+        - "bidirectional": parcours en largeur simultanés depuis le plateau
+          de départ et depuis tous les plateaux gagnants
+        - "astar": algorithme A*
+        - "idastar": algorithme IDA*, dont la mémoire est limitée au chemin
+          courant et à une table de transposition bornée à 100000 états,
+          qui évite de redévelopper un état déjà atteint à moindre coût
+        - "parallel": parcours en largeur dont chaque couche est développée
+          par `workers` processus (par défaut, le nombre de cœurs)
+        - "couches": parcours en largeur dont les états sont conservés dans
+          des tableaux `numpy` triés, couche par couche, plutôt que dans un
+          dictionnaire; adapté aux grands plateaux
+        - "externe": comme "couches", mais les couches sont écrites dans des
+          fichiers temporaires et seuls des blocs en sont chargés, dans la
+          limite d'environ `memoire` octets
+        - "index": lecture dans l'index précalculé du niveau (voir
+          `RushHour.index`); le nombre d'états explorés est celui de l'index
+
+        Les stratégies "astar" et "idastar" sont guidées par `heuristique`, le nom d'une
+        méthode de `Encodage` minorant le nombre de coups restants:
+        "bloquantes" ou "bloquantes_indirectes". Ce peut aussi être une
+        fonction `(codage, etat) -> int` quelconque, qui accélère parfois
+        la recherche sans garantir une solution optimale.
+
+        Le champ `optimal` du résultat est vrai si la stratégie garantit une
+        solution de longueur minimale: les parcours en largeur
+        (`strategies_exactes`), et A* et IDA* guidés par une heuristique
+        minorante (`heuristiques_minorantes`).
+
+        Si `mesure_memoire` est vrai, le champ `pic_allocations` du résultat
+        est le pic des allocations de Python pendant la recherche, en
+        octets, mesuré par `tracemalloc` (ce qui ralentit beaucoup la
+        recherche). Sinon il vaut `None`. Ce n'est pas la mémoire résidente
+        du processus: les processus de la stratégie "parallel" ne sont pas
+        comptés, ni les pages des fichiers de la stratégie "externe"
+        projetés en mémoire (`numpy.memmap`), que le système charge et
+        libère à la demande; seuls les blocs d'états qu'elle copie, limités
+        par `memoire`, le sont.
+
+            >>> r = RushHour.resoudre(40)
+            >>> len(r.coups), r.optimal
+            (51, True)
+            >>> a = RushHour.resoudre(40, strategy="astar")
+            >>> b = RushHour.resoudre(40, strategy="astar",
+            ...                       heuristique="bloquantes_indirectes")
+            >>> len(a.coups), len(b.coups)
+            (51, 51)
+            >>> b.etats_explores <= a.etats_explores <= r.etats_explores
+            True
+            >>> r = RushHour.resoudre(1, strategy="idastar")
+            >>> len(r.coups), RushHour.est_solution(1, r.coups), r.optimal
+            (8, True, True)
+            >>> def gloutonne(codage, etat):
+            ...     return 10 * codage.bloquantes(etat)
+            >>> r = RushHour.resoudre(40, strategy="astar", heuristique=gloutonne)
+            >>> RushHour.est_solution(40, r.coups), r.optimal
+            (True, False)
+            >>> r = RushHour.resoudre(40, strategy="parallel", workers=3)
+            >>> len(r.coups), RushHour.est_solution(40, r.coups)
+            (51, True)
+            >>> r = RushHour.resoudre(40, strategy="couches")
+            >>> len(r.coups), RushHour.est_solution(40, r.coups)
+            (51, True)
+
+        Les plateaux plus grands se résolvent de la même façon::
+
+            >>> grand = ['dimension 8', 'sortie 3', 'X2R30', 'M4R10', 'C3R14',
+            ...          'G2R24', 'D3D32', 'O2D35', 'F3R55']
+            >>> r = RushHour.resoudre(grand, strategy="couches")
+            >>> len(r.coups), RushHour.est_solution(grand, r.coups)
+            (6, True)
+            >>> len(RushHour.resoudre(grand).coups)
+            6
+            >>> r = RushHour.resoudre(40, strategy="externe", memoire=256)
+            >>> len(r.coups), RushHour.est_solution(40, r.coups)
+            (51, True)
+            >>> r = RushHour.resoudre(grand, strategy="externe", memoire=2**16,
+            ...                       mesure_memoire=True)
+            >>> len(r.coups), RushHour.est_solution(grand, r.coups)
+            (6, True)
+            >>> b = RushHour.resoudre(grand, mesure_memoire=True)
+            >>> 0 < r.pic_allocations < b.pic_allocations
+            True
+
+        y compris au-delà de dix cases de côté, où les positions des voitures
+        s'écrivent sur deux chiffres::
+
+            >>> geant = ['dimension 12', 'sortie 3', 'X2R30', 'T 4 D 2 10',
+            ...          'A 2 R 11 0']
+            >>> r = RushHour.resoudre(geant)
+            >>> r.coups, RushHour.est_solution(geant, r.coups)
+            (['TD2', 'XR10'], True)
+            >>> r = RushHour.resoudre(40, strategy="index")
+            >>> len(r.coups), RushHour.est_solution(40, r.coups)
+            (51, True)
+        """
+        # Plateau de départ
+        plateau = Plateau(niveau)
+        # Les plateaux sont manipulés sous forme d'entiers durant la recherche
+        codage = Encodage(plateau)
+        e = codage.encode(plateau)
+
+        def recherche() -> Tuple[Optional[List[str]], int]:
+            return RushHour.__recherche(
+                plateau, codage, e, strategy, heuristique, workers, memoire
+            )
+
+        pic_allocations: Optional[int] = None
+        if mesure_memoire:
+            ((coups, explores), pic_allocations) = _pic_memoire(recherche)
+        else:
+            (coups, explores) = recherche()
+        optimal = strategy in RushHour.strategies_exactes or \
+            heuristique in RushHour.heuristiques_minorantes
+        return Resolution(coups, optimal, explores, pic_allocations)
+
+    @staticmethod
+    def __recherche(
+        plateau: Plateau,
+        codage: Encodage,
+        e: int,
+        strategy: str,
+        heuristique: Union[str, Callable[[Encodage, int], int]],
+        workers: Optional[int],
+        memoire: int,
+    ) -> Tuple[Optional[List[str]], int]:
+        """
+        Cherche une solution depuis l'état `e` avec la stratégie `strategy`
+        (voir `RushHour.resoudre`) et renvoie les coups trouvés et le nombre
+        d'états explorés
+        """
+        coups: Optional[List[str]]
+        if strategy == "bfs":
+            # Dès qu'on trouve un plateau gagnant on a forcément trouvé le plus
+            # court chemin car on effectue un parcours en largeur du graphe
+            (f, parents, explores) = RushHour.__parcours_largeur(codage, e)
+            coups = None if f is None else RushHour.__chemin(parents, f)
+        elif strategy == "bidirectional":
+            (coups, explores) = RushHour.__parcours_bidirectionnel(codage, e)
+        elif strategy in ("astar", "idastar"):
+            if callable(heuristique):
+                fonction = heuristique
+                h: Callable[[int], int] = lambda etat: fonction(codage, etat)
+            elif heuristique in RushHour.heuristiques_minorantes:
+                h = getattr(codage, heuristique)
+            else:
+                raise ValueError("Heuristique inconnue: {}".format(heuristique))
+            if strategy == "astar":
+                (coups, explores) = RushHour.__a_etoile(codage, e, h)
+            else:
+                (coups, explores) = RushHour.__ida_etoile(codage, e, h)
+        elif strategy == "couches":
+            (coups, explores) = RushHour.__parcours_couches(codage, e)
+        elif strategy == "externe":
+            (coups, explores) = RushHour.__parcours_externe(codage, e, memoire)
+        elif strategy == "parallel":
+            (coups, explores) = RushHour.__parcours_parallele(
+                codage, e, workers or os.cpu_count() or 1
+            )
+        elif strategy == "index":
+            index = RushHour.index(plateau)
+            (coups, explores) = (index.solution(plateau), len(index))
+        else:
+            raise ValueError("Stratégie inconnue: {}".format(strategy))
+        return (coups, explores)
+
+    @staticmethod
+    def solution(niveau, return_graph=False, verbeux=False, strategy="bfs",
+                 heuristique="bloquantes"):
         """
         Renvoie une solution optimale pour ce niveau
 
+        Renvoie `None` si le niveau n'a pas de solution. Si `return_graph`
+        est vrai, renvoie à la place le graphe (arborescence) des plateaux
+        explorés par le parcours en largeur, dont les arêtes sont
+        étiquetées par les déplacements.
+
+        Voir `RushHour.resoudre` pour les paramètres `strategy` et
+        `heuristique`. Si `verbeux` est vrai, le nombre d'états développés
+        est affiché.
+
+            >>> s = RushHour.solution(40, strategy="bidirectional")
+            >>> len(s) == len(RushHour.solution(40))
+            True
+            >>> RushHour.est_solution(40, s)
+            True
+
             >>> RushHour.solution(1) # doctest: +SKIP
             ['AR1', 'CL3', 'OD3', 'PU1', 'BU1', 'RL2', 'QD2', 'XR3']
             >>> RushHour.est_solution(1, RushHour.solution(1))
             True
+            >>> g = RushHour.solution(3, return_graph=True)
+            >>> g.predecessors(Plateau(3))
+            ()
         """
-        # Plateau de départ
-        e = Plateau(niveau)
-
-        # Parcours en largeur du graphe de tous les états possibles
-        # du plateau entre chaque déplacement
-        # Dès qu'on trouve un plateau gagnant on a forcément trouvé le plus court chemin
-        # car on effectue un parcours en largeur du graphe
-        (f, g) = RushHour.__parcours_largeur(e)
-
-        # Graphe de recherche
-        if return_graph:
-            return g
-        # Chemin sous forme d'une liste de déplacements
+        if not return_graph:
+            resolution = RushHour.resoudre(niveau, strategy, heuristique)
+            if verbeux:
+                print("{} états développés".format(resolution.etats_explores))
+            return resolution.coups
+
+        # Graphe de recherche, construit seulement sur demande
+        plateau = Plateau(niveau)
+        codage = Encodage(plateau)
+        (_, parents, _) = RushHour.__parcours_largeur(codage, codage.encode(plateau))
+        plateaux = {v: codage.decode(v) for v in parents}
+        return Graph(
+            nodes=list(plateaux.values()),
+            edges=[
+                (plateaux[v], plateaux[w], move)
+                for w, (v, move) in parents.items()
+                if v != w
+            ],
+            directed=True,
+        )
+
+    @staticmethod
+    def solve_all(
+        niveaux: Optional[Sequence[Niveau]] = None,
+        workers: Optional[int] = None,
+        strategy: str = "bfs",
+        heuristique: str = "bloquantes",
+    ) -> Iterator[Dict]:
+        """
+        Résout plusieurs niveaux en parallèle, dans un groupe de processus
+
+        INPUT:
+
+            - niveaux (optionnel), les niveaux à résoudre; par défaut tous
+              les niveaux disponibles
+            - workers (optionnel), le nombre de processus; par défaut le
+              nombre de cœurs de la machine
+            - strategy, heuristique: voir `RushHour.resoudre`; la stratégie
+              "parallel", qui lance elle-même des processus, n'est pas
+              possible dans le groupe de processus
+
+        OUTPUT: un itérateur sur les résultats, dans l'ordre où ils sont
+        obtenus; chaque résultat est un dictionnaire de clés
+        `champs_rapport`. Les niveaux ne sont résolus qu'au fil de
+        l'itération: voir `RushHour.rapport` pour tout résoudre et écrire
+        les résultats dans un fichier.
+
+        EXAMPLES::
+
+            >>> resultats = RushHour.solve_all([1, 3, 40], workers=2)
+            >>> sorted((r["niveau"], r["longueur"]) for r in resultats)
+            [(1, 8), (3, 14), (40, 51)]
+            >>> RushHour.solve_all([1], strategy="parallel")
+            Traceback (most recent call last):
+            ...
+            ValueError: Stratégie impossible dans un groupe de processus: parallel
+        """
+        if strategy == "parallel":
+            raise ValueError(
+                "Stratégie impossible dans un groupe de processus: {}".format(strategy)
+            )
+        if niveaux is None:
+            niveaux = RushHour.niveaux()
+        return RushHour.__resolutions(niveaux, workers, strategy, heuristique)
+
+    @staticmethod
+    def __resolutions(
+        niveaux: Sequence[Niveau],
+        workers: Optional[int],
+        strategy: str,
+        heuristique: str,
+    ) -> Iterator[Dict]:
+        """
+        Générateur des résultats de `RushHour.solve_all`
+        """
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                pool.submit(_resolution_chronometree, niveau, strategy, heuristique)
+                for niveau in niveaux
+            ]
+            for future in concurrent.futures.as_completed(futures):
+                yield future.result()
+
+    @staticmethod
+    def rapport(resultats: Iterable[Dict], fichier: str) -> List[Dict]:
+        """
+        Écrit les résultats de `RushHour.solve_all`, triés par niveau, dans
+        le fichier `fichier` (`.json` ou `.csv`), et les renvoie
+
+        Les résultats sont tous obtenus avant l'écriture du fichier, dans un
+        fichier temporaire qui ne remplace `fichier` qu'une fois complet. Les
+        niveaux donnés par leur numéro viennent en premier, puis les autres,
+        désignés par leur étiquette (voir `_etiquette`).
+
+            >>> import json, os, tempfile
+            >>> dossier = tempfile.mkdtemp()
+            >>> fichier = os.path.join(dossier, "rapport.json")
+            >>> resultats = RushHour.rapport(RushHour.solve_all([40, 1]), fichier)
+            >>> with open(fichier) as f:
+            ...     [(r["niveau"], r["longueur"]) for r in json.load(f)]
+            [(1, 8), (40, 51)]
+            >>> resultats = RushHour.rapport(
+            ...     RushHour.solve_all([Plateau(1), 1, ['X2R20']]), fichier)
+            >>> [(r["niveau"], r["longueur"]) for r in resultats]
+            [(1, 8), ('A2R00, X2R21, C2R44, R3R52, O3D05, P3D10, Q3D13, B2D40', 8),
+             ('X2R20', 1)]
+            >>> fichier = os.path.join(dossier, "rapport.csv")
+            >>> RushHour.rapport(RushHour.solve_all([]), fichier)
+            []
+            >>> with open(fichier) as f:
+            ...     f.read()
+            'niveau,coups,longueur,etats_explores,secondes\\n'
+        """
+        if not fichier.endswith((".json", ".csv")):
+            raise ValueError("Format de rapport inconnu: {}".format(fichier))
+        liste = sorted(resultats,
+                       key=lambda r: (isinstance(r["niveau"], str), r["niveau"]))
+        (descripteur, temporaire) = tempfile.mkstemp(
+            dir=os.path.dirname(os.path.abspath(fichier)), suffix=".tmp")
+        try:
+            with open(descripteur, "w", newline="") as f:
+                if fichier.endswith(".json"):
+                    json.dump(liste, f, indent=1)
+                else:
+                    writer = csv.DictWriter(f, fieldnames=RushHour.champs_rapport)
+                    writer.writeheader()
+                    for resultat in liste:
+                        ligne = dict(resultat)
+                        ligne["coups"] = " ".join(ligne["coups"] or [])
+                        writer.writerow(ligne)
+            os.replace(temporaire, fichier)
+        except BaseException:
+            os.remove(temporaire)
+            raise
+        return liste
+
+
+def _resolution_chronometree(niveau: Niveau, strategy: str, heuristique: str) -> Dict:
+    """
+    Résout un niveau pour `RushHour.solve_all`, dans un processus séparé
+    """
+    debut = time.perf_counter()
+    resolution = RushHour.resoudre(niveau, strategy, heuristique)
+    return {
+        "niveau": _etiquette(niveau),
+        "coups": resolution.coups,
+        "longueur": None if resolution.coups is None else len(resolution.coups),
+        "etats_explores": resolution.etats_explores,
+        "secondes": time.perf_counter() - debut,
+    }
+
+
+def _etiquette(niveau: Niveau) -> Union[int, str]:
+    """
+    Renvoie une désignation de `niveau` qui peut être écrite dans un rapport:
+    son numéro, le nom de son fichier, ou les descriptions de ses voitures
+    séparées par des virgules (précédées des lignes `dimension` et `sortie`
+    si elles diffèrent du plateau standard)
+
+        >>> _etiquette(3), _etiquette('RushHourDefis/Defi03.txt')
+        (3, 'RushHourDefis/Defi03.txt')
+        >>> _etiquette(['X2R20', 'A2R00'])
+        'X2R20, A2R00'
+        >>> _etiquette(Plateau(['dimension 12', 'sortie 3', 'X2R30']))
+        'dimension 12, sortie 3, X2R30'
+    """
+    if isinstance(niveau, (int, str)):
+        return niveau
+    if isinstance(niveau, Plateau):
+        lignes = [repr(voiture) for voiture in niveau.voitures.values()]
+        if niveau.ligne_sortie != 2:
+            lignes.insert(0, "sortie {}".format(niveau.ligne_sortie))
+        if niveau.dimension != 6:
+            lignes.insert(0, "dimension {}".format(niveau.dimension))
+        return ", ".join(lignes)
+    return ", ".join(niveau)
+
+
+def _pic_memoire(fonction: Callable[[], T]) -> Tuple[T, int]:
+    """
+    Appelle `fonction` et renvoie son résultat avec le pic de mémoire allouée
+    par Python pendant l'appel, en octets
+
+    La mesure utilise `tracemalloc`, qui ralentit beaucoup l'appel; elle
+    ne compte ni les allocations des autres processus, ni les pages des
+    fichiers projetés en mémoire: ce n'est pas la mémoire résidente. Si `tracemalloc`
+    est déjà actif, il le reste et seule la mémoire allouée en plus de celle
+    déjà tracée est comptée.
+
+        >>> (liste, pic) = _pic_memoire(lambda: list(range(10**5)))
+        >>> len(liste), pic >= 10**5 * 8
+        (100000, True)
+        >>> tracemalloc.is_tracing()
+        False
+
+    Complexity: celle de `fonction`
+    """
+    deja_actif = tracemalloc.is_tracing()
+    if not deja_actif:
+        tracemalloc.start()
+    try:
+        (avant, _) = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        resultat = fonction()
+        (_, pic) = tracemalloc.get_traced_memory()
+    finally:
+        if not deja_actif:
+            tracemalloc.stop()
+    return (resultat, pic - avant)
+
+
+def _part(etat: int, parts: int) -> int:
+    """
+    Renvoie le numéro de la part de `etat` pour `RushHour.__parcours_parallele`
+
+    Les bits de poids faible d'un état ne décrivent que la première
+    voiture: on les mélange par une multiplication avant de les répartir.
+    """
+    return ((etat * 0x9E3779B97F4A7C15) >> 32) % parts
+
+
+def _parcours_part(
+    codage: Encodage,
+    e: int,
+    k: int,
+    parts: int,
+    connexion: Connection,
+    boites: List["multiprocessing.Queue[Paquet]"],
+) -> None:
+    """
+    Processus responsable de la k-ième part des états dans
+    `RushHour.__parcours_parallele`, piloté par les messages de `connexion`
+
+    La couche de départ est `[e]` pour la part de `e`, vide sinon.
+
+    - ("developpe", None): développe la couche courante, envoie les
+      voisins de chaque autre part dans la file `boites[j]` de cette part,
+      et reçoit de sa propre file ceux des autres parts; les voisins pas
+      encore rencontrés forment la nouvelle couche courante. Répond (taille
+      de la couche, état gagnant ou `None`)
+    - ("parent", w): répond le couple (état précédent, déplacement) de `w`
+    - ("fin", None): termine le processus
+    """
+    parents: Dict[int, Tuple[int, str]] = {}
+    couche: List[int] = []
+    if _part(e, parts) == k:
+        parents[e] = (e, "")
+        couche.append(e)
+    while True:
+        (message, contenu) = connexion.recv()
+        if message == "developpe":
+            paquets: List[Dict[int, Tuple[int, str]]] = [{} for _ in range(parts)]
+            for v in couche:
+                for move, w in codage.voisins(v):
+                    # Les états déjà connus de cette part sont éliminés ici
+                    if w not in parents:
+                        paquets[_part(w, parts)].setdefault(w, (v, move))
+            for j, paquet in enumerate(paquets):
+                if j != k:
+                    boites[j].put((k, paquet))
+            recus = [(k, paquets[k])] + [boites[k].get() for _ in range(parts - 1)]
+            # Par ordre des parts, pour que le résultat soit reproductible
+            recus.sort(key=lambda recu: recu[0])
+            couche = []
+            gagnant = None
+            for _, candidats in recus:
+                for w, parent in candidats.items():
+                    if w not in parents:
+                        parents[w] = parent
+                        couche.append(w)
+                        if gagnant is None and codage.est_gagnant(w):
+                            gagnant = w
+            connexion.send((len(couche), gagnant))
+        elif message == "parent":
+            connexion.send(parents[contenu])
         else:
-            res = []
-            v = f
-            while v != e:
-                pred = g.predecessors(v)
-                assert len(pred) == 1
-                w = pred[0]
-                res.insert(0, g.capacity(w, v))
-                v = w
-            return res
+            connexion.close()
+            return
+
+
+def _contient(couche: numpy.ndarray, etats: numpy.ndarray) -> numpy.ndarray:
+    """
+    Renvoie, pour chaque élément de `etats`, s'il appartient au tableau
+    trié `couche`
+
+        >>> _contient(numpy.array([2, 3, 5, 7], dtype=numpy.uint64),
+        ...           numpy.array([1, 3, 4, 7, 8], dtype=numpy.uint64))
+        array([False,  True, False,  True, False])
+
+    Complexity: O(len(etats) log len(couche)) (recherche dichotomique)
+    """
+    if len(couche) == 0:
+        return numpy.zeros(len(etats), dtype=bool)
+    i = numpy.searchsorted(couche, etats)
+    i[i == len(couche)] = 0
+    return couche[i] == etats
+
+
+def _lit_couche(fichier: str) -> numpy.ndarray:
+    """
+    Projette en mémoire le fichier d'états `uint64` `fichier`
+    """
+    if os.path.getsize(fichier) == 0:
+        return numpy.empty(0, dtype=numpy.uint64)
+    return numpy.memmap(fichier, dtype=numpy.uint64, mode="r")
+
+
+def _reduit(fichiers: List[str], bloc: int, largeur: int = 16) -> List[str]:
+    """
+    Fusionne les fichiers d'états `uint64` triés `fichiers` par groupes d'au
+    plus `largeur`, en autant de passes que nécessaire pour qu'il en reste au
+    plus `largeur`, et renvoie les fichiers restants
+
+    Chaque fusion n'ouvre que `largeur` fichiers à la fois, dont elle charge
+    au total environ `bloc` états; les fichiers fusionnés sont supprimés.
+
+        >>> import os, tempfile
+        >>> dossier = tempfile.mkdtemp()
+        >>> fichiers = []
+        >>> for i in range(10):
+        ...     fichiers.append(os.path.join(dossier, "run{}".format(i)))
+        ...     numpy.array([i, i + 5], dtype=numpy.uint64).tofile(fichiers[-1])
+        >>> restants = _reduit(fichiers, 4, largeur=3)
+        >>> len(restants), len(os.listdir(dossier))
+        (2, 2)
+        >>> numpy.concatenate(list(_fusion(restants, 2))).tolist() == list(range(15))
+        True
+
+    Complexity: O(N log(F) / log(largeur)) pour N états répartis dans F
+    fichiers
+    """
+    passe = 0
+    while len(fichiers) > largeur:
+        passe += 1
+        suivants = []
+        for debut in range(0, len(fichiers), largeur):
+            groupe = fichiers[debut:debut + largeur]
+            if len(groupe) == 1:
+                suivants.append(groupe[0])
+                continue
+            suivants.append("{}-{}".format(groupe[0], passe))
+            with open(suivants[-1], "wb") as sortie:
+                for morceau in _fusion(groupe, max(1, bloc // len(groupe))):
+                    morceau.tofile(sortie)
+            for fichier in groupe:
+                os.remove(fichier)
+        fichiers = suivants
+    return fichiers
+
+
+def _fusion(fichiers: List[str], bloc: int) -> Iterator[numpy.ndarray]:
+    """
+    Fusionne des fichiers d'états `uint64` triés, en ne chargeant que
+    `bloc` états de chacun à la fois
+
+    Renvoie des tableaux triés sans doublons, dont la concaténation est
+    triée: tout élément d'un tableau est plus grand que ceux des tableaux
+    précédents.
+
+        >>> import os, tempfile
+        >>> dossier = tempfile.mkdtemp()
+        >>> fichiers = []
+        >>> for i, etats in enumerate([[1, 4, 6, 9], [2, 4, 5], [], [6, 7]]):
+        ...     fichiers.append(os.path.join(dossier, str(i)))
+        ...     numpy.array(etats, dtype=numpy.uint64).tofile(fichiers[-1])
+        >>> [morceau.tolist() for morceau in _fusion(fichiers, 2)]
+        [[1, 2, 4], [5, 6, 7, 9]]
+    """
+    lecteurs = [_lit_couche(fichier) for fichier in fichiers]
+    suivants = [0] * len(lecteurs)
+    tampons = [numpy.empty(0, dtype=numpy.uint64) for _ in lecteurs]
+    while True:
+        for i, lecteur in enumerate(lecteurs):
+            if len(tampons[i]) == 0 and suivants[i] < len(lecteur):
+                tampons[i] = numpy.array(lecteur[suivants[i]:suivants[i] + bloc])
+                suivants[i] += bloc
+        if not any(len(tampon) for tampon in tampons):
+            return
+        # Tous les états inférieurs ou égaux à `limite` sont chargés
+        limites = [tampon[-1] for tampon, lecteur, suivant
+                   in zip(tampons, lecteurs, suivants)
+                   if len(tampon) and suivant < len(lecteur)]
+        limite = min(limites) if limites else numpy.iinfo(numpy.uint64).max
+        morceaux = [tampon[tampon <= limite] for tampon in tampons]
+        tampons = [tampon[tampon > limite] for tampon in tampons]
+        yield numpy.unique(numpy.concatenate(morceaux))
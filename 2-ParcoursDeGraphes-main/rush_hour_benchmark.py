@@ -0,0 +1,262 @@
+# -*- coding: utf-8 -*-
+"""Mesures de performance des stratégies de résolution de Rush Hour
+
+Pour chaque niveau de `RushHour.niveaux()`, et pour des plateaux plus
+difficiles obtenus à partir de ces niveaux (`plateaux_synthetiques`), on
+mesure pour chaque stratégie de `RushHour.resoudre`:
+
+- le temps écoulé;
+- le pic de mémoire allouée pendant la résolution (`tracemalloc`);
+- le nombre d'états développés;
+- la longueur de la solution.
+
+La pseudo-stratégie "plateaux" parcourt toute la composante du niveau
+avec des objets `Plateau`: elle mesure `Plateau.voisins` et le hachage
+des plateaux, que les autres stratégies n'utilisent pas.
+
+Les résultats sont écrits au format JSON; comparés à des résultats de
+référence, ils signalent les régressions::
+
+    >>> from rush_hour_benchmark import benchmark, compare
+    >>> resultats = benchmark(niveaux=[1, 3], strategies=["bfs", "astar"],
+    ...                       synthetiques=False)
+    >>> [(r["niveau"], r["strategie"], r["longueur"]) for r in resultats]
+    [('01', 'bfs', 8), ('01', 'astar', 8), ('03', 'bfs', 14), ('03', 'astar', 14)]
+    >>> compare(resultats, resultats)
+    []
+
+Les résultats de référence sont dans `rush_hour_benchmark_reference.json`
+(`REFERENCE`). Les longueurs et les nombres d'états développés ne dépendent
+pas de la machine; avec une tolérance infinie, seuls eux sont comparés::
+
+    >>> with open(REFERENCE) as f:
+    ...     reference = json.load(f)
+    >>> compare(resultats, reference, tolerance=float("inf"))
+    []
+
+Les temps et les pics de mémoire de référence ont été mesurés avec trois
+répétitions, sur un cœur Intel Xeon, avec Python 3.11 et numpy 1.26; ils
+ne sont comparables qu'à des mesures faites sur la même machine. En ligne
+de commande, on compare à la référence::
+
+    python rush_hour_benchmark.py --repetitions 3 --reference \
+        rush_hour_benchmark_reference.json
+
+et on la régénère, après un changement voulu des performances ou sur une
+autre machine, avec::
+
+    python rush_hour_benchmark.py --repetitions 3 --sortie \
+        rush_hour_benchmark_reference.json
+"""
+
+from typing import Dict, List, Optional, Sequence, Tuple
+from collections import deque
+import argparse
+import json
+import os
+import sys
+import time
+from rush_hour import Plateau, RushHour, _pic_memoire
+from rush_hour_generateur import plus_difficile
+
+# Stratégies mesurées par défaut; "idastar" (près d'une minute sur le niveau
+# 40) et "parallel" peuvent être demandées explicitement
+STRATEGIES = ("bfs", "bidirectional", "astar", "couches", "plateaux")
+
+# Fichier des résultats de référence
+REFERENCE = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                         "rush_hour_benchmark_reference.json")
+
+
+def plateaux_synthetiques(
+    niveaux: Optional[Sequence[int]] = None
+) -> Dict[str, Plateau]:
+    """
+    Renvoie, pour chaque niveau, le plateau le plus difficile de sa
+    composante connexe, s'il diffère du niveau lui-même
+
+        >>> from rush_hour import RushHour
+        >>> synthetiques = plateaux_synthetiques([1])
+        >>> list(synthetiques)
+        ['difficile-01']
+        >>> len(RushHour.solution(synthetiques['difficile-01']))
+        9
+    """
+    if niveaux is None:
+        niveaux = RushHour.niveaux()
+    res = {}
+    for niveau in niveaux:
+        (coups, plateau) = plus_difficile(Plateau(niveau))
+        if plateau is not None and plateau != Plateau(niveau):
+            res["difficile-{:02d}".format(niveau)] = plateau
+    return res
+
+
+def parcours_plateaux(plateau: Plateau) -> int:
+    """
+    Parcourt la composante connexe de `plateau` avec des objets `Plateau`
+    et renvoie le nombre de plateaux rencontrés
+
+        >>> parcours_plateaux(Plateau(1))
+        1247
+    """
+    vus = {plateau}
+    todo = deque([plateau])
+    while todo:
+        for voisin in todo.popleft().voisins().values():
+            if voisin not in vus:
+                vus.add(voisin)
+                todo.append(voisin)
+    return len(vus)
+
+
+def _execute(plateau: Plateau, strategie: str) -> Tuple[Optional[int], int]:
+    """
+    Résout `plateau` avec `strategie` et renvoie la longueur de la solution
+    et le nombre d'états développés
+    """
+    if strategie == "plateaux":
+        return (None, parcours_plateaux(plateau))
+    resolution = RushHour.resoudre(plateau, strategie)
+    longueur = None if resolution.coups is None else len(resolution.coups)
+    return (longueur, resolution.etats_explores)
+
+
+def mesure(nom: str, plateau: Plateau, strategie: str) -> Dict:
+    """
+    Résout `plateau` avec `strategie` et renvoie les mesures obtenues
+
+    Le suivi des allocations par `tracemalloc` (`rush_hour._pic_memoire`)
+    ralentit beaucoup Python: le temps et la mémoire sont donc mesurés par
+    deux résolutions distinctes. Pour la pseudo-stratégie "plateaux",
+    `etats_explores` est la taille de la composante et `longueur` vaut
+    `None`.
+    """
+    debut = time.perf_counter()
+    (longueur, explores) = _execute(plateau, strategie)
+    secondes = time.perf_counter() - debut
+
+    (_, pic) = _pic_memoire(lambda: _execute(plateau, strategie))
+    return {
+        "niveau": nom,
+        "strategie": strategie,
+        "secondes": secondes,
+        "pic_memoire": pic,
+        "etats_explores": explores,
+        "longueur": longueur,
+    }
+
+
+def benchmark(
+    niveaux: Optional[Sequence[int]] = None,
+    strategies: Sequence[str] = STRATEGIES,
+    synthetiques: bool = True,
+    repetitions: int = 1,
+) -> List[Dict]:
+    """
+    Mesure chaque stratégie sur chaque niveau
+
+    INPUT:
+
+        - niveaux (optionnel), les numéros des niveaux; par défaut tous
+          les niveaux disponibles
+        - strategies, les stratégies de `RushHour.resoudre` à mesurer,
+          plus éventuellement "plateaux"
+        - synthetiques (default = True), si True mesure aussi les
+          plateaux de `plateaux_synthetiques`
+        - repetitions (default = 1), le nombre de mesures par couple
+          (niveau, stratégie); on garde celle de temps le plus court
+
+    OUTPUT: la liste des mesures (voir `mesure`)
+    """
+    if niveaux is None:
+        niveaux = RushHour.niveaux()
+    plateaux = {"{:02d}".format(niveau): Plateau(niveau) for niveau in niveaux}
+    if synthetiques:
+        plateaux.update(plateaux_synthetiques(niveaux))
+    resultats = []
+    for nom, plateau in plateaux.items():
+        for strategie in strategies:
+            mesures = [mesure(nom, plateau, strategie) for _ in range(repetitions)]
+            resultats.append(min(mesures, key=lambda m: m["secondes"]))
+    return resultats
+
+
+def compare(
+    resultats: List[Dict],
+    reference: List[Dict],
+    tolerance: float = 0.25,
+    plancher: float = 0.01,
+) -> List[str]:
+    """
+    Compare des résultats à des résultats de référence et renvoie la liste
+    des régressions constatées
+
+    Sont signalés: une solution de longueur différente, plus d'états
+    développés, ou un temps ou un pic de mémoire qui dépasse la référence
+    de plus de `tolerance` (en proportion). Les écarts de temps de moins
+    de `plancher` secondes, dus au bruit de mesure, sont ignorés.
+
+        >>> reference = [{"niveau": "01", "strategie": "bfs", "secondes": 1.0,
+        ...               "pic_memoire": 1000, "etats_explores": 10,
+        ...               "longueur": 8}]
+        >>> resultats = [dict(reference[0], secondes=2.0, etats_explores=9)]
+        >>> compare(resultats, reference)
+        ['01/bfs: secondes 2 > 1']
+    """
+    references = {(r["niveau"], r["strategie"]): r for r in reference}
+    regressions = []
+    for r in resultats:
+        ref = references.get((r["niveau"], r["strategie"]))
+        if ref is None:
+            continue
+        nom = "{}/{}".format(r["niveau"], r["strategie"])
+        if r["longueur"] != ref["longueur"]:
+            regressions.append("{}: longueur {} au lieu de {}".format(
+                nom, r["longueur"], ref["longueur"]))
+        if r["etats_explores"] > ref["etats_explores"]:
+            regressions.append("{}: etats_explores {} > {}".format(
+                nom, r["etats_explores"], ref["etats_explores"]))
+        if r["secondes"] > max(ref["secondes"] * (1 + tolerance),
+                               ref["secondes"] + plancher):
+            regressions.append("{}: secondes {:.3g} > {:.3g}".format(
+                nom, r["secondes"], ref["secondes"]))
+        if r["pic_memoire"] > ref["pic_memoire"] * (1 + tolerance):
+            regressions.append("{}: pic_memoire {} > {}".format(
+                nom, r["pic_memoire"], ref["pic_memoire"]))
+    return regressions
+
+
+def main(arguments: Optional[List[str]] = None) -> int:
+    """
+    Point d'entrée en ligne de commande; renvoie 1 en cas de régression
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--niveaux", type=int, nargs="*")
+    parser.add_argument("--strategies", nargs="*", default=list(STRATEGIES))
+    parser.add_argument("--sans-synthetiques", action="store_true")
+    parser.add_argument("--repetitions", type=int, default=1)
+    parser.add_argument("--sortie", help="fichier JSON des résultats")
+    parser.add_argument("--reference", help="fichier JSON de référence")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    args = parser.parse_args(arguments)
+
+    resultats = benchmark(args.niveaux, args.strategies,
+                          not args.sans_synthetiques, args.repetitions)
+    for r in resultats:
+        print("{niveau:>12} {strategie:>14} {secondes:8.3f}s {pic_memoire:>10}o "
+              "{etats_explores:>8} {longueur}".format(**r))
+    if args.sortie:
+        with open(args.sortie, "w") as f:
+            json.dump(resultats, f, indent=1)
+    if args.reference:
+        with open(args.reference) as f:
+            regressions = compare(resultats, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(regression)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
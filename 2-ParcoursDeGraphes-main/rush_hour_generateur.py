@@ -0,0 +1,236 @@
+# -*- coding: utf-8 -*-
+"""Génération aléatoire de niveaux de Rush Hour
+
+Un niveau est obtenu en trois temps:
+
+- on tire au hasard une disposition légale des voitures (`tire_plateau`);
+- on construit l'index de sa composante connexe (`rush_hour.Index`):
+  un parcours en largeur depuis tous les plateaux gagnants donne, pour
+  chaque plateau atteignable, le nombre minimal de coups pour le résoudre;
+- on retient le plateau le plus éloigné de la sortie (`plus_difficile`),
+  s'il demande le nombre de coups voulu.
+
+Les tirages sont répartis sur plusieurs processus par `genere`, et les
+niveaux retenus peuvent être écrits au format de `RushHourDefis/DefiNN.txt`
+par `ecrit`.
+
+    >>> from rush_hour import RushHour
+    >>> from rush_hour_generateur import genere
+    >>> niveaux = genere(2, coups_min=10, workers=2, graine=1, taille_lot=5)
+    >>> [RushHour.est_solution(plateau, RushHour.solution(plateau))
+    ...  for plateau in niveaux]
+    [True, True]
+    >>> all(len(RushHour.solution(plateau)) >= 10 for plateau in niveaux)
+    True
+"""
+
+from typing import Dict, List, Optional, Tuple
+import concurrent.futures
+import itertools
+import os
+import random
+import warnings
+from rush_hour import Index, Plateau, Voiture
+
+# Comme dans le jeu: les voitures de longueur 2 sont désignées par les
+# lettres A à K, celles de longueur 3 par les lettres O à R
+VOITURES = "ABCDEFGHIJK"
+CAMIONS = "OPQR"
+
+
+def tire_plateau(
+    rng: random.Random,
+    nombre_voitures: int = 12,
+    dimension: int = 6,
+    ligne_sortie: int = 2,
+    essais: int = 100,
+) -> Plateau:
+    """
+    Tire au hasard une disposition légale d'au plus `nombre_voitures`
+    voitures en plus de `X`
+
+    Chaque voiture reçoit une longueur, un axe et une position au hasard;
+    elle est abandonnée si elle sort du plateau ou en chevauche une autre
+    après `essais` tentatives. Aucune voiture horizontale n'est placée sur
+    la ligne de sortie: elle rendrait le niveau impossible.
+
+        >>> plateau = tire_plateau(random.Random(0), nombre_voitures=4)
+        >>> len(plateau.voitures) <= 5
+        True
+        >>> plateau.voitures['X'].position[0]
+        2
+    """
+    x = Voiture(lettre="X", longueur=2, direction="R",
+                position=(ligne_sortie, rng.randrange(dimension - 2)))
+    voitures = [x]
+    occupees = {(int(i), int(j)) for (i, j) in x.cases()}
+    lettres = rng.sample(VOITURES + CAMIONS, len(VOITURES + CAMIONS))
+    for lettre in itertools.islice(lettres, nombre_voitures):
+        longueur = 3 if lettre in CAMIONS else 2
+        for _ in range(essais):
+            direction = rng.choice("RD")
+            i = rng.randrange(dimension - (longueur - 1 if direction == "D" else 0))
+            j = rng.randrange(dimension - (longueur - 1 if direction == "R" else 0))
+            if direction == "R" and i == ligne_sortie:
+                continue
+            voiture = Voiture(lettre=lettre, longueur=longueur,
+                              direction=direction, position=(i, j))
+            cases = {(int(i), int(j)) for (i, j) in voiture.cases()}
+            if not cases & occupees:
+                voitures.append(voiture)
+                occupees |= cases
+                break
+    return Plateau([repr(voiture) for voiture in voitures], dimension, ligne_sortie)
+
+
+def plus_difficile(plateau: Plateau) -> Tuple[int, Optional[Plateau]]:
+    """
+    Renvoie le plateau de la composante connexe de `plateau` qui demande
+    le plus de coups, avec ce nombre de coups
+
+    Renvoie `(0, None)` si la composante ne contient aucun plateau gagnant.
+    Parmi les plateaux les plus difficiles, le choix est déterministe.
+
+        >>> from rush_hour import RushHour
+        >>> coups, plateau = plus_difficile(Plateau(1))
+        >>> coups, len(RushHour.solution(plateau))
+        (9, 9)
+
+    Complexity: Linéaire sur la taille de la composante
+    """
+    index = Index.construit(plateau)
+    if not len(index):
+        return (0, None)
+    (distance, etat) = max((d, etat) for etat, (d, _) in index.table.items())
+    return (distance, index.codage.decode(etat))
+
+
+def _lot(
+    graine: int, taille: int, coups_min: int, coups_max: Optional[int],
+    nombre_voitures: int, dimension: int, ligne_sortie: int,
+) -> List[Tuple[int, List[str]]]:
+    """
+    Tire `taille` dispositions et renvoie les plus difficiles de leurs
+    composantes qui demandent entre `coups_min` et `coups_max` coups, sous
+    forme de couples (nombre de coups, descriptions des voitures)
+    """
+    rng = random.Random(graine)
+    res = []
+    for _ in range(taille):
+        plateau = tire_plateau(rng, nombre_voitures, dimension, ligne_sortie)
+        (coups, difficile) = plus_difficile(plateau)
+        if difficile is not None and coups >= coups_min and \
+                (coups_max is None or coups <= coups_max):
+            res.append((coups, [repr(v) for v in difficile.voitures.values()]))
+    return res
+
+
+def genere(
+    nombre: int,
+    coups_min: int,
+    coups_max: Optional[int] = None,
+    nombre_voitures: int = 12,
+    dimension: int = 6,
+    ligne_sortie: int = 2,
+    workers: Optional[int] = None,
+    graine: int = 0,
+    taille_lot: int = 20,
+    lots_max: int = 100,
+) -> List[Plateau]:
+    """
+    Génère `nombre` niveaux distincts demandant entre `coups_min` et
+    `coups_max` coups
+
+    INPUT:
+
+        - nombre, le nombre de niveaux voulus
+        - coups_min, coups_max (optionnel), bornes sur le nombre minimal
+          de coups des niveaux
+        - nombre_voitures, dimension, ligne_sortie: voir `tire_plateau`
+        - workers (optionnel), le nombre de processus; par défaut le
+          nombre de cœurs de la machine
+        - graine (default = 0), pour rendre la génération reproductible
+          (à nombre de processus donné)
+        - taille_lot (default = 20), le nombre de tirages par tâche
+        - lots_max (default = 100), le nombre maximal de lots tirés
+
+    OUTPUT: la liste des niveaux, du plus difficile au plus facile
+
+    Les tirages sont faits par lots dans un groupe de processus, jusqu'à
+    obtenir assez de niveaux ou avoir tiré `lots_max` lots; un niveau
+    atteint depuis plusieurs tirages n'est retenu qu'une fois. Si les
+    contraintes sont trop fortes, la liste renvoyée contient moins de
+    `nombre` niveaux et un avertissement indique combien ont été trouvés:
+
+        >>> with warnings.catch_warnings(record=True) as avertissements:
+        ...     warnings.simplefilter("always")
+        ...     genere(1, coups_min=1000, workers=1, taille_lot=1, lots_max=2)
+        []
+        >>> print(avertissements[0].message)
+        0 niveaux trouvés sur 1 demandés après 2 lots de 1 tirages
+    """
+    workers = workers or os.cpu_count() or 1
+    trouves: Dict[Plateau, int] = {}
+    prochaine_graine = graine * 1000003
+    lots = 0
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as pool:
+        while len(trouves) < nombre and lots < lots_max:
+            futures = []
+            for _ in range(min(workers, lots_max - lots)):
+                futures.append(pool.submit(
+                    _lot, prochaine_graine, taille_lot, coups_min, coups_max,
+                    nombre_voitures, dimension, ligne_sortie,
+                ))
+                prochaine_graine += 1
+            lots += len(futures)
+            # Résultats dans l'ordre de soumission, pour la reproductibilité
+            for future in futures:
+                for coups, voitures in future.result():
+                    plateau = Plateau(voitures, dimension, ligne_sortie)
+                    trouves.setdefault(plateau, coups)
+    if len(trouves) < nombre:
+        warnings.warn("{} niveaux trouvés sur {} demandés après {} lots de {} tirages"
+                      .format(len(trouves), nombre, lots, taille_lot))
+    niveaux = sorted(trouves.items(), key=lambda niveau: -niveau[1])
+    return [plateau for plateau, _ in niveaux[:nombre]]
+
+
+def ecrit(plateaux: List[Plateau], dossier: str, premier: int = 1) -> List[str]:
+    """
+    Écrit les plateaux dans les fichiers `DefiNN.txt` de `dossier`, en
+    numérotant à partir de `premier`, et renvoie les noms des fichiers
+
+    Les lignes `dimension` et `sortie` ne sont écrites que si elles
+    diffèrent du plateau standard. Aucun fichier existant n'est écrasé:
+    si l'un des fichiers existe déjà, `FileExistsError` est levée avant
+    toute écriture.
+
+        >>> import os, tempfile
+        >>> dossier = tempfile.mkdtemp()
+        >>> fichiers = ecrit([Plateau(3)], dossier, premier=41)
+        >>> [os.path.basename(fichier) for fichier in fichiers]
+        ['Defi41.txt']
+        >>> Plateau(fichiers[0]) == Plateau(3)
+        True
+        >>> ecrit([Plateau(1), Plateau(3)], dossier, premier=40)
+        Traceback (most recent call last):
+        ...
+        FileExistsError: ...Defi41.txt
+        >>> sorted(os.listdir(dossier))
+        ['Defi41.txt']
+    """
+    fichiers = [os.path.join(dossier, "Defi{:02d}.txt".format(numero))
+                for numero in range(premier, premier + len(plateaux))]
+    for fichier in fichiers:
+        if os.path.exists(fichier):
+            raise FileExistsError(fichier)
+    os.makedirs(dossier, exist_ok=True)
+    for fichier, plateau in zip(fichiers, plateaux):
+        with open(fichier, "x") as f:
+            if plateau.dimension != 6:
+                f.write("dimension {}\n".format(plateau.dimension))
+            if plateau.ligne_sortie != 2:
+                f.write("sortie {}\n".format(plateau.ligne_sortie))
+            for voiture in plateau.voitures.values():
+                f.write("{}\n".format(voiture))
+    return fichiers
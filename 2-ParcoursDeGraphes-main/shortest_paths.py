@@ -0,0 +1,245 @@
+# -*- coding: utf-8 -*-
+"""Plus courts chemins dans les graphes à capacités positives
+
+Ce module fonctionne sur tout graphe offrant `neighbors` et `capacity`:
+`graph.Graph`, les graphes networkx de `graph_networkx`, `csr_graph.CSRGraph`.
+
+L'algorithme de Dijkstra est implanté avec une file de priorité `heapq`:
+plutôt que de chercher et retirer le sommet de distance minimale dans une
+liste, on empile `(distance, sommet)` à chaque amélioration et on ignore à
+la sortie du tas les sommets déjà traités (suppression paresseuse).
+
+Pour les requêtes en masse, `all_pairs_distances` calcule toutes les
+distances d'un coup par l'algorithme de Floyd–Warshall vectorisé avec
+`numpy`; le résultat peut être conservé dans un fichier `.npy`.
+
+On vérifie les distances obtenues contre celles de networkx::
+
+    >>> import networkx
+    >>> import graph, graph_networkx
+    >>> from csr_graph import CSRGraph
+    >>> from shortest_paths import shortest_path
+    >>>
+    >>> for G, GN in zip( graph.examples.all(), graph_networkx.examples.all() ):
+    ...    if any(isinstance(c, str) for _, _, c in G.edges()):
+    ...        continue
+    ...    for u in G.nodes():
+    ...        expected = networkx.single_source_dijkstra_path_length(GN, u)
+    ...        for H in (G, GN, CSRGraph(G)):
+    ...            distance, _ = shortest_path(H, u)
+    ...            assert distance == expected
+"""
+
+from typing import Any, Dict, List, Optional, Tuple, Union
+import heapq
+import itertools
+import os
+import numpy
+from graph_networkx import Node, Capacity
+
+GraphType = Any
+
+
+def shortest_path(
+    G: GraphType, source: Node, target: Optional[Node] = None
+) -> Tuple[Dict[Node, Capacity], Dict[Node, Node]]:
+    """
+    Algorithme de Dijkstra depuis le sommet `source`
+
+    INPUT:
+
+        - G, un graphe dont les capacités sont des nombres positifs
+        - source, le sommet de départ
+        - target (optionnel), un sommet d'arrivée; la recherche s'arrête
+          dès que sa distance est connue
+
+    OUTPUT: un couple `(distance, predecessor)` de dictionnaires
+
+        - `distance[v]` est la distance de `source` à `v`, pour chaque
+          sommet `v` atteint (et traité, si `target` est donné)
+        - `predecessor[v]` est le sommet qui précède `v` sur un plus
+          court chemin depuis `source`
+
+    Les sommets inaccessibles n'apparaissent pas dans `distance`.
+
+    EXAMPLES::
+
+        >>> from graph import examples
+        >>> G = examples.dijkstra()
+        >>> distance, predecessor = shortest_path(G, 'A')
+        >>> distance['J']
+        487
+        >>> predecessor['J']
+        'H'
+        >>> distance, predecessor = shortest_path(G, 'A', 'F')
+        >>> distance
+        {'A': 0, 'B': 87, 'F': 167}
+
+    Complexity: O((n + m) log m) pour n sommets et m arêtes
+    """
+    distance: Dict[Node, Capacity] = {}  # distances définitives
+    candidate: Dict[Node, Capacity] = {source: 0}  # meilleures distances connues
+    predecessor: Dict[Node, Node] = {}
+    # Le compteur départage les égalités de distance sans comparer les sommets
+    counter = itertools.count()
+    heap = [(0, next(counter), source)]
+
+    while heap:
+        # Invariant: les sommets de `distance` ont leur distance définitive,
+        # et tout sommet dont la distance peut encore diminuer est dans le tas
+        dv, _, v = heapq.heappop(heap)
+        if v in distance:
+            # Entrée périmée: `v` a déjà été traité avec une distance plus petite
+            continue
+        distance[v] = dv
+        if v == target:
+            break
+        for w in G.neighbors(v):
+            dw = dv + G.capacity(v, w)
+            if w not in distance and (w not in candidate or dw < candidate[w]):
+                candidate[w] = dw
+                predecessor[w] = v
+                heapq.heappush(heap, (dw, next(counter), w))
+
+    return distance, {w: predecessor[w] for w in distance if w in predecessor}
+
+
+def path(predecessor: Dict[Node, Node], source: Node, target: Node) -> Optional[List]:
+    """
+    Reconstruit le chemin de `source` à `target` à partir des prédécesseurs
+
+    Renvoie `None` si `target` n'a pas été atteint.
+
+    EXAMPLES::
+
+        >>> from graph import examples
+        >>> G = examples.dijkstra()
+        >>> distance, predecessor = shortest_path(G, 'A', 'J')
+        >>> path(predecessor, 'A', 'J')
+        ['A', 'C', 'H', 'J']
+        >>> path(predecessor, 'A', 'A')
+        ['A']
+        >>> path(predecessor, 'A', 'D') is None
+        True
+
+    Complexity: Linéaire sur la longueur du chemin
+    """
+    if target != source and target not in predecessor:
+        return None
+    res = [target]
+    while res[-1] != source:
+        res.append(predecessor[res[-1]])
+    res.reverse()
+    return res
+
+
+def all_pairs_distances(
+    G: GraphType, successors: bool = False, cache: Optional[str] = None
+) -> Union[numpy.ndarray, Tuple[numpy.ndarray, numpy.ndarray]]:
+    """
+    Calcule les distances entre tous les couples de sommets (Floyd–Warshall)
+
+    INPUT:
+
+        - G, un graphe offrant `matrix()` (`graph.Graph`, `CSRGraph`),
+          dont les capacités sont des nombres positifs
+        - successors (default = False), si True renvoie aussi la matrice
+          des successeurs permettant de reconstruire les chemins
+        - cache (optionnel), un nom de fichier `.npy`; s'il existe, le
+          résultat y est lu, sinon il y est écrit après le calcul. C'est à
+          l'appelant de choisir un fichier propre au graphe.
+
+    OUTPUT: la matrice `D` des distances, indexée comme `G.nodes()`, avec
+    `inf` pour les couples non reliés; si `successors` est vrai, le couple
+    `(D, S)` où `S[i,j]` est l'indice du sommet qui suit le i-ème sur un
+    plus court chemin vers le j-ème (ou -1 s'il n'y en a pas).
+
+    EXAMPLES::
+
+        >>> from graph import examples
+        >>> G = examples.directed()
+        >>> all_pairs_distances(G)
+        array([[ 0., 12., 35., 12.],
+               [inf,  0., 23., inf],
+               [inf, inf,  0., inf],
+               [inf, inf, inf,  0.]])
+
+    Les distances coïncident avec celles de Dijkstra::
+
+        >>> G = examples.dijkstra()
+        >>> D = all_pairs_distances(G)
+        >>> nodes = G.nodes()
+        >>> all(D[nodes.index(u), nodes.index(v)] == d
+        ...     for u in nodes
+        ...     for v, d in shortest_path(G, u)[0].items())
+        True
+
+    Complexity: O(n³) opérations élémentaires, mais seulement n
+    opérations `numpy` (une par pivot)
+    """
+    result = None
+    if cache is not None and os.path.exists(cache):
+        data = numpy.load(cache)
+        # Un cache sans successeurs ne suffit pas si on les demande
+        if data.ndim == 3 or not successors:
+            result = data
+
+    if result is None:
+        D = numpy.array(G.matrix(), dtype=float)
+        n = len(D)
+        D[D == 0] = numpy.inf
+        D[numpy.arange(n), numpy.arange(n)] = 0
+        S = numpy.where(numpy.isfinite(D), numpy.arange(n)[None, :], -1)
+        for k in range(n):
+            # Invariant: D[i,j] est la longueur d'un plus court chemin de i
+            # à j dont les sommets intermédiaires sont d'indice < k
+            via = D[:, k, None] + D[None, k, :]
+            better = via < D
+            D = numpy.where(better, via, D)
+            if successors:
+                S = numpy.where(better, S[:, k, None], S)
+        result = numpy.stack((D, S)) if successors else D
+        if cache is not None:
+            numpy.save(cache, result)
+
+    if successors:
+        return result[0], result[1].astype(numpy.int64)
+    return result if result.ndim == 2 else result[0]
+
+
+def successor_path(
+    G: GraphType, S: numpy.ndarray, source: Node, target: Node
+) -> Optional[List]:
+    """
+    Reconstruit un plus court chemin à partir de la matrice des successeurs
+
+    INPUT:
+
+        - G, le graphe sur lequel `S` a été calculée
+        - S, la matrice des successeurs renvoyée par `all_pairs_distances`
+        - source, target, deux sommets de `G`
+
+    Renvoie `None` si `target` n'est pas accessible depuis `source`.
+
+    EXAMPLES::
+
+        >>> from graph import examples
+        >>> G = examples.dijkstra()
+        >>> D, S = all_pairs_distances(G, successors=True)
+        >>> successor_path(G, S, 'A', 'J')
+        ['A', 'C', 'H', 'J']
+        >>> successor_path(G, S, 'J', 'A')
+        ['J', 'H', 'C', 'A']
+
+    Complexity: Linéaire sur la longueur du chemin
+    """
+    nodes = G.nodes()
+    i = nodes.index(source)
+    j = nodes.index(target)
+    if S[i, j] < 0:
+        return None
+    res = [source]
+    while i != j:
+        i = S[i, j]
+        res.append(nodes[i])
+    return res
@@ -1,9 +1,46 @@
-"""A class to implement flows on networks"""
-
-from typing import Any, Iterable, List, Optional, Sequence, Tuple, Union, cast
+"""A class to implement flows on networks
+
+Les valeurs du flot sont stockées de deux façons possibles:
+
+- `storage="network"` (par défaut): dans un second réseau networkx, dont
+  les capacités sont les valeurs du flot;
+- `storage="array"`: dans un tableau `numpy` indexé par les numéros des
+  arêtes d'un `residual.ResidualNetwork` construit à la création du flot.
+  Les accès sont en temps constant et `flows`, `global_value`,
+  `check_capacity` et `check_in_out` sont vectorisés.
+
+Les deux modes offrent les mêmes méthodes::
+
+    >>> from network import examples
+    >>> F = Flow(examples.small_example2(), 0, 3,
+    ...          flow=examples.small_example2_flow(), storage="array")
+    >>> F.flow(0, 1), F.global_value(), F.check_in_out()
+    (5, 9, True)
+    >>> F == Flow(examples.small_example2(), 0, 3,
+    ...           flow=examples.small_example2_flow())
+    True
+
+Un flot peut aussi avoir plusieurs sources et plusieurs cibles: `s` (resp.
+`t`) est alors un dictionnaire qui associe à chaque source son offre
+(resp. à chaque cible sa demande), c'est-à-dire le flux net maximal
+qu'elle émet (resp. reçoit)::
+
+    >>> F = Flow(examples.small_example2(), {0: 9, 1: 2}, {3: 10},
+    ...          storage="array")
+    >>> F.source() is None, F.sources()
+    (True, {0: 9, 1: 2})
+"""
+
+from typing import (
+    Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple, Union, cast
+)
+from collections import deque
+import math
 import matplotlib.pyplot as plt  # type: ignore
 import networkx  # type: ignore
+import numpy
 from network import Network
+from residual import ResidualNetwork
 
 Node = Any
 Capacity = float
@@ -12,6 +49,10 @@ NetworkType = Any
 
 
 class Flow:
+    # Tolérance relative des vérifications (`check_capacity`, `check_in_out`,
+    # `min_cut`, `verify_optimal`) quand les capacités sont flottantes
+    tolerance = 1e-9
+
     def __init__(
         self,
         network: NetworkType,
@@ -19,6 +60,7 @@ class Flow:
         t: Node,
         flow: NetworkType = None,
         check: bool = True,
+        storage: str = "network",
     ):
         """
         Initialisation à partir d'un réseau et d'un second réseau représentant le flot.
@@ -28,23 +70,129 @@ class Flow:
         INPUT:
 
             - network, un reseau Network
-            - s, le sommet source
-            - t, le sommet cible
-            - flow (optionnel), un reseau Network
+            - s, le sommet source, ou un dictionnaire `{source: offre}`
+            - t, le sommet cible, ou un dictionnaire `{cible: demande}`
+            - flow (optionnel), un reseau Network (ou, en mode "array", un
+              tableau de valeurs indexé par les numéros des arêtes)
             - check (default = True), si True, un test de cohérence entre le flot et le
               réseau est lancé.
+            - storage (default = "network"), "network" ou "array": le mode de
+              stockage des valeurs du flot (voir la documentation du module)
         """
         self._network = network
-        self._s = s
-        self._t = t
-        if flow is None:
+        self._set_terminals(s, t)
+        self._residual: Optional[ResidualNetwork] = None
+        if storage == "array":
+            self._residual = ResidualNetwork(
+                network,
+                sources=None if self._s is not None else self._sources,
+                sinks=None if self._t is not None else self._sinks,
+            )
+            if flow is None:
+                self._values = self._residual.zero_flow()
+            else:
+                self._values = self._residual.from_flow(flow)
+        elif storage != "network":
+            raise ValueError("stockage inconnu: {!r}".format(storage))
+        elif flow is None:
             self._flow = Network(nodes=network.nodes(), edges=[])
         else:
             self._flow = flow
-            if check:
+        if flow is not None and check:
+            if not isinstance(flow, numpy.ndarray):
                 assert flow.nodes() == network.nodes()
-                assert self.check_capacity()
-                assert self.check_in_out()
+            assert self.check_capacity()
+            assert self.check_in_out()
+
+    @classmethod
+    def from_arrays(
+        cls, residual: ResidualNetwork, s: Node, t: Node, values: numpy.ndarray
+    ) -> "Flow":
+        """
+        Renvoie le flot de valeurs `values` (indexées par les arêtes de
+        `residual`) en mode de stockage "array", sans recopier `residual`
+
+        Si `s` (resp. `t`) vaut `None`, les sources (resp. cibles) sont
+        celles de `residual`.
+
+            >>> from network import examples
+            >>> R = ResidualNetwork(examples.small_example())
+            >>> F = Flow.from_arrays(R, 0, 3, R.dinic(0, 3))
+            >>> F.global_value()
+            6
+        """
+        F = cls.__new__(cls)
+        F._network = residual.network()
+        F._set_terminals(residual.sources if s is None else s,
+                         residual.sinks if t is None else t)
+        F._residual = residual
+        F._values = values
+        return F
+
+    def _set_terminals(self, s: Any, t: Any) -> None:
+        """
+        Enregistre la ou les sources `s` et la ou les cibles `t`
+        """
+        self._s = None if isinstance(s, dict) else s
+        self._t = None if isinstance(t, dict) else t
+        self._sources = dict(s) if isinstance(s, dict) else {s: math.inf}
+        self._sinks = dict(t) if isinstance(t, dict) else {t: math.inf}
+
+    def residual_network(self) -> Optional[ResidualNetwork]:
+        """
+        Renvoie le réseau résiduel qui numérote les arêtes, en mode de
+        stockage "array" (`None` sinon)
+        """
+        return self._residual
+
+    def values(self) -> numpy.ndarray:
+        """
+        Renvoie le tableau des valeurs du flot, indexé par les numéros des
+        arêtes (en mode "network", le tableau est construit)
+
+            >>> from flow_examples import flow_examples
+            >>> flow_examples.small_example2().values()
+            array([5, 4, 2, 3, 6])
+        """
+        if self._residual is None:
+            return ResidualNetwork(self.network()).from_flow(self)
+        return cast(numpy.ndarray, self._values)
+
+    def edge_id(self, v1: Node, v2: Node) -> int:
+        """
+        Renvoie le numéro de l'arête `(v1,v2)` en mode de stockage "array"
+
+        Les arcs résiduels de l'arête `e` sont `2e` (dans le sens de
+        l'arête) et `2e+1` (en sens inverse); l'inverse de l'arc `a` est
+        l'arc `a ^ 1`.
+
+            >>> from network import examples
+            >>> F = Flow(examples.small_example(), 0, 3, storage="array")
+            >>> F.edge_id(1, 3)
+            3
+        """
+        assert self._residual is not None
+        return self._residual.edge_index[v1, v2]
+
+    def residual_capacity(self, a: int) -> Capacity:
+        """
+        Renvoie la capacité résiduelle de l'arc `a`, en mode "array"
+
+            >>> from flow_examples import flow_examples
+            >>> F = Flow(flow_examples.small_example2().network(), 0, 3,
+            ...          flow=flow_examples.small_example2().values(),
+            ...          storage="array")
+            >>> a = 2 * F.edge_id(0, 1)
+            >>> F.residual_capacity(a), F.residual_capacity(a ^ 1)
+            (3, 5)
+
+        Complexity: O(1)
+        """
+        assert self._residual is not None
+        f = self._values[a >> 1].item()
+        if a & 1:
+            return cast(Capacity, f)
+        return cast(Capacity, self._residual.capacities[a >> 1].item() - f)
 
     def network(self) -> NetworkType:
         """
@@ -54,22 +202,39 @@ class Flow:
 
     def source(self) -> Node:
         """
-        Renvoie la source du flot
+        Renvoie la source du flot (`None` s'il a plusieurs sources)
         """
         return self._s
 
     def target(self) -> Node:
         """
-        Renvoie la cible du flot
+        Renvoie la cible du flot (`None` s'il a plusieurs cibles)
         """
         return self._t
 
+    def sources(self) -> Dict[Node, Capacity]:
+        """
+        Renvoie le dictionnaire qui associe à chaque source son offre
+        (infinie pour une source unique)
+        """
+        return self._sources
+
+    def sinks(self) -> Dict[Node, Capacity]:
+        """
+        Renvoie le dictionnaire qui associe à chaque cible sa demande
+        (infinie pour une cible unique)
+        """
+        return self._sinks
+
     def flows(self) -> Sequence[Edge]:
         """
         Renvoie une liste de triplets `(v1,v2,c)` correspondant aux arêtes
         du flot avec leur valeur.
 
         """
+        if self._residual is not None:
+            return tuple((a, b, f) for (a, b), f in
+                         zip(self._residual.edges(), self._values.tolist()))
         return tuple((a, b, self.flow(a, b)) for a, b in self.network().edges())
 
     def capacity(self, v1: Node, v2: Node) -> Capacity:
@@ -92,6 +257,9 @@ class Flow:
             - v1, un sommet du réseau
             - v2, un sommet du réseau
         """
+        if self._residual is not None:
+            e = self._residual.edge_index.get((v1, v2))
+            return cast(Capacity, 0 if e is None else self._values[e].item())
         return cast(Capacity, self._flow.capacity(v1, v2))
 
     def set_flow(self, v1: Node, v2: Node, f: Capacity) -> None:
@@ -103,8 +271,13 @@ class Flow:
             - v1, un sommet du réseau
             - v2, un sommet du réseau
             - f un nombre supérieur ou égal à 0
+
+        En mode de stockage "array", `(v1,v2)` doit être une arête du réseau.
         """
-        self._flow.set_edge_capacity(v1, v2, f)
+        if self._residual is not None:
+            self._values[self._residual.edge_index[v1, v2]] = f
+        else:
+            self._flow.set_edge_capacity(v1, v2, f)
 
     def add_flow(self, v1: Node, v2: Node, f: Capacity) -> None:
         """
@@ -116,7 +289,10 @@ class Flow:
             - v2, un sommet du réseau
             - f un nombre
         """
-        self._flow.set_edge_capacity(v1, v2, f + self.flow(v1, v2))
+        if self._residual is not None:
+            self._values[self._residual.edge_index[v1, v2]] += f
+        else:
+            self._flow.set_edge_capacity(v1, v2, f + self.flow(v1, v2))
 
     def __eq__(self, n2: Any) -> bool:
         """
@@ -128,56 +304,127 @@ class Flow:
         """
         if not isinstance(n2, Flow):
             return False
+        if self._residual is None and n2._residual is None:
+            return cast(bool,
+                        n2.network().is_equal(self.network()) and
+                        n2._flow.is_equal(self._flow))
         return cast(bool,
                     n2.network().is_equal(self.network()) and
-                    n2._flow.is_equal(self._flow))
+                    sorted(n2.flows()) == sorted(self.flows()))
 
     def flow_in(self, v: Node) -> Capacity:
         """
         Renvoie la somme des flots entrant sur le sommet v
         """
+        if self._residual is not None:
+            return cast(Capacity, self._values[self._residual.in_edges(v)].sum().item())
         return sum([self.flow(x, v) for x in self.network().predecessors(v)])
 
     def flow_out(self, v: Node) -> Capacity:
         """
         Renvoie la somme des flots sortant du sommet v
         """
+        if self._residual is not None:
+            return cast(Capacity,
+                        self._values[self._residual.out_edges(v)].sum().item())
         return sum([self.flow(v, x) for x in self.network().successors(v)])
 
     def global_value(self) -> Capacity:
         """
-        Renvoie la valeur globale du flot (flux net entrant sur la source,
-        ou flux net sortant de la cible)
+        Renvoie la valeur globale du flot (flux net sortant des sources,
+        ou flux net entrant sur les cibles)
+        """
+        return sum(self.flow_out(v) - self.flow_in(v) for v in self._sources)
+
+    def epsilon(self) -> float:
         """
-        return self.flow_out(self.source()) - self.flow_in(self.source())
+        Renvoie l'écart absolu toléré par les vérifications du flot
+
+        Il est nul si toutes les capacités sont entières; sinon, les
+        erreurs d'arrondi des algorithmes sont tolérées jusqu'à `tolerance`
+        fois la plus grande capacité finie du réseau.
+
+            >>> from network import Network
+            >>> N = Network(nodes=[0, 1, 2], edges=[(0, 1, 0.1), (1, 2, 0.3)])
+            >>> F = Flow(N, 0, 2, storage="array")
+            >>> F.epsilon()
+            3e-10
+            >>> Flow(N, 0, 2).epsilon() == F.epsilon()
+            True
+            >>> from network import examples
+            >>> Flow(examples.small_example2(), 0, 3).epsilon()
+            0
+
+        Complexity: O(m)
+        """
+        if self._residual is not None:
+            array = self._residual.capacities
+            if not numpy.issubdtype(array.dtype, numpy.floating):
+                return 0
+            finite = numpy.abs(array[numpy.isfinite(array)])
+            return Flow.tolerance * float(finite.max(initial=0))
+        capacities = [self.capacity(v, w) for v, w in self.network().edges()]
+        if all(isinstance(c, (int, numpy.integer)) for c in capacities):
+            return 0
+        return Flow.tolerance * max((abs(c) for c in capacities if math.isfinite(c)),
+                                    default=0)
 
     def check_capacity(self) -> bool:
         """
         Renvoie vrai si la valeur du flot est bien inférieure ou égale à la capacité du
-        réseau sur chacune des arêtes
+        réseau sur chacune des arêtes, à `epsilon` près
         """
+        epsilon = self.epsilon()
+        if self._residual is not None:
+            return bool((self._values <= self._residual.capacities + epsilon).all())
         res = True
         i = 0
         flows = self.flows()
         while res and i < len(flows):
             (v, w, f) = flows[i]
-            res = (f <= self.capacity(v, w))
+            res = (f <= self.capacity(v, w) + epsilon)
             i += 1
         return res
 
     def check_in_out(self) -> bool:
         """
         Renvoie vrai si la somme des flots entrant est égales à la somme des flots
-        sortant sur chacun des sommets en dehors de la source et la cible
-        """
-        res = True
+        sortant sur chacun des sommets en dehors de la source et la cible, à
+        `epsilon` près
+
+        S'il y a plusieurs sources (resp. cibles), le flux net sortant de
+        chacune (resp. entrant) doit de plus être inférieur à son offre
+        (resp. sa demande).
+
+        Avec des capacités flottantes, les erreurs d'arrondi sont tolérées::
+
+            >>> from network import Network
+            >>> N = Network(nodes=[0, 1, 2, 3],
+            ...             edges=[(0, 1, 0.1), (0, 2, 0.2), (1, 2, 1), (2, 3, 1)])
+            >>> valeurs = Network(nodes=[0, 1, 2, 3],
+            ...                   edges=[(0, 1, 0.1), (0, 2, 0.2), (1, 2, 0.1),
+            ...                          (2, 3, 0.3)])
+            >>> F = Flow(N, 0, 3, flow=valeurs, storage="array")
+            >>> F.flow_in(2) == F.flow_out(2), F.check_in_out()
+            (False, True)
+            >>> Flow(N, 0, 3, flow=valeurs).check_in_out()
+            True
+        """
+        epsilon = self.epsilon()
+        if self._residual is not None:
+            balance = self._residual.balance(self._values)
+            balance[list(self._residual.terminals(self._s, self._t))] = 0
+            return not (numpy.abs(balance) > epsilon).any()
+        res = all(self.flow_out(v) - self.flow_in(v) <= c + epsilon
+                  for v, c in self._sources.items()) and \
+            all(self.flow_in(v) - self.flow_out(v) <= c + epsilon
+                for v, c in self._sinks.items())
         i = 0
-        nodes = list(self.network().nodes())
-        nodes.remove(self.source())
-        nodes.remove(self.target())
+        nodes = [v for v in self.network().nodes()
+                 if v not in self._sources and v not in self._sinks]
         while res and i < len(nodes):
             v = nodes[i]
-            res = (self.flow_in(v) == self.flow_out(v))
+            res = abs(self.flow_in(v) - self.flow_out(v)) <= epsilon
             i += 1
         return res
 
@@ -196,7 +443,7 @@ class Flow:
             marked_nodes = set()
         color_map = [
             "green"
-            if n == self.source() or n == self.target()
+            if n in self._sources or n in self._sinks
             else "red"
             if n in marked_nodes
             else "lightgray"
@@ -241,7 +488,9 @@ class Flow:
 
         * si aucune chaîne n'est trouvée, la méthode renvoie `None`
 
+        Le flot doit avoir une seule source et une seule cible.
         """
+        self._check_single_terminals()
         N = self.network()
         marked = set() # L'ensemble des sommets déjà rencontrés
         
@@ -279,6 +528,189 @@ class Flow:
         else:
             return None
 
+    def find_shortest_augmenting_path(self) -> Optional[List]:
+        """
+        Cherche une chaine augmentante de longueur minimale sur le flot
+        (en nombre d'arêtes)
+
+        Le résultat a la même forme que celui de `find_augmenting_path`.
+        Le parcours en largeur est itératif: il n'est pas limité par la
+        profondeur de récursion de Python. Augmenter le flot le long de
+        chaines de longueur minimale (algorithme d'Edmonds–Karp) borne le
+        nombre d'augmentations par O(nm), indépendamment des capacités.
+
+        EXAMPLES::
+
+            >>> from flow_examples import flow_examples
+            >>> F = flow_examples.small_example()
+            >>> F.find_shortest_augmenting_path()
+            [(0, 1, 3), (1, 3, 3)]
+            >>> F.increase_augmenting_path(F.find_shortest_augmenting_path())
+            >>> F.find_shortest_augmenting_path()
+            [(0, 2, 3), (2, 3, 3)]
+
+        Complexity: O(n + m) pour n sommets et m arêtes
+        """
+        s = self.source()
+        t = self.target()
+        parent = self._residual_search(stop=True)
+        if t not in parent:
+            return None
+        path = []
+        w = t
+        while w != s:
+            (v1, v2, p) = parent[w]
+            path.append((v1, v2, p))
+            w = v1 if p > 0 else v2
+        path.reverse()
+        return path
+
+    def _residual_search(self, stop: bool, epsilon: float = 0) -> Dict[Node, Edge]:
+        """
+        Parcours en largeur du graphe résiduel depuis la source
+
+        Renvoie un dictionnaire qui associe à chaque sommet atteint (hors
+        la source) l'arête `(v1,v2,p)` par laquelle il a été atteint, comme
+        dans `find_augmenting_path`. Si `stop` est vrai, le parcours
+        s'arrête dès que la cible est atteinte. Les arcs de capacité
+        résiduelle au plus `epsilon` sont ignorés.
+        """
+        self._check_single_terminals()
+        N = self.network()
+        s = self.source()
+        t = self.target()
+        # parent[w] est l'arête `(v1,v2,p)` par laquelle `w` a été atteint
+        parent: Dict[Node, Edge] = {}
+        todo = deque([s])
+        while todo and not (stop and t in parent):
+            v = todo.popleft()
+            # Arêtes dans le bon sens
+            for w in N.successors(v):
+                if w != s and w not in parent:
+                    r = N.capacity(v, w) - self.flow(v, w)
+                    if r > epsilon:
+                        parent[w] = (v, w, r)
+                        todo.append(w)
+            # Arêtes dans le mauvais sens
+            for w in N.predecessors(v):
+                if w != s and w not in parent:
+                    f = self.flow(w, v)
+                    if f > epsilon:
+                        parent[w] = (w, v, -f)
+                        todo.append(w)
+        return parent
+
+    def _check_single_terminals(self) -> None:
+        """
+        Lève une ValueError si le flot a plusieurs sources ou cibles
+        """
+        if self._s is None or self._t is None:
+            raise ValueError("plusieurs sources ou cibles: utiliser le "
+                             "stockage \"array\"")
+
+    ### Coupe minimale ###
+
+    def _cut(self) -> Tuple[numpy.ndarray, numpy.ndarray]:
+        """
+        En mode de stockage "array", renvoie le tableau booléen des
+        sommets de `residual_network()` accessibles depuis la ou les
+        sources dans le graphe résiduel (à `epsilon` près), et celui des
+        arêtes (virtuelles comprises) qui sortent de ces sommets
+        """
+        R = self._residual
+        assert R is not None
+        reached = R.reachable(self._values, self._s, self.epsilon())
+        return (reached, reached[R.tails] & ~reached[R.heads])
+
+    def min_cut(self) -> Tuple[Set[Node], Set[Node], List[Tuple[Node, Node]]]:
+        """
+        Renvoie la coupe associée au flot: un triplet `(S, T, edges)` où
+
+        * `S` est l'ensemble des sommets accessibles depuis la ou les
+          sources dans le graphe résiduel, et `T` l'ensemble des autres
+          sommets
+        * `edges` est la liste des arêtes `(v1,v2)` du réseau qui vont de
+          `S` à `T`
+
+        Si le flot est maximal, la cible est dans `T` et `(S, T)` est une
+        coupe de capacité minimale, égale à la valeur du flot (théorème
+        flot max / coupe min); voir `verify_optimal`. Avec des capacités
+        flottantes, les arcs de capacité résiduelle au plus `epsilon` sont
+        considérés comme saturés.
+
+        EXAMPLES::
+
+            >>> from network import examples
+            >>> from ford_fulkerson import maximal_flow
+            >>> F = maximal_flow(examples.small_example2(), 0, 3)
+            >>> F.min_cut()
+            ({0, 1, 2}, {3}, [(1, 3), (2, 3)])
+            >>> maximal_flow(examples.small_example2(), 0, 3, "dinic").min_cut()
+            ({0, 1, 2}, {3}, [(1, 3), (2, 3)])
+
+        Avec plusieurs sources ou cibles, ou des capacités sur les sommets,
+        la coupe peut aussi passer par les offres, les demandes ou les
+        capacités des sommets: `edges` ne contient que les arêtes du réseau.
+
+        Complexity: un seul parcours en largeur, O(n + m)
+        """
+        R = self._residual
+        if R is not None:
+            (reached, cut) = self._cut()
+            n = R.number_of_nodes()
+            S = {R.nodes[i] for i in numpy.flatnonzero(reached[:n]).tolist()}
+            m = R.number_of_edges()
+            edges = [R.edges()[e] for e in numpy.flatnonzero(cut[:m]).tolist()]
+        else:
+            S = set(self._residual_search(stop=False, epsilon=self.epsilon()))
+            S.add(self.source())
+            edges = [(v, w) for v in S
+                     for w in self.network().successors(v) if w not in S]
+        T = set(self.network().nodes()) - S
+        return (S, T, edges)
+
+    def verify_optimal(self) -> bool:
+        """
+        Renvoie vrai si le flot est un flot maximal
+
+        Le certificat est la coupe de `min_cut`: le flot est maximal si et
+        seulement s'il est réalisable (`check_capacity`, `check_in_out`),
+        si la cible n'est pas accessible dans le graphe résiduel, et si sa
+        valeur est égale à la capacité de la coupe. Avec des capacités
+        flottantes, chaque arête qui traverse la coupe peut écarter ces deux
+        valeurs de `epsilon`.
+
+        EXAMPLES::
+
+            >>> from flow_examples import flow_examples
+            >>> from ford_fulkerson import maximal_flow
+            >>> F = flow_examples.small_example2()
+            >>> F.global_value(), F.verify_optimal()
+            (9, True)
+            >>> flow_examples.small_example().verify_optimal()
+            False
+            >>> flow_examples.wrong_capacity().verify_optimal()
+            False
+
+        Complexity: O(n + m) (vectorisé en mode de stockage "array")
+        """
+        R = self._residual
+        if R is not None:
+            (reached, cut) = self._cut()
+            if reached[R.terminals(self._s, self._t)[1]] or \
+                    not (self.check_capacity() and self.check_in_out()):
+                return False
+            crossing = cut.sum() + (reached[R.heads] & ~reached[R.tails]).sum()
+            return bool(abs(self.global_value() - R.capacities[cut].sum()) <=
+                        self.epsilon() * crossing)
+        (S, T, edges) = self.min_cut()
+        if self.target() in S or not (self.check_capacity() and self.check_in_out()):
+            return False
+        backward = sum(1 for v, w in self.network().edges() if v in T and w in S)
+        return bool(abs(self.global_value() -
+                        sum(self.capacity(v, w) for v, w in edges)) <=
+                    self.epsilon() * (len(edges) + backward))
+
     def increase_augmenting_path(self, path: List) -> None:
         """
         Modifie le flot en fonction de la chaine augmentante `path`
@@ -0,0 +1,134 @@
+"""Benchmarks of the maximal flow algorithms
+
+On compare les algorithmes de `ford_fulkerson.maximal_flow` sur des
+réseaux de livraison denses, à la manière de `04-Application.md`: une
+source `S` reliée à des usines, chaque usine reliée à une proportion
+`density` des magasins, et chaque magasin relié à la cible `T`.
+
+    >>> from flow_benchmark import benchmark, supply_network
+    >>> N = supply_network(3, 5, density=0.5, seed=0)
+    >>> N.number_of_nodes()
+    10
+    >>> results = benchmark([N], algorithms=["ford_fulkerson", "push_relabel"])
+    >>> [(r["algorithm"], r["value"]) for r in results]
+    [('ford_fulkerson', 884), ('push_relabel', 884)]
+
+En ligne de commande::
+
+    python flow_benchmark.py --factories 300 --stores 1000 --density 0.3
+
+Ford–Fulkerson (parcours en profondeur sur networkx) demande déjà une
+minute pour 50 usines et 200 magasins; "dinic" et "push_relabel"
+traitent 1000 usines et 3000 magasins (300 000 arêtes) en moins d'une
+seconde.
+"""
+
+from typing import Dict, List, Optional, Sequence
+import argparse
+import random
+import sys
+import time
+from network import Network, NetworkType
+from ford_fulkerson import ALGORITHMS, maximal_flow
+
+
+def supply_network(
+    factories: int,
+    stores: int,
+    density: float = 0.3,
+    seed: int = 0,
+    production: int = 1000,
+) -> NetworkType:
+    """
+    Renvoie un réseau de livraison aléatoire de source `S` et de cible `T`
+
+    INPUT:
+
+        - factories, le nombre d'usines `A0, A1, ...`
+        - stores, le nombre de magasins `B0, B1, ...`
+        - density (default = 0.3), la probabilité qu'une usine puisse
+          livrer un magasin donné
+        - seed (default = 0), la graine du générateur aléatoire
+        - production (default = 1000), la production maximale d'une usine;
+          les commandes des magasins sont du même ordre de grandeur
+
+    Les productions, les commandes et les capacités de livraison sont
+    tirées uniformément.
+
+        >>> N = supply_network(2, 3, density=1)
+        >>> N.number_of_edges()
+        11
+    """
+    rng = random.Random(seed)
+    A = ["A{}".format(i) for i in range(factories)]
+    B = ["B{}".format(j) for j in range(stores)]
+    order = production * factories // max(stores, 1)
+    edges = [("S", a, rng.randint(1, production)) for a in A]
+    for a in A:
+        for b in B:
+            if rng.random() < density:
+                edges.append((a, b, rng.randint(1, production)))
+    edges += [(b, "T", rng.randint(1, max(order, 1))) for b in B]
+    return Network(nodes=["S"] + A + B + ["T"], edges=edges)
+
+
+def benchmark(
+    networks: Sequence[NetworkType],
+    algorithms: Sequence[str] = ALGORITHMS,
+    s: str = "S",
+    t: str = "T",
+) -> List[Dict]:
+    """
+    Calcule un flot maximal de chaque réseau avec chaque algorithme
+
+    OUTPUT: une liste de dictionnaires décrivant chaque mesure: numéro
+    du réseau, nombres de sommets et d'arêtes, algorithme, valeur du flot
+    et temps écoulé en secondes (conversion en `Flow` comprise)
+    """
+    results = []
+    for i, N in enumerate(networks):
+        for algorithm in algorithms:
+            start = time.perf_counter()
+            F = maximal_flow(N, s, t, algorithm)
+            seconds = time.perf_counter() - start
+            results.append({
+                "network": i,
+                "nodes": N.number_of_nodes(),
+                "edges": N.number_of_edges(),
+                "algorithm": algorithm,
+                "value": F.global_value(),
+                "seconds": seconds,
+            })
+    return results
+
+
+def main(arguments: Optional[List[str]] = None) -> int:
+    """
+    Point d'entrée en ligne de commande; renvoie 1 si les algorithmes ne
+    trouvent pas tous la même valeur
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--factories", type=int, nargs="*", default=[20, 50])
+    parser.add_argument("--stores", type=int, nargs="*", default=[100, 200])
+    parser.add_argument("--density", type=float, default=0.3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--algorithms", nargs="*", default=list(ALGORITHMS))
+    args = parser.parse_args(arguments)
+
+    # Le parcours en profondeur récursif de Ford–Fulkerson peut être
+    # aussi long que le réseau
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), 100000))
+    res = 0
+    for a, b in zip(args.factories, args.stores):
+        N = supply_network(a, b, args.density, args.seed)
+        results = benchmark([N], args.algorithms)
+        for r in results:
+            print("{nodes:>7} {edges:>9} {algorithm:>15} {value:>10} "
+                  "{seconds:9.3f}s".format(**r), flush=True)
+        if len({r["value"] for r in results}) > 1:
+            res = 1
+    return res
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,11 +1,25 @@
-from typing import Any
+from typing import Any, Dict, Optional, Sequence, Tuple
+import numpy
 from flow import Flow
 from network import NetworkType
+from residual import ResidualNetwork
 
 Node = Any
+Edge = Tuple[Node, Node, Any]
 
 
-def maximal_flow(network: NetworkType, s: Node, t: Node) -> Flow:
+ALGORITHMS = ("ford_fulkerson", "edmonds_karp", "dinic", "push_relabel")
+
+
+def maximal_flow(
+    network: NetworkType,
+    s: Node = None,
+    t: Node = None,
+    algorithm: Optional[str] = None,
+    sources: Optional[Dict[Node, Any]] = None,
+    sinks: Optional[Dict[Node, Any]] = None,
+    node_capacity: Optional[Dict[Node, Any]] = None,
+) -> Flow:
     """
     Renvoie le flot maximal sur le réseau `network` entre la source `s` et la cible `t`.
 
@@ -14,16 +28,176 @@ def maximal_flow(network: NetworkType, s: Node, t: Node) -> Flow:
         - network, un réseau de type Network
         - s, le sommet source
         - t, le sommet cible
+        - algorithm (default = "ford_fulkerson", ou "dinic" si l'un des
+          trois paramètres suivants est donné), la méthode de recherche
+          des chaînes augmentantes:
+
+          - "ford_fulkerson": parcours en profondeur récursif
+            (`Flow.find_augmenting_path`), chaîne quelconque
+          - "edmonds_karp": parcours en largeur itératif
+            (`Flow.find_shortest_augmenting_path`), chaîne de longueur
+            minimale; O(nm²) quelles que soient les capacités
+          - "dinic": flots bloquants sur le graphe de niveaux
+            (`ResidualNetwork.dinic`), calculés sur des tableaux plats
+            construits une fois pour toutes; O(n²m)
+          - "push_relabel": poussage–réétiquetage par label maximal
+            (`ResidualNetwork.push_relabel`), pour les réseaux denses
+
+        - sources (optionnel), un dictionnaire `{sommet: offre}` qui
+          remplace `s`: plusieurs sources, chacune émettant au plus son
+          offre
+        - sinks (optionnel), un dictionnaire `{sommet: demande}` qui
+          remplace `t`: plusieurs cibles, chacune recevant au plus sa
+          demande
+        - node_capacity (optionnel), un dictionnaire `{sommet: capacité}`:
+          la quantité maximale de flot qui traverse chaque sommet
+
+    Les trois derniers paramètres sont traduits dans les tableaux de
+    `ResidualNetwork` (source et cible virtuelles, sommets dédoublés), sans
+    copier le réseau: ils ne sont possibles qu'avec "dinic" et
+    "push_relabel".
 
     OUTPUT : un objet Flow de valeur maximale sur le réseau.
+
+    EXAMPLES::
+
+        >>> from network import examples
+        >>> maximal_flow(examples.example1(), 0, 6).global_value()
+        4
+        >>> maximal_flow(examples.example1(), 0, 6, "edmonds_karp").global_value()
+        4
+        >>> maximal_flow(examples.example1(), 0, 6, "dinic").global_value()
+        4
+        >>> maximal_flow(examples.example1(), 0, 6, "push_relabel").global_value()
+        4
+        >>> maximal_flow(examples.small_example(), 0, 3, "dfs")
+        Traceback (most recent call last):
+        ...
+        ValueError: algorithme inconnu: 'dfs'
+
+    Le problème de livraison de `04-Application.md`, sans ajouter la
+    source `S` et la cible `T` au réseau: les productions des usines sont
+    des offres et les commandes des magasins des demandes. Avec un
+    entrepôt `B4` qui ne peut traiter que 120 unités::
+
+        >>> from network import Network
+        >>> N = Network(nodes=['A1', 'A2', 'A3', 'B1', 'B2', 'B3', 'B4', 'B5'],
+        ...             edges=[('A1', 'B1', 300), ('A1', 'B3', 300),
+        ...                    ('A2', 'B2', 500), ('A2', 'B4', 500),
+        ...                    ('A3', 'B3', 100), ('A3', 'B4', 100),
+        ...                    ('A3', 'B5', 100)])
+        >>> sources = {'A1': 300, 'A2': 500, 'A3': 100}
+        >>> sinks = {'B1': 100, 'B2': 50, 'B3': 80, 'B4': 300, 'B5': 200}
+        >>> F = maximal_flow(N, sources=sources, sinks=sinks)
+        >>> F.global_value(), F.verify_optimal()
+        (630, True)
+        >>> F = maximal_flow(N, sources=sources, sinks=sinks,
+        ...                  node_capacity={'B4': 120})
+        >>> F.global_value(), F.flow_in('B4'), F.verify_optimal()
+        (450, 120, True)
+        >>> maximal_flow(N, 'A1', 'B3', "edmonds_karp", node_capacity={'B2': 5})
+        Traceback (most recent call last):
+        ...
+        ValueError: sources, sinks et node_capacity demandent "dinic" ou "push_relabel"
     """
+    extended = not (sources is None and sinks is None and node_capacity is None)
+    if algorithm is None:
+        algorithm = "dinic" if extended else "ford_fulkerson"
+    if algorithm in ("dinic", "push_relabel"):
+        R = ResidualNetwork(network, sources, sinks, node_capacity)
+        if sources is not None:
+            s = None
+        if sinks is not None:
+            t = None
+        if algorithm == "dinic":
+            return R.to_flow(s, t, R.dinic(s, t))
+        return R.to_flow(s, t, R.push_relabel(s, t))
+    if extended and algorithm in ALGORITHMS:
+        raise ValueError('sources, sinks et node_capacity demandent "dinic" '
+                         'ou "push_relabel"')
+    if algorithm == "ford_fulkerson":
+        find_path = Flow.find_augmenting_path
+    elif algorithm == "edmonds_karp":
+        find_path = Flow.find_shortest_augmenting_path
+    else:
+        raise ValueError("algorithme inconnu: {!r}".format(algorithm))
+
     # Initialisation par le flot vide
     F = Flow(network, s, t, check=False)
-    
+
     # Tant qu'il y a des chaînes augmentantes on met à jour le flot
-    chain = F.find_augmenting_path()
+    chain = find_path(F)
     while chain is not None:
         F.increase_augmenting_path(chain)
-        chain = F.find_augmenting_path()
-        
-    return F
\ No newline at end of file
+        chain = find_path(F)
+
+    return F
+
+
+def reoptimize(flow: Flow, changes: Sequence[Edge]) -> Flow:
+    """
+    Renvoie un flot maximal après modification de capacités, en partant
+    du flot `flow` plutôt que du flot nul
+
+    INPUT:
+
+        - flow, un flot (de préférence maximal) sur un réseau
+        - changes, une liste de triplets `(v1,v2,c)`: la nouvelle capacité
+          `c` de l'arête `(v1,v2)`; une capacité nulle supprime l'arête, et
+          une arête absente est ajoutée
+
+    OUTPUT: un flot maximal sur le réseau modifié, en mode de stockage
+    "array"
+
+    Le réseau `flow.network()` est modifié en place: `flow` n'est plus
+    nécessairement compatible avec ses capacités. Les valeurs qui dépassent
+    les nouvelles capacités sont corrigées localement
+    (`ResidualNetwork.repair`), puis le flot corrigé est augmenté par
+    l'algorithme de Dinic. Si `flow` est stocké en tableaux et que les
+    modifications ne changent que des capacités non nulles, la
+    numérotation des arêtes de `flow` est réutilisée telle quelle.
+
+    EXAMPLES::
+
+        >>> from network import examples
+        >>> N = examples.small_example2()
+        >>> F = maximal_flow(N, 0, 3, "dinic")
+        >>> F.global_value()
+        9
+        >>> G = reoptimize(F, [(1, 3, 1), (1, 2, 4)])
+        >>> G.global_value(), G.check_capacity(), G.check_in_out()
+        (7, True, True)
+        >>> G = reoptimize(G, [(2, 3, 2), (0, 3, 5)])
+        >>> G.global_value() == maximal_flow(N, 0, 3).global_value() == 8
+        True
+
+    Complexity: un chemin par arête réduite pour la correction, puis
+    des phases de Dinic; en général bien moins qu'un calcul complet
+    """
+    s = flow.source()
+    t = flow.target()
+    N = flow.network()
+    R = flow.residual_network()
+    in_place = R is not None and all(
+        (v1, v2) in R.edge_index and c != 0 for v1, v2, c in changes
+    )
+    for v1, v2, c in changes:
+        N.set_edge_capacity(v1, v2, c)
+    if R is not None and in_place:
+        values = flow.values().copy()
+        capacities = numpy.array([c for _, _, c in changes])
+        if len(changes):
+            R.capacities = R.capacities.astype(
+                numpy.result_type(R.capacities, capacities))
+        for (v1, v2, _), c in zip(changes, capacities):
+            R.capacities[R.edge_index[v1, v2]] = c
+    else:
+        R = ResidualNetwork(
+            N,
+            sources=None if s is not None else flow.sources(),
+            sinks=None if t is not None else flow.sinks(),
+            node_capacity=None if R is None else R.node_capacity,
+        )
+        values = R.from_flow(flow)
+    values = R.repair(s, t, values)
+    return R.to_flow(s, t, R.dinic(s, t, values))
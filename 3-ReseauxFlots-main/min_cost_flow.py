@@ -0,0 +1,98 @@
+"""Minimum cost flows
+
+Chaque arête `(v1,v2)` du réseau porte, en plus de sa capacité, un coût
+par unité de flot (une distance, un prix, ...), donné par un dictionnaire
+`costs`. On cherche, parmi les flots maximaux (ou de valeur donnée), un
+flot de coût total minimal.
+
+Pour le challenge Vélib, avec la distance entre stations comme coût, on
+obtient un flot maximal qui minimise la distance totale parcourue par les
+vélos transportés.
+
+    >>> from network import Network
+    >>> from min_cost_flow import min_cost_flow, flow_cost
+    >>> N = Network(nodes=['S', 'A', 'B', 'T'],
+    ...             edges=[('S', 'A', 2), ('S', 'B', 2), ('A', 'B', 1),
+    ...                    ('A', 'T', 1), ('B', 'T', 3)])
+    >>> costs = {('S', 'A'): 1, ('S', 'B'): 4, ('A', 'B'): 1,
+    ...          ('A', 'T'): 3, ('B', 'T'): 1}
+    >>> F = min_cost_flow(N, 'S', 'T', costs)
+    >>> F.global_value(), flow_cost(F, costs)
+    (4, 17)
+    >>> sorted((v1, v2, f) for v1, v2, f in F.flows() if f)
+    [('A', 'B', 1), ('A', 'T', 1), ('B', 'T', 3), ('S', 'A', 2), ('S', 'B', 2)]
+"""
+
+from typing import Any, Dict, Optional, Tuple
+import numpy
+from flow import Flow
+from network import NetworkType
+from residual import ResidualNetwork
+
+Node = Any
+Cost = Any
+
+
+def edge_costs(
+    R: ResidualNetwork, costs: Dict[Tuple[Node, Node], Cost]
+) -> numpy.ndarray:
+    """
+    Renvoie le tableau des coûts des arêtes de `R`, dans l'ordre de leurs
+    numéros; les arêtes absentes de `costs` ont un coût nul
+    """
+    return numpy.array([costs.get(e, 0) for e in R.edges()])
+
+
+def min_cost_flow(
+    network: NetworkType,
+    s: Node,
+    t: Node,
+    costs: Dict[Tuple[Node, Node], Cost],
+    value: Optional[Any] = None,
+) -> Flow:
+    """
+    Renvoie un flot de coût minimal de `s` à `t` sur `network`
+
+    INPUT:
+
+        - network, un réseau de type Network
+        - s, le sommet source
+        - t, le sommet cible
+        - costs, un dictionnaire qui associe à une arête `(v1,v2)` son coût
+          par unité de flot; les arêtes absentes ont un coût nul
+        - value (optionnel), la valeur du flot voulu; par défaut, on
+          cherche un flot maximal de coût minimal
+
+    OUTPUT: un objet Flow, en mode de stockage "array"
+
+    Algorithme des plus courts chemins successifs, avec potentiels de
+    Johnson (voir `ResidualNetwork.min_cost_flow`).
+
+    EXAMPLES::
+
+        >>> from network import examples
+        >>> N = examples.small_example2()
+        >>> costs = {(0, 1): 1, (0, 2): 5, (1, 2): 1, (1, 3): 4, (2, 3): 1}
+        >>> F = min_cost_flow(N, 0, 3, costs, value=3)
+        >>> F.global_value(), flow_cost(F, costs)
+        (3, 11)
+        >>> F = min_cost_flow(N, 0, 3, costs)
+        >>> F.global_value(), flow_cost(F, costs), F.verify_optimal()
+        (9, 45, True)
+
+    Complexity: O(k m log n) pour k augmentations
+    """
+    R = ResidualNetwork(network)
+    return R.to_flow(s, t, R.min_cost_flow(s, t, edge_costs(R, costs), value))
+
+
+def flow_cost(F: Flow, costs: Dict[Tuple[Node, Node], Cost]) -> Cost:
+    """
+    Renvoie le coût total du flot `F`: la somme, sur les arêtes, du flot
+    multiplié par le coût
+
+        >>> from flow_examples import flow_examples
+        >>> flow_cost(flow_examples.small_example2(), {(0, 1): 2, (2, 3): 1})
+        16
+    """
+    return sum(f * costs.get((v1, v2), 0) for v1, v2, f in F.flows())
@@ -0,0 +1,943 @@
+"""Residual networks stored in flat arrays, and Dinic's algorithm
+
+Un `ResidualNetwork` est construit une fois pour toutes à partir d'un
+`Network`: les sommets sont numérotés de 0 à n-1 et les arêtes de 0 à
+m-1. Chaque arête `e` donne deux arcs résiduels:
+
+- l'arc `2e`, dans le sens de l'arête, de capacité résiduelle `c - f`;
+- l'arc `2e+1`, en sens inverse, de capacité résiduelle `f`.
+
+L'arc inverse de l'arc `a` est donc `a ^ 1`. Les arcs qui partent de
+chaque sommet sont rangés de façon contiguë (format CSR): ceux du sommet
+`i` sont `arcs[start[i]:start[i+1]]`. Les parcours n'utilisent que des
+listes d'entiers, sans passer par les dictionnaires de networkx.
+
+Plusieurs sources et cibles, et des capacités sur les sommets, sont prises
+en compte directement dans les tableaux, sans modifier ni copier le
+réseau: les numéros d'arêtes suivant ceux des m arêtes du réseau sont
+réservés à des arêtes virtuelles (voir `ResidualNetwork.__init__`).
+
+    >>> from network import examples
+    >>> from residual import ResidualNetwork
+    >>> R = ResidualNetwork(examples.small_example())
+    >>> R.number_of_nodes(), R.number_of_edges()
+    (4, 5)
+    >>> flow = R.dinic(0, 3)
+    >>> R.value(flow, 0)
+    6
+    >>> R.to_flow(0, 3, flow).flows()
+    ((0, 1, 3), (0, 2, 3), (1, 2, 0), (1, 3, 3), (2, 3, 3))
+"""
+
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple, cast
+from collections import deque
+import heapq
+import numpy
+
+if TYPE_CHECKING:
+    from flow import Flow
+
+Node = Any
+NetworkType = Any
+
+
+class ResidualNetwork:
+    """
+    Le graphe résiduel d'un réseau, sous forme de tableaux plats
+    """
+
+    nodes: List[Node]
+    index: Dict[Node, int]
+    edge_index: Dict[Tuple[Node, Node], int]
+    tails: numpy.ndarray
+    heads: numpy.ndarray
+    capacities: numpy.ndarray
+    start: numpy.ndarray
+    arcs: numpy.ndarray
+
+    def __init__(
+        self,
+        network: NetworkType,
+        sources: Optional[Dict[Node, Any]] = None,
+        sinks: Optional[Dict[Node, Any]] = None,
+        node_capacity: Optional[Dict[Node, Any]] = None,
+    ):
+        """
+        Numérote les sommets et les arêtes de `network`
+
+        INPUT:
+
+            - network, un réseau Network
+            - sources (optionnel), un dictionnaire `{sommet: offre}`: les
+              sources multiples et la quantité maximale que chacune émet
+            - sinks (optionnel), un dictionnaire `{sommet: demande}`: les
+              cibles multiples et la quantité maximale que chacune reçoit
+            - node_capacity (optionnel), un dictionnaire `{sommet: capacité}`:
+              la quantité maximale de flot qui traverse chaque sommet (y
+              compris celle émise ou reçue par le sommet)
+
+        Les arêtes du réseau sont numérotées de 0 à m-1 dans l'ordre de
+        `network.edges()`, et les sommets de 0 à n-1 dans l'ordre de
+        `network.nodes()`. Viennent ensuite des sommets et arêtes virtuels:
+
+        - un sommet `v` de capacité `c` est dédoublé: le sommet `i` de `v`
+          reçoit les arêtes entrantes, un nouveau sommet reçoit les arêtes
+          sortantes, et une arête de capacité `c` les relie;
+        - une source virtuelle est reliée à chaque sommet de `sources`,
+          avec l'offre pour capacité; de même chaque sommet de `sinks` est
+          relié à une cible virtuelle.
+
+        Les méthodes qui prennent une source `s` (resp. une cible `t`)
+        utilisent la source (resp. cible) virtuelle si `s` (resp. `t`) vaut
+        `None`.
+
+        EXAMPLES::
+
+            >>> from network import examples
+            >>> R = ResidualNetwork(examples.small_example(),
+            ...                     sources={0: 2, 1: 4}, node_capacity={2: 1})
+            >>> R.number_of_nodes(), R.number_of_edges()
+            (4, 5)
+            >>> R.value(R.dinic(None, 3), None)
+            4
+
+        Complexity: O(n + m log m) pour n sommets et m arêtes
+        """
+        self._network = network
+        self.nodes = list(network.nodes())
+        self.index = {v: i for i, v in enumerate(self.nodes)}
+        self.sources = sources
+        self.sinks = sinks
+        self.node_capacity = node_capacity
+        n = len(self.nodes)
+
+        # out[i]: le sommet d'où partent les arêtes du i-ème sommet
+        out = list(range(n))
+        size = n
+        for v in node_capacity or {}:
+            out[self.index[v]] = size
+            size += 1
+        self._out = out
+        source_index = size
+        size += sources is not None
+        sink_index = size
+        size += sinks is not None
+        self.source_index = None if sources is None else source_index
+        self.sink_index = None if sinks is None else sink_index
+        self._size = size
+
+        edges = [(out[self.index[u]], self.index[v], c)
+                 for u, v, c in network.edges(data="weight", default=1)]
+        self._edges = list(network.edges())
+        self.edge_index = {e: i for i, e in enumerate(self._edges)}
+        self._m = len(edges)
+        for v, c in (node_capacity or {}).items():
+            edges.append((self.index[v], out[self.index[v]], c))
+        for v, c in (sources or {}).items():
+            edges.append((source_index, self.index[v], c))
+        for v, c in (sinks or {}).items():
+            edges.append((out[self.index[v]], sink_index, c))
+
+        self.tails = numpy.array([u for u, _, _ in edges], dtype=numpy.int64)
+        self.heads = numpy.array([v for _, v, _ in edges], dtype=numpy.int64)
+        self.capacities = numpy.array([c for _, _, c in edges])
+        m = len(edges)
+        if not m:
+            self.capacities = self.capacities.astype(numpy.int64)
+
+        # Origine de chaque arc résiduel: 2e part de tails[e], 2e+1 de heads[e]
+        origins = numpy.empty(2 * m, dtype=numpy.int64)
+        origins[0::2] = self.tails
+        origins[1::2] = self.heads
+        self.arcs = numpy.argsort(origins, kind="stable")
+        self.start = numpy.zeros(size + 1, dtype=numpy.int64)
+        numpy.cumsum(numpy.bincount(origins, minlength=size), out=self.start[1:])
+
+        # Copies en listes Python, plus rapides d'accès élément par élément
+        arc_heads = origins.copy()
+        arc_heads[0::2] = self.heads
+        arc_heads[1::2] = self.tails
+        self._arc_heads: List[int] = arc_heads.tolist()
+        self._arcs: List[int] = self.arcs.tolist()
+        self._start: List[int] = self.start.tolist()
+
+    def network(self) -> NetworkType:
+        """
+        Renvoie le réseau d'origine
+        """
+        return self._network
+
+    def number_of_nodes(self) -> int:
+        """
+        Renvoie le nombre de sommets du réseau (hors sommets virtuels)
+        """
+        return len(self.nodes)
+
+    def number_of_edges(self) -> int:
+        """
+        Renvoie le nombre d'arêtes du réseau (hors arêtes virtuelles)
+        """
+        return self._m
+
+    def edges(self) -> List[Tuple[Node, Node]]:
+        """
+        Renvoie la liste des arêtes `(v1,v2)` du réseau, dans l'ordre de
+        leurs numéros
+        """
+        return self._edges
+
+    def terminals(self, s: Node, t: Node) -> Tuple[int, int]:
+        """
+        Renvoie les numéros des sommets d'où part et où arrive le flot de
+        `s` à `t`: ceux de la source et de la cible virtuelles si `s` ou `t`
+        vaut `None`
+
+        Si la source ou la cible a une capacité, le flot part du sommet
+        qui reçoit les arêtes entrantes et arrive au sommet d'où partent
+        les arêtes sortantes: la capacité s'applique aussi au flot émis
+        ou reçu.
+        """
+        si = self.source_index if s is None else self.index[s]
+        ti = self.sink_index if t is None else self._out[self.index[t]]
+        assert si is not None and ti is not None, "pas de source ou de cible"
+        return (si, ti)
+
+    def out_edges(self, v: Node) -> numpy.ndarray:
+        """
+        Renvoie les numéros des arêtes qui sortent de `v`
+
+            >>> from network import examples
+            >>> R = ResidualNetwork(examples.small_example())
+            >>> R.out_edges(1), R.in_edges(1)
+            (array([2, 3]), array([0]))
+
+        Complexity: linéaire sur le degré de `v`
+        """
+        i = self._out[self.index[v]]
+        arcs = self.arcs[self.start[i]:self.start[i + 1]]
+        return cast(numpy.ndarray,
+                    arcs[(arcs & 1 == 0) & (arcs < 2 * self._m)] >> 1)
+
+    def in_edges(self, v: Node) -> numpy.ndarray:
+        """
+        Renvoie les numéros des arêtes qui entrent dans `v`
+        """
+        i = self.index[v]
+        arcs = self.arcs[self.start[i]:self.start[i + 1]]
+        return cast(numpy.ndarray,
+                    arcs[(arcs & 1 == 1) & (arcs < 2 * self._m)] >> 1)
+
+    def balance(self, flow: numpy.ndarray) -> numpy.ndarray:
+        """
+        Renvoie, pour chaque sommet, la somme des flots sortants moins la
+        somme des flots entrants
+
+            >>> from flow_examples import flow_examples
+            >>> F = flow_examples.small_example2()
+            >>> R = ResidualNetwork(F.network())
+            >>> R.balance(R.from_flow(F))
+            array([ 9.,  0.,  0., -9.])
+        """
+        n = self._size
+        return cast(numpy.ndarray,
+                    numpy.bincount(self.tails, weights=flow, minlength=n) -
+                    numpy.bincount(self.heads, weights=flow, minlength=n))
+
+    def zero_flow(self) -> numpy.ndarray:
+        """
+        Renvoie le flot nul, sous la forme d'un tableau indexé par les arêtes
+        """
+        return numpy.zeros_like(self.capacities)
+
+    def residual_capacities(self, flow: numpy.ndarray) -> numpy.ndarray:
+        """
+        Renvoie les capacités résiduelles des 2m arcs pour le flot `flow`
+
+            >>> from network import examples
+            >>> R = ResidualNetwork(examples.small_example())
+            >>> R.residual_capacities(R.zero_flow())
+            array([3, 0, 3, 0, 2, 0, 3, 0, 3, 0])
+        """
+        dtype = numpy.result_type(flow, self.capacities)
+        res = numpy.empty(2 * len(flow), dtype=dtype)
+        res[0::2] = self.capacities - flow
+        res[1::2] = flow
+        return res
+
+    def value(self, flow: numpy.ndarray, s: Node) -> Any:
+        """
+        Renvoie le flux net sortant du sommet `s` (de la source virtuelle si
+        `s` vaut `None`) pour le flot `flow`
+        """
+        i = self.source_index if s is None else self.index[s]
+        return (flow[self.tails == i].sum() - flow[self.heads == i].sum()).item()
+
+    def from_flow(self, F: Any) -> numpy.ndarray:
+        """
+        Renvoie le tableau des valeurs du flot `F`, indexé par les arêtes
+
+        `F` peut être un objet `Flow`, un réseau Network dont les capacités
+        sont les valeurs du flot, ou déjà un tableau (qui est alors copié).
+        Le flot des arêtes virtuelles, absent d'un `Flow` ou d'un réseau, est
+        déduit des flux nets des sommets.
+
+            >>> from flow_examples import flow_examples
+            >>> F = flow_examples.small_example2()
+            >>> R = ResidualNetwork(F.network())
+            >>> R.from_flow(F)
+            array([5, 4, 2, 3, 6])
+            >>> R.to_flow(0, 3, R.from_flow(F)) == F
+            True
+        """
+        if isinstance(F, numpy.ndarray):
+            return numpy.array(F, dtype=numpy.result_type(F, self.capacities))
+        value = F.flow if hasattr(F, "flow") else F.capacity
+        values = numpy.array([value(u, v) for u, v in self._edges])
+        if not len(values):
+            return self.zero_flow()
+        flow = self.zero_flow().astype(numpy.result_type(values, self.capacities))
+        flow[:self._m] = values
+        if len(flow) > self._m:
+            # Flux sortant (resp. entrant) de chaque sommet du réseau
+            n = len(self.nodes)
+            outgoing = numpy.bincount(self.tails[:self._m], values,
+                                      self._size)[self._out]
+            incoming = numpy.bincount(self.heads[:self._m], values, n)
+            outgoing = outgoing.astype(flow.dtype)
+            incoming = incoming.astype(flow.dtype)
+            m = self._m
+            for vertices, through in ((self.node_capacity,
+                                       numpy.maximum(incoming, outgoing)),
+                                      (self.sources, outgoing - incoming),
+                                      (self.sinks, incoming - outgoing)):
+                nodes = [self.index[v] for v in vertices or {}]
+                flow[m:m + len(nodes)] = numpy.maximum(through, 0)[nodes]
+                m += len(nodes)
+        return flow
+
+    def to_flow(self, s: Node, t: Node, flow: numpy.ndarray) -> "Flow":
+        """
+        Renvoie le flot `flow` sous la forme d'un objet `Flow` de source
+        `s` et de cible `t` sur le réseau d'origine, en mode de stockage
+        "array" (sans copie des tableaux)
+        """
+        from flow import Flow
+        return Flow.from_arrays(self, s, t, flow)
+
+    def reachable(
+        self, flow: numpy.ndarray, s: Node, epsilon: float = 0
+    ) -> numpy.ndarray:
+        """
+        Renvoie le tableau booléen des sommets accessibles depuis `s` dans le
+        graphe résiduel du flot `flow`, en ignorant les arcs de capacité
+        résiduelle au plus `epsilon`
+
+            >>> from network import examples
+            >>> R = ResidualNetwork(examples.small_example())
+            >>> R.reachable(R.dinic(0, 3), 0)
+            array([ True, False, False, False])
+        """
+        i = self.source_index if s is None else self.index[s]
+        assert i is not None, "pas de source"
+        residual = self.residual_capacities(flow)
+        if epsilon:
+            residual = numpy.where(residual > epsilon, residual, 0)
+        level = self._levels(residual.tolist(), i, -1)
+        return numpy.array(level) >= 0
+
+    def _levels(self, residual: List, s: int, t: int) -> List[int]:
+        """
+        Renvoie la distance (en nombre d'arcs) de `s` à chaque sommet dans le
+        graphe résiduel, ou -1 pour les sommets inaccessibles
+
+        Le parcours s'arrête à la fin de la couche qui contient `t`.
+        """
+        heads = self._arc_heads
+        start = self._start
+        arcs = self._arcs
+        level = [-1] * self._size
+        level[s] = 0
+        todo = deque([s])
+        while todo:
+            v = todo.popleft()
+            if v == t:
+                break
+            lw = level[v] + 1
+            for k in range(start[v], start[v + 1]):
+                a = arcs[k]
+                w = heads[a]
+                if level[w] < 0 and residual[a] > 0:
+                    level[w] = lw
+                    todo.append(w)
+        return level
+
+    def dinic(
+        self, s: Node, t: Node, flow: Optional[numpy.ndarray] = None
+    ) -> numpy.ndarray:
+        """
+        Algorithme de Dinic: renvoie un flot maximal de `s` à `t`
+
+        INPUT:
+
+            - s, le sommet source
+            - t, le sommet cible
+            - flow (optionnel), un flot de départ (tableau indexé par les
+              arêtes); par défaut le flot nul
+
+        OUTPUT: le flot maximal, sous la forme d'un tableau indexé par les
+        arêtes (voir `to_flow`)
+
+        À chaque phase, un parcours en largeur depuis `s` donne le graphe
+        de niveaux: les arcs résiduels qui vont d'un niveau au suivant. On
+        y sature un flot bloquant par des parcours en profondeur itératifs;
+        le pointeur `current[v]` retient le premier arc de `v` qui n'a pas
+        encore été reconnu inutile, si bien que chaque arc est abandonné au
+        plus une fois par phase. La distance de `s` à `t` augmente
+        strictement à chaque phase.
+
+        EXAMPLES::
+
+            >>> from network import examples
+            >>> R = ResidualNetwork(examples.example1())
+            >>> flow = R.dinic(0, 6)
+            >>> R.value(flow, 0)
+            4
+            >>> F = R.to_flow(0, 6, flow)
+            >>> F.check_capacity() and F.check_in_out()
+            True
+
+        Complexity: O(n²m) pour n sommets et m arêtes
+        """
+        heads = self._arc_heads
+        start = self._start
+        arcs = self._arcs
+        si, ti = self.terminals(s, t)
+        if flow is None:
+            flow = self.zero_flow()
+        residual = self.residual_capacities(flow).tolist()
+
+        while True:
+            level = self._levels(residual, si, ti)
+            if level[ti] < 0:
+                break
+            current = start[:-1]  # copie des débuts de listes d'arcs
+            path: List[int] = []  # les arcs du chemin en cours depuis `s`
+            v = si
+            while True:
+                if v == ti:
+                    # Augmentation le long du chemin, puis retour à l'origine
+                    # du premier arc saturé
+                    delta = min(residual[a] for a in path)
+                    first = -1
+                    for k, a in enumerate(path):
+                        residual[a] -= delta
+                        residual[a ^ 1] += delta
+                        if first < 0 and residual[a] == 0:
+                            first = k
+                    del path[first:]
+                    v = heads[path[-1]] if path else si
+                    continue
+                # Avance le long du premier arc admissible de `v`
+                k = current[v]
+                end = start[v + 1]
+                lw = level[v] + 1
+                while k < end:
+                    a = arcs[k]
+                    if residual[a] > 0 and level[heads[a]] == lw:
+                        break
+                    k += 1
+                current[v] = k
+                if k < end:
+                    path.append(arcs[k])
+                    v = heads[arcs[k]]
+                elif v == si:
+                    break  # flot bloquant atteint
+                else:
+                    # Impasse: `v` est retiré du graphe de niveaux
+                    level[v] = -1
+                    a = path.pop()
+                    v = heads[a ^ 1]
+                    current[v] += 1
+
+        # Flot sur l'arête e: la capacité résiduelle de l'arc inverse 2e+1
+        return numpy.array(residual[1::2], dtype=flow.dtype)
+
+    def _distances_to(self, residual: List, target: int, label: List[int],
+                      base: int) -> None:
+        """
+        Parcours en largeur à rebours depuis `target` dans le graphe
+        résiduel: donne le label `base + d` à chaque sommet encore sans
+        label (-1) qui atteint `target` en `d` arcs
+        """
+        heads = self._arc_heads
+        start = self._start
+        arcs = self._arcs
+        label[target] = base
+        todo = deque([target])
+        while todo:
+            x = todo.popleft()
+            lx = label[x] + 1
+            for k in range(start[x], start[x + 1]):
+                # L'arc inverse de `b` va de `w` à `x`
+                b = arcs[k]
+                w = heads[b]
+                if label[w] < 0 and residual[b ^ 1] > 0:
+                    label[w] = lx
+                    todo.append(w)
+
+    def push_relabel(self, s: Node, t: Node) -> numpy.ndarray:
+        """
+        Algorithme de poussage–réétiquetage: renvoie un flot maximal de
+        `s` à `t`
+
+        OUTPUT: le flot maximal, sous la forme d'un tableau indexé par les
+        arêtes (voir `to_flow`)
+
+        On part du préflot qui sature les arêtes sortant de `s`. Chaque
+        sommet porte un label, minorant de sa distance résiduelle à `t`
+        (ou, au-delà de n, à `s`); on traite toujours un sommet en excès
+        de label maximal, en poussant son excès le long des arcs qui
+        descendent d'un label, et en le réétiquetant quand il n'y en a
+        plus. Deux heuristiques évitent les réétiquetages inutiles:
+
+        - réétiquetage global: tous les n réétiquetages, les labels sont
+          recalculés exactement par des parcours en largeur à rebours
+          depuis `t`, puis depuis `s`;
+        - trou (gap): si plus aucun sommet n'a un label k < n, les sommets
+          de label entre k et n ne peuvent plus atteindre `t`; ils passent
+          directement au label n + 1.
+
+        Adapté aux réseaux denses, où les chaînes augmentantes sont
+        nombreuses et courtes.
+
+        EXAMPLES::
+
+            >>> from network import examples
+            >>> R = ResidualNetwork(examples.example1())
+            >>> flow = R.push_relabel(0, 6)
+            >>> R.value(flow, 0)
+            4
+            >>> F = R.to_flow(0, 6, flow)
+            >>> F.check_capacity() and F.check_in_out()
+            True
+
+        Avec des capacités flottantes, les excès résiduels dus aux arrondis
+        sont tolérés par les vérifications du flot (voir `Flow.epsilon`)::
+
+            >>> from network import Network
+            >>> N = Network(nodes=[0, 1, 2],
+            ...             edges=[(0, 1, 0.8), (1, 2, 0.2), (0, 2, 0.5)])
+            >>> R = ResidualNetwork(N)
+            >>> flow = R.push_relabel(0, 2)
+            >>> R.balance(flow)[1] == 0
+            False
+            >>> R.to_flow(0, 2, flow).verify_optimal()
+            True
+
+        Complexity: O(n²√m) pour n sommets et m arêtes
+        """
+        heads = self._arc_heads
+        start = self._start
+        arcs = self._arcs
+        n = self._size
+        si, ti = self.terminals(s, t)
+        residual = self.residual_capacities(self.zero_flow()).tolist()
+        excess = [0] * n
+        label = [0] * n
+        # Les labels restent inférieurs ou égaux à 2n
+        count = [0] * (2 * n + 1)  # nombre de sommets par label
+        # active[h]: sommets en excès de label h (entrées périmées tolérées)
+        active: List[List[int]] = [[] for _ in range(2 * n + 1)]
+        current = start[:-1]
+
+        for k in range(start[si], start[si + 1]):
+            a = arcs[k]
+            c = residual[a]
+            if c > 0:
+                residual[a] = 0
+                residual[a ^ 1] += c
+                excess[heads[a]] += c
+                excess[si] -= c
+
+        def global_relabel() -> int:
+            """
+            Recalcule tous les labels et les sommets actifs; renvoie le
+            plus grand label d'un sommet actif
+            """
+            label[:] = [-1] * n
+            self._distances_to(residual, ti, label, 0)
+            label[si] = -1
+            self._distances_to(residual, si, label, n)
+            # Les sommets restants ne peuvent avoir d'excès
+            label[:] = [2 * n if h < 0 else h for h in label]
+            count[:] = [0] * (2 * n + 1)
+            for h in label:
+                count[h] += 1
+            current[:] = start[:-1]
+            highest = -1
+            for h in range(2 * n + 1):
+                active[h].clear()
+            for v in range(n):
+                if excess[v] > 0 and v != si and v != ti:
+                    active[label[v]].append(v)
+                    highest = max(highest, label[v])
+            return highest
+
+        highest = global_relabel()
+        relabels = 0
+        while highest >= 0:
+            if not active[highest]:
+                highest -= 1
+                continue
+            v = active[highest].pop()
+            if label[v] != highest or excess[v] == 0:
+                continue  # entrée périmée
+
+            # Décharge de `v`
+            while excess[v] > 0:
+                dv = label[v] - 1
+                k = current[v]
+                end = start[v + 1]
+                while k < end:
+                    a = arcs[k]
+                    r = residual[a]
+                    if r > 0 and label[heads[a]] == dv:
+                        w = heads[a]
+                        d = excess[v] if excess[v] < r else r
+                        residual[a] = r - d
+                        residual[a ^ 1] += d
+                        excess[v] -= d
+                        if excess[w] == 0 and w != si and w != ti:
+                            active[dv].append(w)
+                        excess[w] += d
+                        if excess[v] == 0:
+                            break
+                    k += 1
+                current[v] = k
+                if excess[v] == 0:
+                    break
+
+                # Réétiquetage: plus d'arc admissible
+                old = label[v]
+                new = 2 * n
+                for k in range(start[v], end):
+                    a = arcs[k]
+                    if residual[a] > 0 and label[heads[a]] < new:
+                        new = label[heads[a]]
+                new += 1
+                current[v] = start[v]
+                count[old] -= 1
+                if old < n and count[old] == 0:
+                    # Trou au label `old`
+                    for w in range(n):
+                        if old < label[w] < n:
+                            count[label[w]] -= 1
+                            label[w] = n + 1
+                            count[n + 1] += 1
+                            current[w] = start[w]
+                            if excess[w] > 0:
+                                active[n + 1].append(w)
+                    new = max(new, n + 1)
+                label[v] = new
+                count[new] += 1
+                relabels += 1
+                if relabels % n == 0:
+                    active[new].append(v)
+                    highest = global_relabel()
+                    break
+                highest = max(highest, new)
+
+        return numpy.array(residual[1::2], dtype=self.capacities.dtype)
+
+    def _path_to(self, residual: List, origin: int, targets: Any) -> List[int]:
+        """
+        Renvoie les arcs d'un plus court chemin de `origin` à un sommet de
+        `targets` dans le graphe résiduel (liste vide s'il n'y en a pas)
+        """
+        heads = self._arc_heads
+        start = self._start
+        arcs = self._arcs
+        parent = {origin: -1}
+        todo = deque([origin])
+        while todo:
+            v = todo.popleft()
+            for k in range(start[v], start[v + 1]):
+                a = arcs[k]
+                w = heads[a]
+                if residual[a] > 0 and w not in parent:
+                    parent[w] = a
+                    if w in targets:
+                        path = []
+                        while w != origin:
+                            path.append(parent[w])
+                            w = heads[parent[w] ^ 1]
+                        path.reverse()
+                        return path
+                    todo.append(w)
+        return []
+
+    def repair(self, s: Node, t: Node, flow: numpy.ndarray) -> numpy.ndarray:
+        """
+        Renvoie un flot de `s` à `t` obtenu en corrigeant `flow`, dont les
+        valeurs peuvent dépasser les capacités (après une baisse de
+        capacité, par exemple)
+
+        Les valeurs sont d'abord ramenées dans les capacités: la conservation
+        est alors violée, avec un surplus à l'origine et un déficit à
+        l'extrémité de chaque arête réduite. Chaque surplus est envoyé, le
+        long de plus courts chemins du graphe résiduel, vers un sommet en
+        déficit, vers `t`, ou renvoyé vers `s` (ce qui annule le flot qui
+        l'avait apporté); chaque déficit restant est comblé depuis `s` ou,
+        à défaut, depuis `t` (ce qui annule le flot qui en partait). Seuls
+        les chemins autour des arêtes modifiées sont touchés; le flot
+        obtenu n'est en général plus maximal (voir `dinic` pour
+        l'augmenter).
+
+        EXAMPLES::
+
+            >>> from flow_examples import flow_examples
+            >>> F = flow_examples.small_example2()
+            >>> R = ResidualNetwork(F.network())
+            >>> R.capacities[R.edge_index[1, 3]] = 1
+            >>> flow = R.repair(0, 3, R.from_flow(F))
+            >>> R.to_flow(0, 3, flow).flows()
+            ((0, 1, 3), (0, 2, 4), (1, 2, 2), (1, 3, 1), (2, 3, 6))
+
+        Complexity: O(m) par chemin, et un chemin par arête réduite au
+        plus, sauf si les goulots sont plus étroits que les surplus
+        """
+        si, ti = self.terminals(s, t)
+        flow = numpy.minimum(numpy.maximum(flow, 0), self.capacities)
+        excess = (-self.balance(flow)).astype(flow.dtype).tolist()
+        residual = self.residual_capacities(flow).tolist()
+        heads = self._arc_heads
+
+        def push(path: List[int], amount: Any) -> Any:
+            d = min([amount] + [residual[a] for a in path])
+            for a in path:
+                residual[a] -= d
+                residual[a ^ 1] += d
+            excess[heads[path[0] ^ 1]] -= d
+            excess[heads[path[-1]]] += d
+            return d
+
+        deficits = {v for v, e in enumerate(excess)
+                    if e < 0 and v != si and v != ti}
+        for u in range(len(excess)):
+            while excess[u] > 0 and u != si and u != ti:
+                path = self._path_to(residual, u, deficits | {si, ti})
+                assert path, "surplus sans chemin vers un déficit"
+                w = heads[path[-1]]
+                if w in deficits:
+                    push(path, min(excess[u], -excess[w]))
+                    if excess[w] >= 0:
+                        deficits.remove(w)
+                else:
+                    push(path, excess[u])
+        # Les seuls sommets en surplus sont maintenant `s` et `t`
+        for v in deficits:
+            while excess[v] < 0:
+                path = self._path_to(residual, si, {v}) or \
+                    self._path_to(residual, ti, {v})
+                assert path, "déficit sans chemin depuis la source ou la cible"
+                push(path, -excess[v])
+
+        return numpy.array(residual[1::2], dtype=flow.dtype)
+
+    def min_cost_flow(
+        self,
+        s: Node,
+        t: Node,
+        costs: numpy.ndarray,
+        value: Optional[Any] = None,
+    ) -> numpy.ndarray:
+        """
+        Plus courts chemins successifs: renvoie un flot de `s` à `t` de
+        coût minimal parmi les flots de valeur `value` (par défaut, parmi
+        les flots maximaux)
+
+        INPUT:
+
+            - s, le sommet source
+            - t, le sommet cible
+            - costs, le tableau des coûts par unité de flot, indexé par les
+              arêtes; le coût de l'arc inverse `2e+1` est l'opposé de celui
+              de l'arête `e`
+            - value (optionnel), la valeur du flot voulu; si elle dépasse la
+              valeur maximale, on s'arrête au flot maximal
+
+        À chaque étape, on augmente le flot le long d'un plus court chemin
+        de `s` à `t` du graphe résiduel pour les coûts. Les potentiels de
+        Johnson `pi` (les distances de l'étape précédente) rendent positifs
+        les coûts réduits `cost(a) + pi[v] - pi[w]` des arcs résiduels `a`
+        de `v` à `w`, ce qui permet l'algorithme de Dijkstra (tas `heapq`)
+        à chaque étape. Les potentiels initiaux sont nuls si les coûts sont
+        positifs, calculés par Bellman–Ford sinon. Le réseau ne doit pas
+        contenir de circuit de coût négatif.
+
+        Après chaque calcul de distances, les plus courts chemins sont
+        exactement les chemins d'arcs de coût réduit nul: plutôt qu'un seul
+        chemin, on augmente le flot d'un flot bloquant sur ces arcs (comme
+        dans `dinic`), ce qui réduit beaucoup le nombre d'appels à Dijkstra.
+
+        EXAMPLES::
+
+            >>> from network import examples
+            >>> R = ResidualNetwork(examples.small_example2())
+            >>> costs = numpy.array([1, 5, 1, 4, 1])
+            >>> flow = R.min_cost_flow(0, 3, costs)
+            >>> R.value(flow, 0), int(flow @ costs)
+            (9, 45)
+            >>> flow = R.min_cost_flow(0, 3, costs, value=3)
+            >>> R.value(flow, 0), int(flow @ costs)
+            (3, 11)
+
+        Complexity: O(k m log n) pour k calculs de plus courts chemins, n
+        sommets et m arêtes, plus le coût des flots bloquants
+        """
+        heads = self._arc_heads
+        start = self._start
+        arcs = self._arcs
+        n = self._size
+        si, ti = self.terminals(s, t)
+        residual = self.residual_capacities(self.zero_flow()).tolist()
+        arc_costs = numpy.empty(2 * len(costs), dtype=costs.dtype)
+        arc_costs[0::2] = costs
+        arc_costs[1::2] = -costs
+        cost = arc_costs.tolist()
+        infinity = float("inf")
+
+        pi: List[Any] = [0] * n
+        if (costs < 0).any():
+            # Bellman–Ford depuis `s` sur les arêtes de capacité non nulle
+            pi = [infinity] * n
+            pi[si] = 0
+            for _ in range(n):
+                changed = False
+                for v in range(n):
+                    if pi[v] == infinity:
+                        continue
+                    for k in range(start[v], start[v + 1]):
+                        a = arcs[k]
+                        w = heads[a]
+                        if residual[a] > 0 and pi[v] + cost[a] < pi[w]:
+                            pi[w] = pi[v] + cost[a]
+                            changed = True
+                if not changed:
+                    break
+            else:
+                raise ValueError("circuit de coût négatif")
+            pi = [0 if p == infinity else p for p in pi]
+
+        sent: Any = 0
+        while value is None or sent < value:
+            # Dijkstra pour les coûts réduits
+            distance: List[Any] = [infinity] * n
+            parent = [-1] * n
+            done = [False] * n
+            distance[si] = 0
+            heap = [(0, si)]
+            while heap:
+                (dv, v) = heapq.heappop(heap)
+                if done[v]:
+                    continue  # entrée périmée
+                done[v] = True
+                if v == ti:
+                    break
+                pv = pi[v]
+                for k in range(start[v], start[v + 1]):
+                    a = arcs[k]
+                    if residual[a] > 0:
+                        w = heads[a]
+                        dw = dv + cost[a] + pv - pi[w]
+                        # Avec des coûts non entiers, les arrondis peuvent
+                        # rendre un coût réduit légèrement négatif: un sommet
+                        # traité n'est jamais remis en cause
+                        if dw < distance[w] and not done[w]:
+                            distance[w] = dw
+                            parent[w] = a
+                            heapq.heappush(heap, (dw, w))
+            if distance[ti] == infinity:
+                break
+            # Les sommets non traités reçoivent la distance de `t`: les
+            # coûts réduits restent positifs
+            dt = distance[ti]
+            for v in range(n):
+                pi[v] += distance[v] if done[v] else dt
+
+            # Les arcs de coût réduit nul forment maintenant les plus courts
+            # chemins: on y sature un flot bloquant, comme dans `dinic`
+            level = [-1] * n
+            level[si] = 0
+            todo = deque([si])
+            while todo:
+                v = todo.popleft()
+                if v == ti:
+                    break
+                pv = pi[v]
+                for k in range(start[v], start[v + 1]):
+                    a = arcs[k]
+                    w = heads[a]
+                    if level[w] < 0 and residual[a] > 0 and cost[a] + pv == pi[w]:
+                        level[w] = level[v] + 1
+                        todo.append(w)
+            if level[ti] < 0:
+                # Erreurs d'arrondi sur des coûts non entiers: on se
+                # contente du plus court chemin trouvé par Dijkstra
+                path = []
+                w = ti
+                while w != si:
+                    path.append(parent[w])
+                    w = heads[parent[w] ^ 1]
+                delta = min(residual[a] for a in path)
+                if value is not None:
+                    delta = min(delta, value - sent)
+                for a in path:
+                    residual[a] -= delta
+                    residual[a ^ 1] += delta
+                sent += delta
+                continue
+
+            current = start[:-1]
+            path = []
+            v = si
+            while value is None or sent < value:
+                if v == ti:
+                    delta = min(residual[a] for a in path)
+                    if value is not None:
+                        delta = min(delta, value - sent)
+                    first = -1
+                    for k, a in enumerate(path):
+                        residual[a] -= delta
+                        residual[a ^ 1] += delta
+                        if first < 0 and residual[a] == 0:
+                            first = k
+                    sent += delta
+                    if first < 0:
+                        break  # valeur voulue atteinte
+                    del path[first:]
+                    v = heads[path[-1]] if path else si
+                    continue
+                k = current[v]
+                end = start[v + 1]
+                lw = level[v] + 1
+                pv = pi[v]
+                while k < end:
+                    a = arcs[k]
+                    w = heads[a]
+                    if residual[a] > 0 and level[w] == lw and cost[a] + pv == pi[w]:
+                        break
+                    k += 1
+                current[v] = k
+                if k < end:
+                    path.append(arcs[k])
+                    v = heads[arcs[k]]
+                elif v == si:
+                    break
+                else:
+                    level[v] = -1
+                    a = path.pop()
+                    v = heads[a ^ 1]
+                    current[v] += 1
+
+        return numpy.array(residual[1::2], dtype=self.capacities.dtype)
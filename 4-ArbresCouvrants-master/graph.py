@@ -86,6 +86,41 @@ class Graph:
         Initialisation d'un graphe vide (sans arêtes)
         """
         self._edges = {}
+        # Listes d'adjacence sortantes et entrantes de chaque sommet,
+        # maintenues en parallèle de `_edges`
+        self._successors = {v: [] for v in self._nodes}
+        self._predecessors = {v: [] for v in self._nodes}
+        # Position de chaque sommet dans `_nodes`: les listes d'adjacence
+        # sont triées selon cette position, comme l'étaient les voisins avant
+        self._rank = {v: i for i, v in enumerate(self._nodes)}
+
+    def _insert(self, neighbors, v):
+        """
+        Insère `v` dans la liste `neighbors`, triée selon l'ordre des sommets
+        """
+        rank = self._rank.get(v, len(self._rank))
+        i = len(neighbors)
+        while i > 0 and \
+                self._rank.get(neighbors[i - 1], len(self._rank)) > rank:
+            i -= 1
+        neighbors.insert(i, v)
+
+    def _add_edge(self, v1, v2, c):
+        """
+        Ajoute l'arête `(v1,v2)` de capacité `c`, ou met à jour sa capacité
+        """
+        if (v1, v2) not in self._edges:
+            self._insert(self._successors.setdefault(v1, []), v2)
+            self._insert(self._predecessors.setdefault(v2, []), v1)
+        self._edges[(v1, v2)] = c
+
+    def _remove_edge(self, v1, v2):
+        """
+        Supprime l'arête `(v1,v2)` et renvoie sa capacité
+        """
+        self._successors[v1].remove(v2)
+        self._predecessors[v2].remove(v1)
+        return self._edges.pop((v1, v2))
 
 
     def _init_from_matrix(self, matrix):
@@ -112,16 +147,16 @@ class Graph:
         if len(self._nodes) == 0:
             self._nodes = [i for i in range(len(matrix))]
 
-        self._edges = dict()
+        self._init_empty()
         for i in range(len(matrix)):
             for j in range(len(matrix)):
                 if matrix[i][j] != 0:
                     (v1, v2) = (self._nodes[i], self._nodes[j])
                     c = matrix[i][j]
-                    self._edges[(v1, v2)] = c
+                    self._add_edge(v1, v2, c)
                     # Si pas graphe non-dirigé alors arêtes à double sens
                     if not self._directed:
-                        self._edges[(v2, v1)] = c
+                        self._add_edge(v2, v1, c)
 
     def _init_from_edges(self, edges):
         """
@@ -135,12 +170,12 @@ class Graph:
                 nodes.add(v2)
             self._nodes = list(nodes)
 
-        self._edges = dict()
+        self._init_empty()
         for (v1, v2, c) in edges:
-            self._edges[(v1, v2)] = c
+            self._add_edge(v1, v2, c)
             # Si pas graphe non-dirigé alors arêtes à double sens
             if not self._directed:
-                self._edges[(v2, v1)] = c
+                self._add_edge(v2, v1, c)
 
     def is_directed(self):
         """
@@ -158,9 +193,9 @@ class Graph:
             - v2, un sommet du graphe
             - c la capacité de l'arête (v1,v2)
         """
-        self._edges[(v1, v2)] = c
+        self._add_edge(v1, v2, c)
         if not self._directed:
-            self._edges[(v2, v1)] = c
+            self._add_edge(v2, v1, c)
 
     def add_vertex(self, v):
         """
@@ -172,6 +207,7 @@ class Graph:
 
         """
         if v not in self._nodes:
+            self._rank[v] = len(self._nodes)
             self._nodes.append(v)
 
     def vertices(self):
@@ -244,7 +280,7 @@ class Graph:
             - v1, un sommet du graphe
             - v2, un sommet du graphe
         """
-        return v2 in self.successors(v1)
+        return (v1, v2) in self._edges
     
     def remove_edge(self, v1, v2):
         """
@@ -260,9 +296,9 @@ class Graph:
             Capacité de l'arête (v1, v2) ou None
         """
         if self._edges.__contains__((v1, v2)):
-            res = self._edges.pop((v1, v2))
+            res = self._remove_edge(v1, v2)
             if not self._directed:
-                self._edges.pop((v2, v1))
+                self._remove_edge(v2, v1)
             return res
         return None
 
@@ -317,6 +353,9 @@ class Graph:
         """
         Retourne le dictionnaire associé au graphe
 
+        Le dictionnaire renvoyé est une copie: le modifier ne modifie pas
+        le graphe.
+
         EXAMPLES::
 
             >>> G = examples.cours_1_reseau()
@@ -324,7 +363,7 @@ class Graph:
             {'A': ('B', 'G', 'F'), 'B': ('A', 'C', 'G'), 'C': ('B', 'D', 'G', 'H'), 'D': ('C', 'E', 'H'), 'E': ('D', 'F', 'G', 'H'), 'F': ('A', 'E', 'G'), 'G': ('A', 'B', 'C', 'E', 'F', 'H'), 'H': ('C', 'D', 'E', 'G')}
 
         """
-        return self._edges
+        return dict(self._edges)
 
     def predecessors(self, v):
         """
@@ -345,7 +384,7 @@ class Graph:
             >>> G.predecessors(2)
             (1,)
         """
-        return tuple([v1 for v1 in self._nodes if self._edges.get((v1, v)) is not None])
+        return tuple(self._predecessors.get(v, ()))
 
     def successors(self, v):
         """
@@ -368,7 +407,7 @@ class Graph:
             >>> G.successors(4)
             ()
         """
-        return tuple([v2 for v2 in self._nodes if self._edges.get((v, v2)) is not None])
+        return tuple(self._successors.get(v, ()))
     
     neighbors = successors
 
@@ -405,7 +444,7 @@ class Graph:
             # Sommet courant
             w = p[i]
             # Le chemin d'un sommet vers lui-même existe toujours
-            res = v == w or w in self.successors(v)
+            res = v == w or self.is_edge(v, w)
             i += 1
         return res
 